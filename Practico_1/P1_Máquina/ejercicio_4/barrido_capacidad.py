@@ -0,0 +1,156 @@
+"""
+Barrido de parámetros para obtener curvas de capacidad de canal.
+
+Dada una familia de canales (una función que recibe un parámetro, por ejemplo
+la probabilidad de error, y devuelve la matriz P(Y|X)) y una grilla de valores,
+se calcula la capacidad en cada punto. Cada punto arranca el optimizador desde
+el óptimo del punto anterior (arranque en caliente) y la grilla se reparte en
+segmentos contiguos entre procesos para conservar ese arranque dentro de cada
+segmento.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import os
+
+import numpy as np
+
+from ej_4 import ChannelCapacityCalculator
+
+
+def binary_symmetric_channel(p):
+	"""
+	Canal binario simétrico con probabilidad de error p.
+
+	Args:
+		p (float): Probabilidad de error (cruce)
+
+	Returns:
+		np.array: Matriz 2x2 P(Y|X)
+	"""
+	return np.array([[1 - p, p], [p, 1 - p]])
+
+
+def r_ary_symmetric_channel(p, R):
+	"""
+	Canal R-ario simétrico: el símbolo se recibe correctamente con
+	probabilidad 1-p y el error se reparte uniformemente entre los otros R-1.
+
+	Para usarlo en un barrido se fija R con functools.partial:
+	partial(r_ary_symmetric_channel, R=4)
+
+	Args:
+		p (float): Probabilidad total de error
+		R (int): Tamaño del alfabeto
+
+	Returns:
+		np.array: Matriz R x R P(Y|X)
+	"""
+	matrix = np.full((R, R), p / (R - 1))
+	np.fill_diagonal(matrix, 1 - p)
+	return matrix
+
+
+def _sweep_segment(channel_family, params):
+	"""
+	Recorre secuencialmente un segmento contiguo de la grilla con arranque en
+	caliente. Se ejecuta dentro de cada proceso trabajador.
+
+	Args:
+		channel_family (callable): Función parámetro -> matriz P(Y|X)
+		params (np.array): Segmento de la grilla de parámetros
+
+	Returns:
+		tuple: (capacidades, distribuciones_óptimas, iteraciones, éxitos)
+	"""
+	n = len(params)
+	capacities = np.full(n, np.nan)
+	iterations = np.zeros(n, dtype=np.int64)
+	success = np.zeros(n, dtype=bool)
+	optimal = [None] * n
+
+	x0 = None
+	for k, param in enumerate(params):
+		matrix = np.asarray(channel_family(param))
+		calc = ChannelCapacityCalculator(matrix.shape[0], matrix)
+
+		# El óptimo anterior solo sirve de punto inicial si el alfabeto no cambió
+		if x0 is not None and len(x0) != calc.R:
+			x0 = None
+
+		try:
+			capacities[k], px = calc.calculate_capacity(x0)
+			success[k] = True
+			x0 = px
+		except RuntimeError:
+			# Se registra el punto como fallido y el siguiente arranca en frío
+			px = np.full(calc.R, np.nan)
+			x0 = None
+
+		iterations[k] = calc.last_result.nit
+		optimal[k] = px
+
+	return capacities, optimal, iterations, success
+
+
+def sweep_capacity(channel_family, params, n_workers=None):
+	"""
+	Calcula la capacidad del canal para cada valor de una grilla de parámetros.
+
+	La grilla se divide en n_workers segmentos contiguos; cada proceso recorre
+	su segmento en orden usando el óptimo del punto anterior como punto inicial.
+	channel_family debe poder serializarse con pickle (función definida a nivel
+	de módulo o functools.partial de una de ellas).
+
+	Args:
+		channel_family (callable): Función parámetro -> matriz P(Y|X)
+		params (array-like): Grilla de parámetros (se respeta su orden)
+		n_workers (int): Cantidad de procesos. None usa os.cpu_count();
+						1 ejecuta todo en el proceso actual.
+
+	Returns:
+		dict: Arrays NumPy alineados con la grilla:
+			- 'params': la grilla de parámetros
+			- 'capacity': capacidad en bits de cada punto (NaN si falló)
+			- 'optimal_px': distribuciones óptimas (una fila por punto)
+			- 'iterations': iteraciones del optimizador en cada punto
+			- 'success': True si el optimizador convergió
+	"""
+	params = np.asarray(params)
+	if n_workers is None:
+		n_workers = os.cpu_count() or 1
+	n_workers = max(1, min(n_workers, len(params)))
+
+	segments = np.array_split(params, n_workers)
+
+	if n_workers == 1:
+		results = [_sweep_segment(channel_family, segments[0])]
+	else:
+		with ProcessPoolExecutor(max_workers=n_workers) as pool:
+			results = list(pool.map(partial(_sweep_segment, channel_family), segments))
+
+	optimal = [px for r in results for px in r[1]]
+	if len({len(px) for px in optimal}) > 1:
+		# Familia con alfabeto variable: un vector por punto
+		optimal_px = np.empty(len(optimal), dtype=object)
+		optimal_px[:] = optimal
+	else:
+		optimal_px = np.array(optimal)
+
+	return {
+		'params': params,
+		'capacity': np.concatenate([r[0] for r in results]),
+		'optimal_px': optimal_px,
+		'iterations': np.concatenate([r[2] for r in results]),
+		'success': np.concatenate([r[3] for r in results]),
+	}
+
+
+if __name__ == "__main__":
+	# Curva de capacidad del canal binario simétrico: C = 1 - H(p)
+	grid = np.linspace(0.0, 0.5, 51)
+	curve = sweep_capacity(binary_symmetric_channel, grid)
+
+	print("   p      C (bits)   teórica    iteraciones")
+	for p, c, nit in zip(curve['params'], curve['capacity'], curve['iterations']):
+		h = 0.0 if p in (0.0, 1.0) else -(p * np.log2(p) + (1 - p) * np.log2(1 - p))
+		print(f"  {p:.2f}   {c:.4f}     {1 - h:.4f}     {nit}")
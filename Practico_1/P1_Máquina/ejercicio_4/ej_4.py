@@ -43,6 +43,9 @@ class ChannelCapacityCalculator:
 		row_sums = np.sum(self.P_Y_given_X, axis=1)
 		if not np.allclose(row_sums, 1.0):
 			raise ValueError("Cada fila de la matriz debe sumar 1")
+		
+		# Resultado de la última optimización (None hasta llamar a calculate_capacity)
+		self.last_result = None
 	
 	def entropy(self, probs):
 		"""
@@ -145,33 +148,54 @@ class ChannelCapacityCalculator:
 		"""
 		return -self.mutual_information(px)
 	
-	def calculate_capacity(self):
+	def calculate_capacity(self, x0=None, excluded_inputs=None):
 		"""
 		Encuentra la capacidad del canal maximizando I(X;Y) sobre todas las
 		distribuciones de entrada posibles.
 		
 		La capacidad es: C = max_{P(X)} I(X;Y)
 		
+		Args:
+			x0 (array-like): Distribución inicial para el optimizador (arranque
+							en caliente). Si es None se usa la distribución uniforme.
+			excluded_inputs (array-like): Símbolos de entrada cuya probabilidad
+							se fija en 0 (por ejemplo, entradas nunca observadas
+							al estimar el canal). Si es None se optimizan todas.
+		
 		Returns:
 			tuple: (capacidad_en_bits, distribución_óptima_de_entrada)
 			
 		Raises:
 			RuntimeError: Si el algoritmo de optimización no converge
+			ValueError: Si se excluyen todos los símbolos de entrada
 		"""
 		
 		# Restricción: la suma de probabilidades debe ser 1
 		constraints = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1}
 		
-		# Límites: cada probabilidad debe estar entre 0 y 1
-		bounds = [(0, 1) for _ in range(self.R)]
+		# Límites: cada probabilidad debe estar entre 0 y 1 (las entradas
+		# excluidas quedan fijas en 0)
+		excluded = set() if excluded_inputs is None else {int(i) for i in excluded_inputs}
+		if len(excluded) >= self.R:
+			raise ValueError("Debe quedar al menos un símbolo de entrada sin excluir")
+		bounds = [(0, 0) if i in excluded else (0, 1) for i in range(self.R)]
 		
 		# Punto inicial: distribución uniforme (buena aproximación inicial)
-		x0 = np.ones(self.R) / self.R
+		# salvo que se indique otro, por ejemplo el óptimo de un canal vecino
+		if x0 is None:
+			x0 = np.ones(self.R) / self.R
+		if excluded:
+			free = np.array([i not in excluded for i in range(self.R)], dtype=float)
+			x0 = np.asarray(x0, dtype=float) * free
+			x0 = x0 / x0.sum() if x0.sum() > 0 else free / free.sum()
 		
 		# Optimización usando programación cuadrática secuencial
 		result = minimize(self.objective_function, x0, 
 						 method='SLSQP', bounds=bounds, constraints=constraints)
 		
+		# Se conserva el resultado completo (iteraciones, evaluaciones, etc.)
+		self.last_result = result
+		
 		if result.success:
 			optimal_px = result.x
 			capacity = -result.fun  # Convertir de vuelta a positivo
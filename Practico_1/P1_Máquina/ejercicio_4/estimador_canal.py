@@ -0,0 +1,237 @@
+"""
+Estimación de la matriz de canal P(Y|X) a partir de registros de símbolos
+transmitidos y recibidos.
+
+Se leen en paralelo dos archivos alineados (el símbolo k del archivo de
+transmisión corresponde al símbolo k del archivo de recepción), se acumulan
+los conteos conjuntos N(X=i, Y=j) bloque a bloque y se normalizan las filas
+para obtener P(Y|X), que luego se entrega a ChannelCapacityCalculator.
+"""
+import os
+
+import numpy as np
+
+from ej_4 import ChannelCapacityCalculator
+
+
+class ChannelEstimator:
+	"""
+	Estimador de la matriz de transición de un canal discreto sin memoria.
+
+	Los conteos conjuntos se acumulan con np.bincount sobre el índice
+	combinado x * R + y, de modo que cada bloque se procesa con una única
+	operación vectorizada. La memoria usada depende solo del tamaño de bloque
+	y del tamaño del alfabeto, no del tamaño de los archivos.
+	"""
+
+	def __init__(self, R=None, dtype=np.uint8, chunk_size=1 << 20, smoothing=0.0):
+		"""
+		Inicializa el estimador.
+
+		Args:
+			R (int): Tamaño del alfabeto. Si es None se deduce del mayor
+					símbolo observado (el alfabeto crece a medida que aparecen
+					símbolos nuevos).
+			dtype: Tipo de los símbolos en los archivos (np.uint8 o np.uint16)
+			chunk_size (int): Cantidad de símbolos leídos por bloque
+			smoothing (float): Pseudo-conteo sumado a cada celda (suavizado de
+							 Laplace). 0 desactiva el suavizado.
+
+		Raises:
+			ValueError: Si el tipo de símbolo no es uint8/uint16 o si los
+					   parámetros numéricos no son válidos
+		"""
+		self.dtype = np.dtype(dtype)
+		if self.dtype not in (np.dtype(np.uint8), np.dtype(np.uint16)):
+			raise ValueError("Los símbolos deben ser bytes (uint8) o uint16")
+		if chunk_size <= 0:
+			raise ValueError("El tamaño de bloque debe ser positivo")
+		if smoothing < 0:
+			raise ValueError("El suavizado no puede ser negativo")
+
+		self.fixed_R = R is not None
+		self.R = R if R is not None else 0
+		self.chunk_size = chunk_size
+		self.smoothing = smoothing
+		self.counts = np.zeros((self.R, self.R), dtype=np.int64)
+		self.n_symbols = 0
+
+	def _grow(self, R):
+		"""
+		Amplía la matriz de conteos para un alfabeto de tamaño R conservando
+		los conteos ya acumulados.
+
+		Args:
+			R (int): Nuevo tamaño del alfabeto
+		"""
+		counts = np.zeros((R, R), dtype=np.int64)
+		counts[:self.R, :self.R] = self.counts
+		self.counts = counts
+		self.R = R
+
+	def update(self, x, y):
+		"""
+		Acumula los conteos conjuntos de un bloque de símbolos.
+
+		Args:
+			x (array-like): Símbolos transmitidos
+			y (array-like): Símbolos recibidos (misma longitud que x)
+
+		Raises:
+			ValueError: Si los bloques no tienen la misma longitud o si
+					   aparece un símbolo fuera del alfabeto fijado
+		"""
+		x = np.asarray(x, dtype=np.int64)
+		y = np.asarray(y, dtype=np.int64)
+		if x.shape != y.shape:
+			raise ValueError("Los bloques de transmisión y recepción deben tener la misma longitud")
+		if x.size == 0:
+			return
+
+		needed = int(max(x.max(), y.max())) + 1
+		if needed > self.R:
+			if self.fixed_R:
+				raise ValueError(f"Símbolo {needed - 1} fuera del alfabeto de tamaño {self.R}")
+			self._grow(needed)
+
+		# Índice conjunto (i, j) -> i * R + j y conteo de todo el bloque de una vez
+		joint = np.bincount(x * self.R + y, minlength=self.R * self.R)
+		self.counts += joint.reshape(self.R, self.R)
+		self.n_symbols += x.size
+
+	def fit_files(self, tx_path, rx_path):
+		"""
+		Recorre dos archivos de símbolos alineados acumulando los conteos.
+
+		Los archivos se leen por bloques de chunk_size símbolos, por lo que
+		pueden ser más grandes que la memoria disponible.
+
+		Args:
+			tx_path (str): Ruta del archivo de símbolos transmitidos
+			rx_path (str): Ruta del archivo de símbolos recibidos
+
+		Returns:
+			ChannelEstimator: El propio estimador (para encadenar llamadas)
+
+		Raises:
+			ValueError: Si los archivos no contienen la misma cantidad de símbolos
+		"""
+		itemsize = self.dtype.itemsize
+		tx_size = os.path.getsize(tx_path)
+		rx_size = os.path.getsize(rx_path)
+		if tx_size != rx_size or tx_size % itemsize != 0:
+			raise ValueError("Los archivos no están alineados: distinta cantidad de símbolos")
+
+		with open(tx_path, 'rb') as ftx, open(rx_path, 'rb') as frx:
+			while True:
+				x = np.fromfile(ftx, dtype=self.dtype, count=self.chunk_size)
+				y = np.fromfile(frx, dtype=self.dtype, count=self.chunk_size)
+				if x.size == 0:
+					break
+				self.update(x, y)
+		return self
+
+	def channel_matrix(self):
+		"""
+		Normaliza las filas de los conteos para obtener P(Y|X).
+
+		Las entradas nunca observadas (filas sin conteos) se completan con una
+		fila uniforme solo para que la matriz sea estocástica; no hay datos
+		sobre su salida, así que calculate_capacity las excluye de la
+		optimización (probabilidad fija en 0, ver unseen_inputs).
+
+		Returns:
+			np.array: Matriz R x R estocástica por filas
+
+		Raises:
+			ValueError: Si todavía no se acumuló ningún símbolo
+		"""
+		if self.R == 0:
+			raise ValueError("No hay símbolos acumulados para estimar el canal")
+
+		counts = self.counts + self.smoothing
+		row_sums = counts.sum(axis=1, keepdims=True)
+
+		matrix = np.full((self.R, self.R), 1.0 / self.R)
+		seen = row_sums[:, 0] > 0
+		matrix[seen] = counts[seen] / row_sums[seen]
+		return matrix
+
+	def unseen_inputs(self):
+		"""
+		Devuelve los símbolos de entrada que nunca fueron transmitidos.
+
+		Returns:
+			np.array: Índices de las filas sin conteos
+		"""
+		return np.flatnonzero(self.counts.sum(axis=1) == 0)
+
+	def calculator(self):
+		"""
+		Construye la calculadora de capacidad con la matriz estimada.
+
+		Returns:
+			ChannelCapacityCalculator: Calculadora para el canal estimado
+		"""
+		return ChannelCapacityCalculator(self.R, self.channel_matrix())
+
+	def calculate_capacity(self):
+		"""
+		Calcula la capacidad del canal estimado.
+
+		Las entradas nunca observadas quedan con probabilidad 0: su fila
+		uniforme es un relleno, no una estimación, y dejarla libre haría que
+		el optimizador la use y sobreestime la capacidad.
+
+		Returns:
+			tuple: (capacidad_en_bits, distribución_óptima_de_entrada)
+		"""
+		return self.calculator().calculate_capacity(excluded_inputs=self.unseen_inputs())
+
+
+def estimate_capacity_from_files(tx_path, rx_path, R=None, dtype=np.uint8,
+								 chunk_size=1 << 20, smoothing=0.0):
+	"""
+	Estima la matriz del canal a partir de dos archivos de símbolos y calcula
+	su capacidad.
+
+	Args:
+		tx_path (str): Ruta del archivo de símbolos transmitidos
+		rx_path (str): Ruta del archivo de símbolos recibidos
+		R (int): Tamaño del alfabeto (None para deducirlo de los datos)
+		dtype: Tipo de los símbolos (np.uint8 o np.uint16)
+		chunk_size (int): Cantidad de símbolos leídos por bloque
+		smoothing (float): Pseudo-conteo de suavizado de Laplace
+
+	Returns:
+		tuple: (capacidad_en_bits, distribución_óptima_de_entrada, matriz_estimada)
+	"""
+	estimator = ChannelEstimator(R, dtype, chunk_size, smoothing).fit_files(tx_path, rx_path)
+	capacity, optimal_px = estimator.calculate_capacity()
+	return capacity, optimal_px, estimator.channel_matrix()
+
+
+if __name__ == "__main__":
+	import tempfile
+
+	# Simula un canal binario asimétrico como el del Ejemplo 1 de ej_4.py
+	rng = np.random.default_rng(0)
+	n = 2_000_000
+	x = rng.integers(0, 2, n, dtype=np.uint8)
+	error = np.where(x == 0, 0.2, 0.25)
+	y = (x ^ (rng.random(n) < error)).astype(np.uint8)
+
+	with tempfile.TemporaryDirectory() as tmp:
+		tx_path = os.path.join(tmp, "tx.bin")
+		rx_path = os.path.join(tmp, "rx.bin")
+		x.tofile(tx_path)
+		y.tofile(rx_path)
+
+		capacity, optimal_px, matrix = estimate_capacity_from_files(
+			tx_path, rx_path, chunk_size=1 << 18)
+
+	print("Matriz estimada P(Y|X):")
+	for i, row in enumerate(matrix):
+		print(f"  X={i}: {[f'{p:.3f}' for p in row]}")
+	print(f"Probabilidades óptimas de entrada: {[f'{p:.4f}' for p in optimal_px]}")
+	print(f"Capacidad estimada: {capacity:.4f} bits")
@@ -0,0 +1,588 @@
+"""
+Formato columnar para los registros de personas.
+
+En lugar de guardar un registro por fila, cada campo se guarda en su propio
+archivo dentro de un directorio ("columnar/"):
+
+	- meta.json: cantidad de registros y descripción de cada columna
+	- Columnas de texto: <col>.off (n + 1 offsets uint64) y <col>.bin (bytes
+	  UTF-8 concatenados); el valor i ocupa los bytes [off[i], off[i + 1])
+	- Columnas con diccionario: <col>.dic.off / <col>.dic.bin con los valores
+	  distintos y <col>.cod con el código de cada registro (uint8/16/32)
+	- dni.col: DNIs como enteros uint32 empaquetados
+	- campos.col: el byte de campos S/N de cada registro
+
+La dirección se separa en calle y localidad (último ", "), porque la
+localidad se repite mucho y se comprime muy bien con diccionario. Cada columna
+de texto usa diccionario automáticamente cuando tiene pocos valores distintos.
+
+Como cada columna es un archivo aparte, leer solo los DNIs no toca el resto.
+"""
+import json
+import mmap
+import os
+from itertools import islice
+
+import numpy as np
+
+from almacenamiento_fijo import codificar_texto
+from ej_5 import Persona, ruta_archivo
+from indice_dni import dnis_a_enteros
+
+# Una columna usa diccionario si sus valores distintos no superan esta fracción
+FRACCION_DICCIONARIO = 0.5
+
+# Registros por bloque al escribir y al recorrer las columnas
+TAMANO_BLOQUE = 1 << 16
+
+# Valores distintos a partir de los cuales una columna deja de intentar el
+# diccionario durante la escritura (acota la memoria usada)
+LIMITE_DICCIONARIO = 1 << 18
+
+ARCHIVO_META = "meta.json"
+
+
+def separar_direccion(direccion):
+	"""
+	Separa una dirección en calle y localidad en el último ", ".
+
+	La separación es reversible: si no hay localidad (no hay ", " o lo que
+	sigue está vacío) la dirección completa queda como calle.
+
+	Args:
+		direccion (str): Dirección completa, por ejemplo "Calle Falsa 10, Ciudad"
+
+	Returns:
+		tuple: (calle, localidad)
+	"""
+	calle, separador, localidad = direccion.rpartition(', ')
+	if not separador or not localidad:
+		return direccion, ''
+	return calle, localidad
+
+def unir_direccion(calle, localidad):
+	"""Operación inversa de separar_direccion."""
+	return f"{calle}, {localidad}" if localidad else calle
+
+def _tipo_codigos(cantidad):
+	"""Tipo entero sin signo más chico capaz de representar 'cantidad' códigos."""
+	for tipo in (np.uint8, np.uint16, np.uint32):
+		if cantidad <= np.iinfo(tipo).max + 1:
+			return np.dtype(tipo)
+	return np.dtype(np.uint64)
+
+class _EscritorTextos:
+	"""
+	Escribe textos como offsets + bytes concatenados, bloque a bloque.
+
+	Crea <ruta_base>.off y <ruta_base>.bin; solo mantiene en memoria el
+	bloque que se está escribiendo.
+	"""
+
+	def __init__(self, ruta_base):
+		self._offsets = open(ruta_base + ".off", 'wb')
+		self._datos = open(ruta_base + ".bin", 'wb')
+		self._total = 0
+		np.zeros(1, dtype='<u8').tofile(self._offsets)
+
+	def agregar(self, valores):
+		"""
+		Args:
+			valores (list): Strings a agregar al final
+		"""
+		codificados = [v.encode('utf-8') for v in valores]
+		largos = np.fromiter(map(len, codificados), dtype=np.uint64, count=len(codificados))
+		(np.cumsum(largos) + np.uint64(self._total)).astype('<u8').tofile(self._offsets)
+		self._total += int(largos.sum())
+		self._datos.write(b''.join(codificados))
+
+	def cerrar(self):
+		self._offsets.close()
+		self._datos.close()
+
+
+class _EscritorColumnaTexto:
+	"""
+	Escribe una columna de texto por bloques eligiendo entre formato plano o diccionario.
+
+	Mientras el diccionario sea conveniente se escriben solo los códigos
+	(uint32, en <col>.cod.tmp). Los códigos ya escritos se convierten a texto
+	plano, releyéndolos por bloques, si el diccionario supera
+	LIMITE_DICCIONARIO valores, si después de un bloque completo ya no cumple
+	FRACCION_DICCIONARIO (columnas casi sin repetidos, como los nombres) o si
+	no la cumple al cerrar.
+	"""
+
+	def __init__(self, directorio, nombre):
+		self.ruta_base = os.path.join(directorio, nombre)
+		self.registros = 0
+		self._diccionario = {}
+		self._codigos = open(self.ruta_base + ".cod.tmp", 'wb')
+		self._plano = None
+
+	def agregar(self, valores):
+		"""
+		Args:
+			valores (list): Strings a agregar al final de la columna
+		"""
+		self.registros += len(valores)
+		if self._plano is not None:
+			self._plano.agregar(valores)
+			return
+		diccionario = self._diccionario
+		codigos = [diccionario.setdefault(v, len(diccionario)) for v in valores]
+		np.asarray(codigos, dtype='<u4').tofile(self._codigos)
+		if (len(diccionario) > LIMITE_DICCIONARIO
+				or (self.registros >= TAMANO_BLOQUE
+					and len(diccionario) > FRACCION_DICCIONARIO * self.registros)):
+			self._pasar_a_plano()
+
+	def _pasar_a_plano(self):
+		"""Reescribe como texto plano los códigos escritos hasta ahora."""
+		self._codigos.close()
+		valores = list(self._diccionario)
+		self._diccionario = None
+		self._plano = _EscritorTextos(self.ruta_base)
+		temporal = self.ruta_base + ".cod.tmp"
+		with open(temporal, 'rb') as f:
+			while True:
+				bloque = np.fromfile(f, dtype='<u4', count=TAMANO_BLOQUE)
+				if not len(bloque):
+					break
+				self._plano.agregar([valores[c] for c in bloque.tolist()])
+		os.remove(temporal)
+
+	def cerrar(self):
+		"""
+		Termina de escribir la columna.
+
+		Returns:
+			dict: Descripción de la columna para meta.json
+		"""
+		if self._plano is None and (not self.registros
+									or len(self._diccionario) > FRACCION_DICCIONARIO * self.registros):
+			self._pasar_a_plano()
+		if self._plano is not None:
+			self._plano.cerrar()
+			return {'tipo': 'texto'}
+
+		self._codigos.close()
+		cantidad = len(self._diccionario)
+		tipo = _tipo_codigos(cantidad)
+		textos = _EscritorTextos(self.ruta_base + ".dic")
+		textos.agregar(list(self._diccionario))
+		textos.cerrar()
+		self._diccionario = None
+
+		# Los códigos temporales son uint32; se achican al tipo definitivo
+		temporal = self.ruta_base + ".cod.tmp"
+		with open(temporal, 'rb') as origen, open(self.ruta_base + ".cod", 'wb') as destino:
+			while True:
+				bloque = np.fromfile(origen, dtype='<u4', count=TAMANO_BLOQUE)
+				if not len(bloque):
+					break
+				bloque.astype(tipo).tofile(destino)
+		os.remove(temporal)
+		return {'tipo': 'diccionario', 'codigos': tipo.str, 'valores': cantidad}
+
+
+class _EscritorDNI:
+	"""
+	Escribe la columna de DNIs por bloques.
+
+	Los DNIs se guardan como enteros uint32 mientras todos sean numéricos, sin
+	ceros a la izquierda (para que la conversión sea reversible), de hasta 10
+	dígitos y quepan en uint32. Con el primer bloque que no cumple, lo ya escrito se convierte a
+	una columna de texto y se sigue como texto.
+	"""
+
+	def __init__(self, directorio):
+		self.directorio = directorio
+		self.registros = 0
+		self._ruta = os.path.join(directorio, 'dni.col')
+		self._enteros = open(self._ruta, 'wb')
+		self._texto = None
+
+	def agregar(self, dnis):
+		"""
+		Args:
+			dnis (list): DNIs (como string) a agregar al final
+		"""
+		self.registros += len(dnis)
+		# codificar_texto recorta a 10 bytes: un DNI más largo pasaría por otro
+		if self._texto is None and max(map(len, dnis), default=0) > 10:
+			self._pasar_a_texto()
+		if self._texto is None:
+			crudos = codificar_texto(dnis, 10)
+			valores, validos = dnis_a_enteros(crudos)
+			digitos = crudos.view(np.uint8).reshape(-1, 10)
+			ceros_izquierda = (digitos[:, 0] == ord('0')) & (digitos[:, 1] != 0)
+			if (validos.all() and not ceros_izquierda.any()
+					and (valores <= np.iinfo(np.uint32).max).all()):
+				valores.astype('<u4').tofile(self._enteros)
+				return
+			self._pasar_a_texto()
+		self._texto.agregar(dnis)
+
+	def _pasar_a_texto(self):
+		"""Reescribe como columna de texto los enteros escritos hasta ahora."""
+		self._enteros.close()
+		self._texto = _EscritorColumnaTexto(self.directorio, 'dni')
+		with open(self._ruta, 'rb') as f:
+			while True:
+				bloque = np.fromfile(f, dtype='<u4', count=TAMANO_BLOQUE)
+				if not len(bloque):
+					break
+				self._texto.agregar(bloque.astype(str).tolist())
+		os.remove(self._ruta)
+
+	def cerrar(self):
+		"""
+		Returns:
+			dict: Descripción de la columna para meta.json
+		"""
+		if self._texto is None and not self.registros:
+			self._pasar_a_texto()
+		if self._texto is not None:
+			return self._texto.cerrar()
+		self._enteros.close()
+		return {'tipo': 'entero', 'dtype': '<u4'}
+
+
+def _bloques(filas):
+	"""
+	Agrupa filas (nombre, direccion, dni, campos) en bloques de TAMANO_BLOQUE.
+
+	Yields:
+		tuple: (nombres, direcciones, dnis, campos) como listas
+	"""
+	filas = iter(filas)
+	while True:
+		bloque = list(islice(filas, TAMANO_BLOQUE))
+		if not bloque:
+			return
+		yield tuple(map(list, zip(*bloque)))
+
+def _limpiar_columnas(directorio):
+	"""Borra los archivos de columnas de una escritura anterior en el directorio."""
+	for archivo in os.listdir(directorio):
+		if archivo.split('.')[0] in ArchivoColumnar.COLUMNAS:
+			os.remove(os.path.join(directorio, archivo))
+
+def _guardar_bloques(bloques, nombre_directorio):
+	"""
+	Escribe todas las columnas a partir de bloques de registros.
+
+	La memoria usada depende del tamaño del bloque y de los diccionarios
+	(acotados por LIMITE_DICCIONARIO), no de la cantidad de registros.
+
+	Args:
+		bloques (iterable): Tuplas (nombres, direcciones, dnis, campos)
+		nombre_directorio (str): Directorio donde se crean las columnas
+	"""
+	directorio = ruta_archivo(nombre_directorio)
+	os.makedirs(directorio, exist_ok=True)
+	_limpiar_columnas(directorio)
+
+	textos = {nombre: _EscritorColumnaTexto(directorio, nombre)
+			  for nombre in ('nombre', 'calle', 'localidad')}
+	dni = _EscritorDNI(directorio)
+	registros = 0
+	with open(os.path.join(directorio, 'campos.col'), 'wb') as archivo_campos:
+		for nombres, direcciones, dnis, campos in bloques:
+			calles, localidades = zip(*map(separar_direccion, direcciones))
+			textos['nombre'].agregar(nombres)
+			textos['calle'].agregar(list(calles))
+			textos['localidad'].agregar(list(localidades))
+			dni.agregar(dnis)
+			np.asarray(campos, dtype=np.uint8).tofile(archivo_campos)
+			registros += len(nombres)
+
+	columnas = {nombre: escritor.cerrar() for nombre, escritor in textos.items()}
+	columnas['dni'] = dni.cerrar()
+	columnas['campos'] = {'tipo': 'entero', 'dtype': 'u1'}
+
+	with open(os.path.join(directorio, ARCHIVO_META), 'w', encoding='utf-8') as f:
+		json.dump({'registros': registros, 'columnas': columnas}, f, indent=2)
+
+def guardar_columnar_columnas(nombres, direcciones, dnis, campos, nombre_directorio="columnar"):
+	"""
+	Guarda los registros en formato columnar a partir de columnas.
+
+	Las columnas pueden ser iterables (por ejemplo generadores): se recorren
+	juntas y se escriben por bloques.
+
+	Args:
+		nombres (iterable): Apellido y nombre de cada persona
+		direcciones (iterable): Dirección de cada persona
+		dnis (iterable): DNI de cada persona (como string)
+		campos (iterable): Byte de campos S/N de cada persona (uint8)
+		nombre_directorio (str): Directorio donde se crean las columnas
+	"""
+	_guardar_bloques(_bloques(zip(nombres, direcciones, dnis, campos)), nombre_directorio)
+
+def guardar_columnar(personas, nombre_directorio="columnar"):
+	"""
+	Guarda personas en formato columnar.
+
+	Las personas se consumen por bloques, así que se puede pasar un generador
+	(por ejemplo leer_longitud_variable) sin cargar todos los registros.
+
+	Args:
+		personas (iterable): Objetos Persona
+		nombre_directorio (str): Directorio donde se crean las columnas
+	"""
+	_guardar_bloques(_bloques((p.nombre, p.direccion, p.dni, p.campos) for p in personas),
+					 nombre_directorio)
+
+
+class ColumnaTexto:
+	"""
+	Columna de texto (plana o con diccionario) mapeada en memoria.
+
+	Los valores se decodifican solo al accederlos.
+	"""
+
+	def __init__(self, ruta_base, descripcion, registros):
+		self.ruta_base = ruta_base
+		self._descripcion = descripcion
+		self._diccionario = None
+		if descripcion['tipo'] == 'diccionario':
+			self._codigos = _mapear(ruta_base + ".cod", descripcion['codigos'], registros)
+			self._diccionario = ColumnaTexto(ruta_base + ".dic", {'tipo': 'texto'},
+											 descripcion['valores']).todos()
+		else:
+			self._offsets = _mapear(ruta_base + ".off", '<u8', registros + 1)
+			with open(ruta_base + ".bin", 'rb') as f:
+				# mmap no admite archivos vacíos
+				vacio = os.fstat(f.fileno()).st_size == 0
+				self._datos = b'' if vacio else mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+	def __len__(self):
+		if self._diccionario is not None:
+			return len(self._codigos)
+		return len(self._offsets) - 1
+
+	def __getitem__(self, i):
+		if self._diccionario is not None:
+			return self._diccionario[self._codigos[i]]
+		return self._datos[self._offsets[i]:self._offsets[i + 1]].decode('utf-8')
+
+	def rango(self, inicio, fin):
+		"""
+		Decodifica los valores [inicio, fin) de la columna.
+
+		Args:
+			inicio (int): Primer registro
+			fin (int): Registro siguiente al último
+
+		Returns:
+			list: Lista de strings
+		"""
+		if self._diccionario is not None:
+			return [self._diccionario[c] for c in self._codigos[inicio:fin].tolist()]
+		offsets = self._offsets[inicio:fin + 1].tolist()
+		datos = self._datos
+		return [datos[a:b].decode('utf-8') for a, b in zip(offsets, offsets[1:])]
+
+	def todos(self):
+		"""
+		Decodifica todos los valores de la columna.
+
+		Returns:
+			list: Lista de strings
+		"""
+		return self.rango(0, len(self))
+
+	def bloques(self, tamano=TAMANO_BLOQUE):
+		"""
+		Recorre la columna en orden, de a 'tamano' valores.
+
+		A diferencia de rango, lee los archivos secuencialmente en lugar de
+		usar el mapeo, así las páginas recorridas no se acumulan en la memoria
+		del proceso.
+
+		Yields:
+			list: Strings de cada bloque
+		"""
+		if self._diccionario is not None:
+			diccionario = self._diccionario
+			for codigos in _bloques_numericos(self.ruta_base + ".cod", self._descripcion['codigos'], tamano):
+				yield [diccionario[c] for c in codigos.tolist()]
+			return
+
+		with open(self.ruta_base + ".off", 'rb') as archivo_offsets, \
+				open(self.ruta_base + ".bin", 'rb') as archivo_datos:
+			anterior = int(np.fromfile(archivo_offsets, dtype='<u8', count=1)[0])
+			while True:
+				offsets = np.fromfile(archivo_offsets, dtype='<u8', count=tamano)
+				if not len(offsets):
+					return
+				datos = archivo_datos.read(int(offsets[-1]) - anterior)
+				fines = (offsets - np.uint64(anterior)).tolist()
+				yield [datos[a:b].decode('utf-8') for a, b in zip([0] + fines[:-1], fines)]
+				anterior = int(offsets[-1])
+
+
+def _bloques_numericos(ruta, dtype, tamano=TAMANO_BLOQUE):
+	"""Lee secuencialmente un archivo de columna numérica de a 'tamano' valores."""
+	with open(ruta, 'rb') as f:
+		while True:
+			bloque = np.fromfile(f, dtype=dtype, count=tamano)
+			if not len(bloque):
+				return
+			yield bloque
+
+def _mapear(ruta, dtype, cantidad):
+	"""Mapea un archivo de columna numérica (o devuelve un array vacío)."""
+	if cantidad == 0:
+		return np.empty(0, dtype=dtype)
+	return np.memmap(ruta, dtype=dtype, mode='r', shape=(cantidad,))
+
+
+class ArchivoColumnar:
+	"""
+	Lectura del formato columnar con proyección de columnas.
+
+	Cada columna se abre recién cuando se la pide, de modo que una consulta
+	sobre los DNIs no lee nombres ni direcciones.
+	"""
+
+	COLUMNAS = ('nombre', 'calle', 'localidad', 'dni', 'campos')
+
+	def __init__(self, nombre_directorio="columnar"):
+		"""
+		Args:
+			nombre_directorio (str): Directorio con las columnas
+		"""
+		self.directorio = ruta_archivo(nombre_directorio)
+		with open(os.path.join(self.directorio, ARCHIVO_META), encoding='utf-8') as f:
+			self.meta = json.load(f)
+		self._abiertas = {}
+
+	def __len__(self):
+		return self.meta['registros']
+
+	def columna(self, nombre):
+		"""
+		Devuelve una columna, abriéndola solo la primera vez.
+
+		Args:
+			nombre (str): 'nombre', 'calle', 'localidad', 'direccion', 'dni' o 'campos'
+
+		Returns:
+			np.array or ColumnaTexto or list: Columna solicitada (las numéricas
+			como array mapeado; 'direccion' como lista reconstruida)
+		"""
+		if nombre == 'direccion':
+			return [unir_direccion(c, l) for c, l in
+					zip(self.columna('calle').todos(), self.columna('localidad').todos())]
+		if nombre not in self.COLUMNAS:
+			raise ValueError(f"Columna desconocida: {nombre}")
+
+		if nombre not in self._abiertas:
+			descripcion = self.meta['columnas'][nombre]
+			ruta_base = os.path.join(self.directorio, nombre)
+			if descripcion['tipo'] == 'entero':
+				self._abiertas[nombre] = _mapear(ruta_base + ".col", descripcion['dtype'], len(self))
+			else:
+				self._abiertas[nombre] = ColumnaTexto(ruta_base, descripcion, len(self))
+		return self._abiertas[nombre]
+
+	def leer_columnas(self, nombres):
+		"""
+		Proyección: lee solo las columnas indicadas.
+
+		Args:
+			nombres (list): Nombres de columnas
+
+		Returns:
+			dict: Columna -> valores
+		"""
+		return {nombre: self.columna(nombre) for nombre in nombres}
+
+	def obtener(self, i):
+		"""
+		Reconstruye la persona i leyendo un valor de cada columna.
+
+		Args:
+			i (int): Número de registro
+
+		Returns:
+			Persona: Persona del registro i
+		"""
+		if i < 0 or i >= len(self):
+			raise IndexError(f"Registro {i} fuera de rango")
+		dni = self.columna('dni')[i]
+		campos = int(self.columna('campos')[i])
+		return Persona.desde_campos(self.columna('nombre')[i],
+									unir_direccion(self.columna('calle')[i], self.columna('localidad')[i]),
+									str(dni), campos)
+
+	def _bloques_columna(self, nombre):
+		"""
+		Recorre una columna secuencialmente de a TAMANO_BLOQUE valores.
+
+		Yields:
+			list: Valores de cada bloque (los DNIs enteros como string)
+		"""
+		columna = self.columna(nombre)
+		if isinstance(columna, ColumnaTexto):
+			yield from columna.bloques()
+			return
+		descripcion = self.meta['columnas'][nombre]
+		for bloque in _bloques_numericos(os.path.join(self.directorio, nombre + ".col"), descripcion['dtype']):
+			yield bloque.astype(str).tolist() if nombre == 'dni' else bloque.tolist()
+
+	def personas(self):
+		"""
+		Recorre todos los registros reconstruyendo cada Persona.
+
+		Las columnas se leen secuencialmente y se decodifican de a
+		TAMANO_BLOQUE registros, así que la memoria no crece con el tamaño
+		del archivo.
+
+		Yields:
+			Persona: Cada registro, en orden
+		"""
+		bloques = zip(*(self._bloques_columna(c) for c in ('nombre', 'calle', 'localidad', 'dni', 'campos')))
+		for nombres, calles, localidades, dnis, campos in bloques:
+			for nombre, calle, localidad, dni, c in zip(nombres, calles, localidades, dnis, campos):
+				yield Persona.desde_campos(nombre, unir_direccion(calle, localidad), dni, c)
+
+	def tamano(self):
+		"""
+		Tamaño total en disco del formato (todas las columnas y meta.json).
+
+		Returns:
+			int: Bytes ocupados
+		"""
+		return sum(os.path.getsize(os.path.join(self.directorio, f)) for f in os.listdir(self.directorio))
+
+	def tamano_columnas(self):
+		"""
+		Tamaño en disco de cada columna.
+
+		Returns:
+			dict: Columna -> bytes
+		"""
+		tamanos = {}
+		for archivo in os.listdir(self.directorio):
+			columna = archivo.split('.')[0]
+			tamanos[columna] = tamanos.get(columna, 0) + os.path.getsize(os.path.join(self.directorio, archivo))
+		return tamanos
+
+
+if __name__ == "__main__":
+	from almacenamiento_variable import leer_longitud_variable
+
+	# Convierte el variable.dat generado por ej_5.py al formato columnar
+	guardar_columnar(leer_longitud_variable("variable.dat"), "columnar")
+
+	archivo = ArchivoColumnar("columnar")
+	print(f"Registros: {len(archivo)}  Tamaño total: {archivo.tamano():,} bytes")
+	for columna, tamano in sorted(archivo.tamano_columnas().items()):
+		print(f"  {columna:10s} {tamano:6,} bytes")
+	print(f"DNIs (proyección): {archivo.columna('dni')[:5].tolist()} ...")
+	p = archivo.obtener(3)
+	print(f"Registro 3: {p.nombre} | {p.direccion} | {p.dni} | {p.campos_sn}")
@@ -0,0 +1,356 @@
+"""
+Lectura y escritura masiva del archivo de longitud fija ("fijos.dat").
+
+Usa un dtype estructurado de NumPy con exactamente el mismo layout que el
+formato struct '50s 60s 10s B' de guardar_longitud_fija, de modo que ambos
+caminos producen y leen archivos idénticos. La escritura de millones de
+registros se hace con una sola llamada vectorizada y la lectura mediante
+np.memmap, sin decodificar registro por registro.
+"""
+import os
+import struct
+
+import numpy as np
+
+from ej_5 import FORMATO_FIJO, MARCA_BORRADO, Persona, ruta_archivo
+
+# Estructura del registro (sin alineación, igual que '50s 60s 10s B'):
+# - nombre: 50 bytes, direccion: 60 bytes, dni: 10 bytes (padded con nulls)
+# - campos: 1 byte con los 8 campos S/N (bit i = campo i)
+DTYPE_REGISTRO = np.dtype([
+	('nombre', 'S50'),
+	('direccion', 'S60'),
+	('dni', 'S10'),
+	('campos', 'u1'),
+])
+
+# Tamaño total del registro: 50 + 60 + 10 + 1 = 121 bytes
+TAMANO_REGISTRO = DTYPE_REGISTRO.itemsize
+
+# Formato struct equivalente, para decodificar registros sueltos
+FORMATO_REGISTRO = '50s 60s 10s B'
+
+
+def empaquetar_campos(campos_sn):
+	"""
+	Empaqueta los 8 campos S/N de cada registro en un byte.
+
+	Args:
+		campos_sn (array-like): Matriz n x 8 de booleanos
+
+	Returns:
+		np.array: Vector de n bytes (uint8), bit i = campo i
+	"""
+	campos_sn = np.asarray(campos_sn, dtype=bool).reshape(-1, 8)
+	# bitorder='little' respeta la convención de guardar_longitud_fija (campo i -> 1 << i)
+	return np.packbits(campos_sn, axis=1, bitorder='little').reshape(-1)
+
+def desempaquetar_campos(campos):
+	"""
+	Desempaqueta los bytes de campos S/N en una matriz de booleanos.
+
+	Args:
+		campos (array-like): Vector de n bytes (uint8)
+
+	Returns:
+		np.array: Matriz n x 8 de booleanos
+	"""
+	campos = np.asarray(campos, dtype=np.uint8).reshape(-1, 1)
+	return np.unpackbits(campos, axis=1, bitorder='little').astype(bool)
+
+def codificar_texto(valores, ancho):
+	"""
+	Convierte una secuencia de strings en un array de bytes de ancho fijo.
+
+	Los textos se codifican en UTF-8 y se truncan a 'ancho' bytes, igual que
+	el formato struct 'Ns'. Si los valores ya son bytes no se recodifican.
+
+	Los textos ASCII (la gran mayoría) se convierten copiando los code points
+	UCS-4 del array NumPy directamente a bytes; solo los registros con
+	caracteres no ASCII pasan por str.encode.
+
+	Args:
+		valores (array-like): Strings (str o bytes)
+		ancho (int): Cantidad de bytes del campo
+
+	Returns:
+		np.array: Array de tipo S<ancho>
+	"""
+	valores = np.asarray(valores)
+	if valores.dtype.kind != 'U':
+		return valores.astype(f'S{ancho}')
+
+	valores = np.ascontiguousarray(valores.reshape(-1))
+	n = len(valores)
+	# Cada carácter de un array U ocupa 4 bytes (code point UCS-4)
+	puntos = valores.view(np.uint32).reshape(n, -1)
+	w = min(ancho, puntos.shape[1])
+
+	salida = np.zeros((n, ancho), dtype=np.uint8)
+	salida[:, :w] = puntos[:, :w]
+	resultado = salida.view(f'S{ancho}').reshape(n)
+
+	# Los registros con caracteres no ASCII se codifican en UTF-8 uno a uno
+	no_ascii = np.flatnonzero((puntos[:, :w] >= 0x80).any(axis=1))
+	if no_ascii.size:
+		resultado[no_ascii] = [v.encode('utf-8') for v in valores[no_ascii].tolist()]
+	return resultado
+
+def decodificar_texto(valores):
+	"""
+	Convierte un array de bytes de ancho fijo en strings.
+
+	Los nulls de relleno se eliminan automáticamente (tipo S de NumPy).
+	Un carácter multibyte truncado por el ancho del campo se descarta.
+
+	Args:
+		valores (np.array): Array de tipo S
+
+	Returns:
+		np.array: Array de strings (tipo U)
+	"""
+	return np.char.decode(np.asarray(valores), 'utf-8', errors='ignore')
+
+def crear_registros(nombres, direcciones, dnis, campos_sn):
+	"""
+	Construye el array estructurado de registros a partir de columnas.
+
+	Args:
+		nombres (array-like): Apellido y nombre de cada persona
+		direcciones (array-like): Dirección de cada persona
+		dnis (array-like): DNI de cada persona (como string)
+		campos_sn (array-like): Matriz n x 8 de booleanos, o vector de n
+							   bytes ya empaquetados
+
+	Returns:
+		np.array: Array estructurado con dtype DTYPE_REGISTRO
+	"""
+	n = len(nombres)
+	registros = np.empty(n, dtype=DTYPE_REGISTRO)
+	registros['nombre'] = codificar_texto(nombres, 50)
+	registros['direccion'] = codificar_texto(direcciones, 60)
+	registros['dni'] = codificar_texto(dnis, 10)
+
+	campos_sn = np.asarray(campos_sn)
+	if campos_sn.ndim == 1 and campos_sn.dtype == np.uint8:
+		registros['campos'] = campos_sn
+	else:
+		registros['campos'] = empaquetar_campos(campos_sn)
+	return registros
+
+def personas_a_registros(personas):
+	"""
+	Convierte una lista de objetos Persona en el array estructurado.
+
+	Args:
+		personas (list): Lista de objetos Persona
+
+	Returns:
+		np.array: Array estructurado con dtype DTYPE_REGISTRO
+	"""
+	return crear_registros(
+		[p.nombre for p in personas],
+		[p.direccion for p in personas],
+		[p.dni for p in personas],
+		np.array([p.campos for p in personas], dtype=np.uint8),
+	)
+
+def escribir_registros(registros, nombre_archivo="fijos.dat", agregar=False):
+	"""
+	Escribe un array estructurado de registros en una sola operación.
+
+	Args:
+		registros (np.array): Array con dtype DTYPE_REGISTRO
+		nombre_archivo (str): Nombre del archivo de longitud fija
+		agregar (bool): Si es True agrega al final en lugar de sobrescribir
+	"""
+	registros = np.ascontiguousarray(registros, dtype=DTYPE_REGISTRO)
+	with open(ruta_archivo(nombre_archivo), 'ab' if agregar else 'wb') as f:
+		registros.tofile(f)
+
+def guardar_fijos_masivo(nombres, direcciones, dnis, campos_sn, nombre_archivo="fijos.dat"):
+	"""
+	Versión vectorizada de guardar_longitud_fija que recibe columnas.
+
+	Args:
+		nombres (array-like): Apellido y nombre de cada persona
+		direcciones (array-like): Dirección de cada persona
+		dnis (array-like): DNI de cada persona
+		campos_sn (array-like): Matriz n x 8 de booleanos o bytes empaquetados
+		nombre_archivo (str): Nombre del archivo donde guardar los datos
+	"""
+	escribir_registros(crear_registros(nombres, direcciones, dnis, campos_sn), nombre_archivo)
+
+def leer_fijos(nombre_archivo="fijos.dat", modo='r'):
+	"""
+	Mapea el archivo de longitud fija en memoria como array estructurado.
+
+	No se lee nada del disco hasta que se accede a los datos, por lo que
+	abrir un archivo de millones de registros es inmediato.
+
+	Args:
+		nombre_archivo (str): Nombre del archivo de longitud fija
+		modo (str): Modo de np.memmap ('r' solo lectura, 'r+' lectura/escritura)
+
+	Returns:
+		np.memmap: Array estructurado con dtype DTYPE_REGISTRO
+
+	Raises:
+		ValueError: Si el tamaño del archivo no es múltiplo de 121 bytes
+	"""
+	ruta_completa = ruta_archivo(nombre_archivo)
+	tamano = os.path.getsize(ruta_completa)
+	if tamano % TAMANO_REGISTRO != 0:
+		raise ValueError(f"El archivo no contiene registros completos de {TAMANO_REGISTRO} bytes")
+	if tamano == 0:
+		# np.memmap no admite archivos vacíos
+		return np.empty(0, dtype=DTYPE_REGISTRO)
+	return np.memmap(ruta_completa, dtype=DTYPE_REGISTRO, mode=modo)
+
+def codificar_registro(persona):
+	"""
+	Codifica una Persona en los 121 bytes de un registro.
+
+	Args:
+		persona (Persona): Persona a codificar
+
+	Returns:
+		bytes: Registro completo en formato '50s 60s 10s B'
+	"""
+	return FORMATO_FIJO.pack(persona.nombre.encode('utf-8'),
+							 persona.direccion.encode('utf-8'),
+							 persona.dni.encode('utf-8'),
+							 persona.campos)
+
+def esta_borrado(datos):
+	"""Indica si los bytes de un registro corresponden a un registro borrado."""
+	return datos[0] == MARCA_BORRADO
+
+def decodificar_registro(datos):
+	"""
+	Decodifica los 121 bytes de un registro en un objeto Persona.
+
+	Args:
+		datos (bytes): Registro completo en formato '50s 60s 10s B'
+
+	Returns:
+		Persona: Persona reconstruida a partir del registro
+	"""
+	nombre, direccion, dni, campos = struct.unpack(FORMATO_REGISTRO, datos)
+	return Persona.desde_campos(
+		nombre.rstrip(b'\0').decode('utf-8', errors='ignore'),
+		direccion.rstrip(b'\0').decode('utf-8', errors='ignore'),
+		dni.rstrip(b'\0').decode('utf-8', errors='ignore'),
+		campos,
+	)
+
+
+class ArchivoFijo:
+	"""
+	Acceso directo por número de registro al archivo de longitud fija.
+
+	Como todos los registros miden 121 bytes, el registro i comienza en el
+	byte i * 121 y se lee con un único pread, sin recorrer el archivo.
+	"""
+
+	# Modo de apertura del archivo (las subclases que escriben usan 'r+b')
+	_modo = 'rb'
+
+	def __init__(self, nombre_archivo="fijos.dat"):
+		"""
+		Abre el archivo de longitud fija para acceso directo.
+
+		Args:
+			nombre_archivo (str): Nombre del archivo de longitud fija
+		"""
+		self.ruta = ruta_archivo(nombre_archivo)
+		self._archivo = open(self.ruta, self._modo)
+		self._fd = self._archivo.fileno()
+
+	def __len__(self):
+		"""Cantidad de registros del archivo."""
+		return os.fstat(self._fd).st_size // TAMANO_REGISTRO
+
+	def _pread(self, cantidad, posicion):
+		"""
+		Lee 'cantidad' bytes desde 'posicion' sin mover el cursor del archivo.
+		En sistemas sin os.pread (Windows) se usa seek + read.
+		"""
+		if hasattr(os, 'pread'):
+			return os.pread(self._fd, cantidad, posicion)
+		self._archivo.seek(posicion)
+		return self._archivo.read(cantidad)
+
+	def obtener_bytes(self, i):
+		"""
+		Lee los bytes crudos del registro i.
+
+		Args:
+			i (int): Número de registro (desde 0)
+
+		Returns:
+			bytes: Los 121 bytes del registro
+
+		Raises:
+			IndexError: Si el registro no existe
+		"""
+		if i < 0 or i >= len(self):
+			raise IndexError(f"Registro {i} fuera de rango")
+		return self._pread(TAMANO_REGISTRO, i * TAMANO_REGISTRO)
+
+	def obtener(self, i):
+		"""
+		Lee y decodifica el registro i.
+
+		Args:
+			i (int): Número de registro (desde 0)
+
+		Returns:
+			Persona: Persona almacenada en el registro i, o None si el
+					 registro fue borrado
+		"""
+		datos = self.obtener_bytes(i)
+		if esta_borrado(datos):
+			return None
+		return decodificar_registro(datos)
+
+	__getitem__ = obtener
+
+	def close(self):
+		"""Cierra el archivo."""
+		self._archivo.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+if __name__ == "__main__":
+	import tempfile
+	import time
+
+	n = 10_000_000
+	rng = np.random.default_rng(0)
+	print(f"Generando {n:,} registros...")
+	ids = np.arange(n).astype('U8')
+	nombres = np.char.add("Apellido Nombre ", ids)
+	direcciones = np.char.add("Calle Falsa ", ids)
+	dnis = np.char.add("3", np.char.zfill(ids, 7))
+	campos = rng.integers(0, 256, n, dtype=np.uint8)
+
+	with tempfile.TemporaryDirectory() as tmp:
+		ruta = os.path.join(tmp, "fijos.dat")
+
+		inicio = time.perf_counter()
+		guardar_fijos_masivo(nombres, direcciones, dnis, campos, ruta)
+		print(f"Escritura: {time.perf_counter() - inicio:.2f} s")
+
+		inicio = time.perf_counter()
+		registros = leer_fijos(ruta)
+		total_dni = np.count_nonzero(registros['dni'])
+		campos_sn = desempaquetar_campos(registros['campos'])
+		print(f"Lectura: {time.perf_counter() - inicio:.2f} s ({total_dni:,} DNIs, "
+			  f"{campos_sn.sum():,} campos S)")
+		del registros
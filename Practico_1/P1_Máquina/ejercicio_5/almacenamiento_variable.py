@@ -0,0 +1,258 @@
+"""
+Lectura del archivo de longitud variable ("variable.dat").
+
+Reexporta el lector secuencial de ej_5, que recorre el archivo por bloques
+grandes, y agrega un índice de posiciones (offset de inicio de cada línea)
+que permite leer el registro i directamente, con una sola lectura, sin
+recorrer el archivo.
+
+El índice se guarda junto al archivo de datos ("variable.dat.off"):
+	- Cabecera de 40 bytes: firma 'IOFF', versión, tamaño y fecha de
+	  modificación (st_mtime_ns) del archivo indexado, CRC32 de la última
+	  línea indexada y cantidad de registros
+	- Offsets: n + 1 enteros uint64, el inicio de cada una de las n líneas
+	  seguido del tamaño del archivo, de modo que el registro i ocupa los
+	  bytes [offsets[i], offsets[i + 1])
+
+Las líneas vacías se saltean, igual que en leer_longitud_variable, así que el
+número de registro coincide en los dos caminos. Los saltos de línea de más
+quedan al final del registro anterior y parsear_linea los descarta.
+"""
+import mmap
+import os
+import zlib
+
+import numpy as np
+
+# El parseo de líneas y el lector secuencial viven en ej_5 (sin numpy)
+from ej_5 import CAMPOS_A_SN, leer_longitud_variable, parsear_linea, ruta_archivo
+
+DTYPE_CABECERA = np.dtype([
+	('firma', 'S4'),
+	('version', '<u4'),
+	('tamano', '<u8'),     # Tamaño del archivo de datos indexado
+	('mtime', '<i8'),      # st_mtime_ns del archivo de datos indexado
+	('crc', '<u4'),        # CRC32 de la última línea indexada
+	('reservado', '<u4'),
+	('registros', '<u8'),  # Cantidad de registros indexados
+])
+TAMANO_CABECERA = DTYPE_CABECERA.itemsize
+FIRMA = b'IOFF'
+VERSION = 1
+
+# Tamaño de las ventanas procesadas al buscar saltos de línea
+VENTANA_INDICE = 64 << 20
+
+
+def _inicios_de_linea(ruta_completa, desde=0):
+	"""
+	Calcula los offsets de inicio de las líneas no vacías a partir de 'desde'.
+
+	Se mapea el archivo en memoria y se buscan los saltos de línea con
+	np.flatnonzero(buf == ord('\\n')) por ventanas grandes.
+
+	Args:
+		ruta_completa (str): Ruta del archivo de datos
+		desde (int): Offset desde el que se indexa (inicio de una línea)
+
+	Returns:
+		np.array: Offsets uint64 del inicio de cada línea no vacía desde 'desde'
+	"""
+	tamano = os.path.getsize(ruta_completa)
+	if tamano <= desde:
+		return np.empty(0, dtype=np.uint64)
+
+	partes = [np.array([desde], dtype=np.uint64)]
+	with open(ruta_completa, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+		buf = np.frombuffer(mm, dtype=np.uint8)
+		for inicio in range(desde, tamano, VENTANA_INDICE):
+			ventana = buf[inicio:inicio + VENTANA_INDICE]
+			partes.append(np.flatnonzero(ventana == ord('\n')).astype(np.uint64) + np.uint64(inicio + 1))
+
+		inicios = np.concatenate(partes)
+		# El salto de línea final no inicia un registro nuevo, y una línea que
+		# empieza con salto de línea está vacía
+		inicios = inicios[inicios < tamano]
+		inicios = inicios[buf[inicios] != ord('\n')]
+		del buf, ventana
+	return inicios
+
+def _crc_linea(ruta_completa, offsets):
+	"""CRC32 de los bytes de la última línea indexada (0 si no hay líneas)."""
+	if len(offsets) < 2:
+		return 0
+	inicio, fin = int(offsets[-2]), int(offsets[-1])
+	with open(ruta_completa, 'rb') as f:
+		f.seek(inicio)
+		return zlib.crc32(f.read(fin - inicio))
+
+def construir_indice_offsets(nombre_archivo="variable.dat"):
+	"""
+	Construye el índice de offsets completo de un archivo variable.
+
+	Args:
+		nombre_archivo (str): Nombre del archivo de longitud variable
+
+	Returns:
+		np.array: n + 1 offsets uint64 (inicios de línea y tamaño del archivo)
+	"""
+	ruta_completa = ruta_archivo(nombre_archivo)
+	inicios = _inicios_de_linea(ruta_completa)
+	return np.append(inicios, np.uint64(os.path.getsize(ruta_completa)))
+
+def _leer_indice(ruta_indice):
+	"""
+	Lee la cabecera y los offsets de un índice.
+
+	Returns:
+		tuple: (cabecera, offsets), o (None, None) si no existe o es inválido
+	"""
+	if not os.path.exists(ruta_indice):
+		return None, None
+	with open(ruta_indice, 'rb') as f:
+		cabecera = np.fromfile(f, dtype=DTYPE_CABECERA, count=1)
+		if len(cabecera) == 0 or cabecera[0]['firma'] != FIRMA or cabecera[0]['version'] != VERSION:
+			return None, None
+		offsets = np.fromfile(f, dtype='<u8')
+	if len(offsets) != int(cabecera[0]['registros']) + 1:
+		return None, None
+	return cabecera[0], offsets
+
+def _escribir_indice(ruta_indice, ruta_completa, offsets, estado):
+	"""Escribe el índice en un temporal y lo reemplaza de forma atómica."""
+	cabecera = np.zeros(1, dtype=DTYPE_CABECERA)
+	cabecera['firma'] = FIRMA
+	cabecera['version'] = VERSION
+	cabecera['tamano'] = estado.st_size
+	cabecera['mtime'] = estado.st_mtime_ns
+	cabecera['crc'] = _crc_linea(ruta_completa, offsets)
+	cabecera['registros'] = len(offsets) - 1
+
+	temporal = ruta_indice + ".tmp"
+	with open(temporal, 'wb') as f:
+		cabecera.tofile(f)
+		offsets.tofile(f)
+	os.replace(temporal, ruta_indice)
+
+def cargar_indice_offsets(nombre_archivo="variable.dat", nombre_indice=None):
+	"""
+	Carga el índice de offsets, creándolo o actualizándolo si hace falta.
+
+	El índice se reutiliza solo si el tamaño y la fecha de modificación del
+	archivo coinciden con los de la cabecera. Si el archivo solo creció (se
+	agregaron líneas al final y la última línea indexada no cambió) se
+	indexa únicamente la parte nueva. En cualquier otro caso se reconstruye.
+
+	Args:
+		nombre_archivo (str): Nombre del archivo de longitud variable
+		nombre_indice (str): Nombre del archivo de índice (por defecto el del
+							archivo de datos con extensión .off)
+
+	Returns:
+		np.array: n + 1 offsets uint64 (inicios de línea y tamaño del archivo)
+	"""
+	ruta_completa = ruta_archivo(nombre_archivo)
+	ruta_indice = ruta_archivo(nombre_indice or nombre_archivo + ".off")
+	estado = os.stat(ruta_completa)
+	tamano = estado.st_size
+
+	cabecera, offsets = _leer_indice(ruta_indice)
+	if cabecera is not None:
+		anterior = int(cabecera['tamano'])
+
+		if anterior == tamano and int(cabecera['mtime']) == estado.st_mtime_ns:
+			return offsets
+
+		# Solo se puede continuar si el archivo creció, antes terminaba en
+		# salto de línea y la última línea indexada sigue siendo la misma
+		continuable = False
+		if 0 < anterior < tamano:
+			with open(ruta_completa, 'rb') as f:
+				f.seek(anterior - 1)
+				continuable = (f.read(1) == b'\n'
+							   and _crc_linea(ruta_completa, offsets) == int(cabecera['crc']))
+
+		if continuable:
+			nuevos = _inicios_de_linea(ruta_completa, anterior)
+			offsets = np.concatenate([offsets[:-1], nuevos, [np.uint64(tamano)]]).astype('<u8')
+		else:
+			offsets = None
+
+	if offsets is None:
+		offsets = construir_indice_offsets(ruta_completa).astype('<u8')
+
+	_escribir_indice(ruta_indice, ruta_completa, offsets, estado)
+	return offsets
+
+
+class ArchivoVariable:
+	"""
+	Acceso directo por número de registro al archivo de longitud variable.
+
+	Con el índice de offsets, el registro i se lee con un único pread de
+	exactamente sus bytes.
+	"""
+
+	def __init__(self, nombre_archivo="variable.dat"):
+		"""
+		Abre el archivo variable y carga (o crea) su índice de offsets.
+
+		Args:
+			nombre_archivo (str): Nombre del archivo de longitud variable
+		"""
+		self.ruta = ruta_archivo(nombre_archivo)
+		self.offsets = cargar_indice_offsets(self.ruta)
+		self._archivo = open(self.ruta, 'rb')
+
+	def __len__(self):
+		"""Cantidad de registros indexados."""
+		return len(self.offsets) - 1
+
+	def obtener(self, i):
+		"""
+		Lee y decodifica el registro i.
+
+		Args:
+			i (int): Número de registro (desde 0)
+
+		Returns:
+			Persona: Persona almacenada en la línea i
+
+		Raises:
+			IndexError: Si el registro no existe
+		"""
+		if i < 0 or i >= len(self):
+			raise IndexError(f"Registro {i} fuera de rango")
+		inicio, fin = int(self.offsets[i]), int(self.offsets[i + 1])
+		if hasattr(os, 'pread'):
+			datos = os.pread(self._archivo.fileno(), fin - inicio, inicio)
+		else:
+			self._archivo.seek(inicio)
+			datos = self._archivo.read(fin - inicio)
+		return parsear_linea(datos.decode('utf-8'))
+
+	__getitem__ = obtener
+
+	def __iter__(self):
+		"""Recorre secuencialmente todos los registros."""
+		return leer_longitud_variable(self.ruta)
+
+	def close(self):
+		"""Cierra el archivo."""
+		self._archivo.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+if __name__ == "__main__":
+	# Lee el variable.dat generado por ej_5.py
+	with ArchivoVariable("variable.dat") as archivo:
+		print(f"Registros indexados: {len(archivo)}")
+		for i in (0, len(archivo) // 2, len(archivo) - 1):
+			p = archivo.obtener(i)
+			print(f"  [{i}] {p.nombre} | {p.direccion} | {p.dni} | {CAMPOS_A_SN[p.campos]}")
+		print(f"Lectura secuencial: {sum(1 for _ in archivo)} registros")
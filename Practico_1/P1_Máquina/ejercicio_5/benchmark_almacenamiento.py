@@ -0,0 +1,392 @@
+"""
+Benchmark de los formatos de almacenamiento a gran escala (10^6 a 10^8 registros).
+
+Genera personas realistas (nombres y direcciones de largo variado, con
+acentos) y mide, para cada formato:
+
+	- Escritura: registros por segundo desde un generador de personas; el
+	  tiempo de generar los datos se mide aparte y también se informa la
+	  velocidad neta, sin la generación
+	- Lectura completa: recorrido secuencial de todo el archivo
+	- Acceso aleatorio: latencia media, p50 y p99 de leer un registro por número
+	- Tamaño en disco
+	- Memoria máxima (RSS) del proceso
+
+Todos los formatos se escriben desde el generador y se leen por bloques, así
+que la memoria no depende de la cantidad de registros (en el columnar la
+acotan los diccionarios, limitados por LIMITE_DICCIONARIO). Cada formato se
+mide en un proceso separado para que la memoria máxima de uno no afecte a
+los demás. Los resultados se guardan en JSON para poder
+compararlos entre versiones (opción --comparar).
+
+Uso:
+	python benchmark_almacenamiento.py --registros 1000000 10000000 --salida resultados.json
+	python benchmark_almacenamiento.py --comparar resultados.json --salida nuevos.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from ej_5 import Persona
+
+# Formatos disponibles: nombre -> archivo (o directorio) de datos
+FORMATOS = {
+	'fijo': "fijos.dat",
+	'variable': "variable.dat",
+	'binario': "binario.dat",
+	'columnar': "columnar",
+}
+
+# Versión del esquema del JSON de resultados
+VERSION_RESULTADOS = 1
+
+# Métricas comparadas con --comparar: nombre -> True si un valor mayor es mejor
+METRICAS = {
+	'escritura_registros_s': True,
+	'lectura_registros_s': True,
+	'acceso_p50_us': False,
+	'acceso_p99_us': False,
+	'bytes': False,
+	'rss_max_mb': False,
+}
+
+NOMBRES = ["Juan", "María", "José", "Lucía", "Martín", "Sofía", "Joaquín", "Valentina",
+		   "Agustín", "Camila", "Nicolás", "Florencia", "Tomás", "Ramón", "Inés", "Germán",
+		   "Ángel", "Begoña", "Maximiliano", "Mía"]
+APELLIDOS = ["González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez",
+			 "Pérez", "García", "Sánchez", "Romero", "Sosa", "Álvarez", "Torres", "Ruiz",
+			 "Núñez", "Ibáñez", "Domínguez", "Fernández de la Vega", "Peña"]
+CALLES = ["Av. Córdoba", "San Martín", "Belgrano", "Güemes", "Av. Hipólito Yrigoyen",
+		  "Bv. San Juan", "Rivadavia", "Obispo Trejo", "Av. Colón", "27 de Abril",
+		  "Deán Funes", "Av. Vélez Sársfield", "Ituzaingó", "Jujuy", "Av. Rafael Núñez"]
+LOCALIDADES = ["Córdoba", "Río Cuarto", "Villa María", "San Francisco", "Alta Gracia",
+			   "Jesús María", "Río Tercero", "Villa Carlos Paz", "Bell Ville", "Cosquín",
+			   "San Miguel de Tucumán", "Mendoza", "Ciudad Autónoma de Buenos Aires"]
+
+# Probabilidad de que cada campo S/N valga S (bit i = campo i)
+PROBABILIDADES_CAMPOS = [0.98, 0.75, 0.25, 0.6, 0.7, 0.1, 0.5, 0.3]
+
+
+def generar_personas_realistas(cantidad, semilla=0):
+	"""
+	Genera personas con datos variados, de a una por vez.
+
+	Los nombres tienen uno o dos nombres y uno o dos apellidos, y las
+	direcciones pueden incluir piso y departamento, de modo que los largos
+	varían como en datos reales. Para la misma semilla se generan siempre
+	las mismas personas.
+
+	Args:
+		cantidad (int): Cantidad de personas a generar
+		semilla (int): Semilla del generador pseudoaleatorio
+
+	Yields:
+		Persona: Personas generadas
+	"""
+	rng = random.Random(semilla)
+	eleccion, aleatorio, entero = rng.choice, rng.random, rng.randrange
+	for _ in range(cantidad):
+		apellido = eleccion(APELLIDOS)
+		if aleatorio() < 0.3:
+			apellido = f"{apellido} {eleccion(APELLIDOS)}"
+		nombre = eleccion(NOMBRES)
+		if aleatorio() < 0.5:
+			nombre = f"{nombre} {eleccion(NOMBRES)}"
+
+		calle = f"{eleccion(CALLES)} {entero(1, 5000)}"
+		if aleatorio() < 0.35:
+			calle = f"{calle} piso {entero(1, 20)} dto. {'ABCDEFGH'[entero(8)]}"
+
+		campos = 0
+		for bit, probabilidad in enumerate(PROBABILIDADES_CAMPOS):
+			if aleatorio() < probabilidad:
+				campos |= 1 << bit
+
+		yield Persona.desde_campos(f"{apellido} {nombre}", f"{calle}, {eleccion(LOCALIDADES)}",
+								   str(entero(10_000_000, 50_000_000)), campos)
+
+
+def _escribir(formato, personas, ruta):
+	"""Escribe las personas en el formato indicado."""
+	if formato == 'fijo':
+		from ej_5 import guardar_longitud_fija
+		guardar_longitud_fija(personas, ruta)
+	elif formato == 'variable':
+		from ej_5 import guardar_longitud_variable
+		guardar_longitud_variable(personas, ruta)
+	elif formato == 'binario':
+		from formato_binario import guardar_binario
+		guardar_binario(personas, ruta)
+	elif formato == 'columnar':
+		from almacenamiento_columnar import guardar_columnar
+		guardar_columnar(personas, ruta)
+
+def _recorrer(formato, ruta):
+	"""Lee todas las personas del archivo y devuelve la cantidad leída."""
+	if formato == 'fijo':
+		from ej_5 import leer_longitud_fija
+		personas = leer_longitud_fija(ruta)
+	elif formato == 'variable':
+		from ej_5 import leer_longitud_variable
+		personas = leer_longitud_variable(ruta)
+	elif formato == 'binario':
+		from formato_binario import leer_binario
+		personas = leer_binario(ruta)
+	else:
+		from almacenamiento_columnar import ArchivoColumnar
+		personas = ArchivoColumnar(ruta).personas()
+	return sum(1 for _ in personas)
+
+def _abrir_acceso(formato, ruta):
+	"""
+	Abre el archivo para acceso por número de registro.
+
+	Returns:
+		object: Objeto con método obtener(i), o None si el formato no lo permite
+	"""
+	if formato == 'fijo':
+		from almacenamiento_fijo import ArchivoFijo
+		return ArchivoFijo(ruta)
+	if formato == 'variable':
+		from almacenamiento_variable import ArchivoVariable
+		return ArchivoVariable(ruta)
+	if formato == 'columnar':
+		from almacenamiento_columnar import ArchivoColumnar
+		return ArchivoColumnar(ruta)
+	# El formato binario solo se lee secuencialmente
+	return None
+
+def _tamano(formato, ruta):
+	"""Bytes ocupados en disco por los datos."""
+	if formato == 'columnar':
+		from almacenamiento_columnar import ArchivoColumnar
+		return ArchivoColumnar(ruta).tamano()
+	return os.path.getsize(ruta)
+
+def _rss_maximo_mb():
+	"""Memoria máxima (RSS) usada por el proceso en MB, o None si no se puede medir."""
+	try:
+		import resource
+	except ImportError:
+		return None
+	maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	# Linux informa KB, macOS informa bytes
+	return maximo / (1 << 20) if sys.platform == 'darwin' else maximo / (1 << 10)
+
+def _percentil(valores_ordenados, p):
+	"""Percentil p (0-100) de una lista ordenada, por el método del rango más cercano."""
+	indice = max(0, min(len(valores_ordenados) - 1, round(p / 100 * len(valores_ordenados)) - 1))
+	return valores_ordenados[indice]
+
+def medir_formato(formato, cantidad, directorio, semilla=0, accesos=10_000):
+	"""
+	Mide un formato en el proceso actual.
+
+	Args:
+		formato (str): Uno de FORMATOS
+		cantidad (int): Cantidad de registros
+		directorio (str): Directorio donde se crean los archivos
+		semilla (int): Semilla de los datos y de los accesos aleatorios
+		accesos (int): Cantidad de lecturas de acceso aleatorio
+
+	Returns:
+		dict: Resultados de la medición
+	"""
+	resultado = {'formato': formato, 'registros': cantidad}
+	ruta = os.path.join(directorio, FORMATOS[formato])
+
+	# Costo y memoria de solo generar los datos, para descontarlos
+	inicio = time.perf_counter()
+	for _ in generar_personas_realistas(cantidad, semilla):
+		pass
+	resultado['generacion_s'] = time.perf_counter() - inicio
+	resultado['rss_base_mb'] = _rss_maximo_mb()
+
+	inicio = time.perf_counter()
+	_escribir(formato, generar_personas_realistas(cantidad, semilla), ruta)
+	resultado['escritura_s'] = time.perf_counter() - inicio
+	resultado['escritura_registros_s'] = cantidad / resultado['escritura_s'] if resultado['escritura_s'] else None
+	neto = resultado['escritura_s'] - resultado['generacion_s']
+	resultado['escritura_neta_registros_s'] = cantidad / neto if neto > 0 else None
+
+	resultado['bytes'] = _tamano(formato, ruta)
+	resultado['bytes_por_registro'] = resultado['bytes'] / cantidad if cantidad else 0
+
+	inicio = time.perf_counter()
+	leidos = _recorrer(formato, ruta)
+	resultado['lectura_s'] = time.perf_counter() - inicio
+	resultado['lectura_registros_s'] = leidos / resultado['lectura_s'] if resultado['lectura_s'] else None
+	if leidos != cantidad:
+		raise RuntimeError(f"{formato}: se leyeron {leidos} de {cantidad} registros")
+
+	# La apertura incluye construir índices auxiliares (por ejemplo variable.dat.off)
+	inicio = time.perf_counter()
+	archivo = _abrir_acceso(formato, ruta)
+	resultado['apertura_acceso_s'] = time.perf_counter() - inicio
+	if archivo is not None and cantidad:
+		rng = random.Random(semilla)
+		latencias = []
+		for _ in range(accesos):
+			i = rng.randrange(cantidad)
+			inicio = time.perf_counter_ns()
+			archivo.obtener(i)
+			latencias.append((time.perf_counter_ns() - inicio) / 1000)
+		latencias.sort()
+		resultado['acceso_media_us'] = sum(latencias) / len(latencias)
+		resultado['acceso_p50_us'] = _percentil(latencias, 50)
+		resultado['acceso_p99_us'] = _percentil(latencias, 99)
+		if hasattr(archivo, 'close'):
+			archivo.close()
+	else:
+		resultado['acceso_media_us'] = resultado['acceso_p50_us'] = resultado['acceso_p99_us'] = None
+
+	resultado['rss_max_mb'] = _rss_maximo_mb()
+	return resultado
+
+def _medir_en_proceso(formato, cantidad, directorio, semilla, accesos):
+	"""Ejecuta medir_formato en un proceso nuevo y devuelve su resultado."""
+	comando = [sys.executable, os.path.abspath(__file__), '--hijo', formato,
+			   '--registros', str(cantidad), '--directorio', directorio,
+			   '--semilla', str(semilla), '--accesos', str(accesos)]
+	salida = subprocess.run(comando, check=True, capture_output=True, text=True).stdout
+	return json.loads(salida)
+
+def _commit_actual():
+	"""Commit de git del código medido, o None si no está disponible."""
+	try:
+		salida = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+								cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+	except (OSError, subprocess.CalledProcessError):
+		return None
+	return salida.stdout.strip() or None
+
+def ejecutar_benchmark(cantidades, formatos=tuple(FORMATOS), semilla=0, accesos=10_000, directorio=None):
+	"""
+	Mide cada formato para cada cantidad de registros, en procesos separados.
+
+	Los archivos de cada formato se borran después de medirlo, así que el
+	espacio en disco necesario es el del formato más grande.
+
+	Args:
+		cantidades (list): Cantidades de registros a medir
+		formatos (iterable): Formatos a medir (claves de FORMATOS)
+		semilla (int): Semilla de los datos
+		accesos (int): Cantidad de lecturas de acceso aleatorio por formato
+		directorio (str): Directorio para los archivos temporales (por defecto
+						 el temporal del sistema)
+
+	Returns:
+		dict: Resultados con metadatos, listos para guardar en JSON
+	"""
+	resultados = []
+	for cantidad in cantidades:
+		with tempfile.TemporaryDirectory(dir=directorio) as tmp:
+			for formato in formatos:
+				subdirectorio = os.path.join(tmp, formato)
+				os.mkdir(subdirectorio)
+				resultados.append(_medir_en_proceso(formato, cantidad, subdirectorio, semilla, accesos))
+				shutil.rmtree(subdirectorio)
+
+	return {
+		'version': VERSION_RESULTADOS,
+		'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+		'commit': _commit_actual(),
+		'python': platform.python_version(),
+		'plataforma': platform.platform(),
+		'semilla': semilla,
+		'accesos': accesos,
+		'resultados': resultados,
+	}
+
+def comparar(anteriores, actuales, tolerancia=0.2):
+	"""
+	Compara dos ejecuciones del benchmark métrica por métrica.
+
+	Args:
+		anteriores (dict): Resultados de referencia (JSON de ejecutar_benchmark)
+		actuales (dict): Resultados nuevos
+		tolerancia (float): Empeoramiento relativo a partir del cual una
+						   métrica se considera una regresión
+
+	Returns:
+		list: Tuplas (formato, registros, métrica, anterior, actual, regresion)
+	"""
+	referencia = {(r['formato'], r['registros']): r for r in anteriores['resultados']}
+	filas = []
+	for resultado in actuales['resultados']:
+		anterior = referencia.get((resultado['formato'], resultado['registros']))
+		if anterior is None:
+			continue
+		for metrica, mayor_es_mejor in METRICAS.items():
+			a, b = anterior.get(metrica), resultado.get(metrica)
+			if not a or b is None:
+				continue
+			cambio = (b - a) / a
+			regresion = cambio < -tolerancia if mayor_es_mejor else cambio > tolerancia
+			filas.append((resultado['formato'], resultado['registros'], metrica, a, b, regresion))
+	return filas
+
+def _formato_numero(valor, decimales=1):
+	return "-" if valor is None else f"{valor:,.{decimales}f}"
+
+def imprimir_resultados(resultados):
+	"""Muestra los resultados como tabla."""
+	print(f"{'Formato':10s} {'Registros':>12s} {'Bytes/reg':>10s} {'Escritura/s':>12s} "
+		  f"{'Lectura/s':>12s} {'p50 (us)':>9s} {'p99 (us)':>9s} {'RSS (MB)':>9s}")
+	for r in resultados['resultados']:
+		print(f"{r['formato']:10s} {r['registros']:12,} {_formato_numero(r['bytes_por_registro']):>10s} "
+			  f"{_formato_numero(r['escritura_registros_s'], 0):>12s} {_formato_numero(r['lectura_registros_s'], 0):>12s} "
+			  f"{_formato_numero(r['acceso_p50_us']):>9s} {_formato_numero(r['acceso_p99_us']):>9s} "
+			  f"{_formato_numero(r['rss_max_mb']):>9s}")
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Benchmark de los formatos de almacenamiento de personas")
+	parser.add_argument('--registros', type=int, nargs='+', default=[1_000_000],
+						help="cantidades de registros a medir (por defecto 1000000)")
+	parser.add_argument('--formatos', nargs='+', choices=list(FORMATOS), default=list(FORMATOS),
+						help="formatos a medir (por defecto todos)")
+	parser.add_argument('--semilla', type=int, default=0)
+	parser.add_argument('--accesos', type=int, default=10_000,
+						help="lecturas de acceso aleatorio por formato")
+	parser.add_argument('--directorio', default=None,
+						help="directorio para los archivos de prueba (por defecto el temporal)")
+	parser.add_argument('--salida', default=None, help="archivo JSON donde guardar los resultados")
+	parser.add_argument('--comparar', default=None, help="JSON de una ejecución anterior para comparar")
+	parser.add_argument('--tolerancia', type=float, default=0.2,
+						help="empeoramiento relativo considerado regresión (por defecto 0.2)")
+	parser.add_argument('--hijo', default=None, help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.hijo:
+		# Proceso de medición: un solo formato, resultado en JSON por stdout
+		print(json.dumps(medir_formato(args.hijo, args.registros[0], args.directorio,
+									   args.semilla, args.accesos)))
+		sys.exit(0)
+
+	resultados = ejecutar_benchmark(args.registros, args.formatos, args.semilla, args.accesos, args.directorio)
+	imprimir_resultados(resultados)
+
+	if args.salida:
+		with open(args.salida, 'w', encoding='utf-8') as f:
+			json.dump(resultados, f, indent=2, ensure_ascii=False)
+		print(f"\nResultados guardados en {args.salida}")
+
+	if args.comparar:
+		with open(args.comparar, encoding='utf-8') as f:
+			anteriores = json.load(f)
+		filas = comparar(anteriores, resultados, args.tolerancia)
+		print(f"\nComparación con {args.comparar} (commit {anteriores.get('commit')}):")
+		for formato, registros, metrica, antes, ahora, regresion in filas:
+			marca = "REGRESIÓN" if regresion else ""
+			print(f"  {formato:10s} {registros:>12,} {metrica:22s} {antes:14,.1f} -> {ahora:14,.1f} {marca}")
+		if any(fila[-1] for fila in filas):
+			sys.exit(1)
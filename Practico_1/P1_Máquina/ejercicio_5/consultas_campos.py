@@ -0,0 +1,398 @@
+"""
+Motor de consultas sobre los 8 campos S/N empaquetados del archivo fijo.
+
+Cada registro de "fijos.dat" guarda sus 8 campos S/N en un byte (bit i =
+campo i). Las consultas son predicados booleanos sobre esos bits, por ejemplo
+"universitarios AND NOT vivienda_propia", y se evalúan de forma vectorizada
+sobre toda la columna de bytes.
+
+Como un byte solo puede tomar 256 valores, el predicado se evalúa con
+operaciones bit a bit sobre las 256 combinaciones posibles (tabla de verdad)
+y luego se aplica a la columna con una única indexación. Los conteos se
+obtienen directamente del histograma de combinaciones (np.bincount).
+
+La columna puede leerse del propio archivo fijo (1 byte útil cada 121) o de
+un archivo auxiliar con solo los campos ("fijos.dat.campos", 1 byte por
+registro), que se genera y actualiza automáticamente.
+
+Los registros borrados (ver edicion_fija.py) se excluyen de todos los
+resultados usando la lista de libres del archivo. La lista se reconstruye
+solo junto con la columna auxiliar, en la misma pasada sobre los registros;
+una consulta sobre una columna al día únicamente lee archivos.
+"""
+import os
+
+import numpy as np
+
+from almacenamiento_fijo import TAMANO_REGISTRO, leer_fijos
+from edicion_fija import guardar_libres, leer_libres, recuperar_diario
+from ej_5 import MARCA_BORRADO, ruta_archivo
+
+# Nombre de cada campo S/N según su posición de bit
+NOMBRES_CAMPOS = [
+	'primarios',        # Estudios primarios
+	'secundarios',      # Estudios secundarios
+	'universitarios',   # Estudios universitarios
+	'vivienda_propia',  # Vivienda propia
+	'obra_social',      # Obra social
+	'adicional_1',      # Campo adicional 1
+	'adicional_2',      # Campo adicional 2
+	'adicional_3',      # Campo adicional 3
+]
+
+# Cantidad de registros procesados por bloque al recorrer la columna
+BLOQUE_REGISTROS = 1 << 24
+
+# Todas las combinaciones posibles de los 8 campos
+_COMBINACIONES = np.arange(256, dtype=np.uint8)
+
+
+class Predicado:
+	"""
+	Predicado booleano sobre el byte de campos S/N.
+
+	Los predicados se combinan con &, | y ~ (o con parsear_consulta a partir
+	de un texto con AND, OR y NOT).
+	"""
+
+	def __init__(self, funcion, descripcion):
+		"""
+		Args:
+			funcion (callable): Recibe un array uint8 de campos y devuelve
+							   una máscara booleana
+			descripcion (str): Representación legible del predicado
+		"""
+		self._funcion = funcion
+		self.descripcion = descripcion
+
+	def evaluar(self, campos):
+		"""
+		Evalúa el predicado con operaciones bit a bit sobre un array de campos.
+
+		Args:
+			campos (np.array): Bytes de campos (uint8)
+
+		Returns:
+			np.array: Máscara booleana
+		"""
+		return self._funcion(np.asarray(campos, dtype=np.uint8))
+
+	def tabla_verdad(self):
+		"""
+		Evalúa el predicado sobre las 256 combinaciones posibles.
+
+		Returns:
+			np.array: Vector de 256 booleanos indexado por el byte de campos
+		"""
+		return self.evaluar(_COMBINACIONES)
+
+	def __and__(self, otro):
+		return Predicado(lambda c: self.evaluar(c) & otro.evaluar(c),
+						 f"({self.descripcion} AND {otro.descripcion})")
+
+	def __or__(self, otro):
+		return Predicado(lambda c: self.evaluar(c) | otro.evaluar(c),
+						 f"({self.descripcion} OR {otro.descripcion})")
+
+	def __invert__(self):
+		return Predicado(lambda c: ~self.evaluar(c), f"NOT {self.descripcion}")
+
+	def __repr__(self):
+		return f"Predicado({self.descripcion})"
+
+
+def campo(nombre):
+	"""
+	Predicado que es verdadero cuando el campo indicado vale S.
+
+	Args:
+		nombre (str or int): Nombre del campo (ver NOMBRES_CAMPOS) o número de bit
+
+	Returns:
+		Predicado: Predicado del campo
+
+	Raises:
+		ValueError: Si el campo no existe
+	"""
+	if isinstance(nombre, str):
+		if nombre not in NOMBRES_CAMPOS:
+			raise ValueError(f"Campo desconocido: {nombre}")
+		bit = NOMBRES_CAMPOS.index(nombre)
+	else:
+		bit = int(nombre)
+		if not 0 <= bit < 8:
+			raise ValueError(f"Número de campo fuera de rango: {bit}")
+		nombre = NOMBRES_CAMPOS[bit]
+	mascara = np.uint8(1 << bit)
+	return Predicado(lambda c: (c & mascara) != 0, nombre)
+
+def parsear_consulta(texto):
+	"""
+	Convierte una consulta de texto en un Predicado.
+
+	Gramática (AND tiene mayor precedencia que OR, palabras clave sin
+	distinguir mayúsculas):
+		expresion := termino (OR termino)*
+		termino   := factor (AND factor)*
+		factor    := NOT factor | '(' expresion ')' | nombre_de_campo
+
+	Args:
+		texto (str): Consulta, por ejemplo "universitarios AND NOT vivienda_propia"
+
+	Returns:
+		Predicado: Predicado equivalente
+
+	Raises:
+		ValueError: Si la consulta tiene errores de sintaxis o campos desconocidos
+	"""
+	tokens = texto.replace('(', ' ( ').replace(')', ' ) ').split()
+	posicion = 0
+
+	def siguiente():
+		return tokens[posicion] if posicion < len(tokens) else None
+
+	def consumir():
+		nonlocal posicion
+		token = siguiente()
+		posicion += 1
+		return token
+
+	def expresion():
+		resultado = termino()
+		while siguiente() is not None and siguiente().upper() == 'OR':
+			consumir()
+			resultado = resultado | termino()
+		return resultado
+
+	def termino():
+		resultado = factor()
+		while siguiente() is not None and siguiente().upper() == 'AND':
+			consumir()
+			resultado = resultado & factor()
+		return resultado
+
+	def factor():
+		token = consumir()
+		if token is None:
+			raise ValueError("Consulta incompleta")
+		if token.upper() == 'NOT':
+			return ~factor()
+		if token == '(':
+			resultado = expresion()
+			if consumir() != ')':
+				raise ValueError("Falta cerrar un paréntesis")
+			return resultado
+		return campo(token)
+
+	resultado = expresion()
+	if siguiente() is not None:
+		raise ValueError(f"Símbolo inesperado: {siguiente()}")
+	return resultado
+
+def _como_predicado(consulta):
+	"""Acepta un Predicado o un texto de consulta."""
+	return parsear_consulta(consulta) if isinstance(consulta, str) else consulta
+
+def _marcas_borrado(datos):
+	"""Primer byte de cada registro de un array estructurado (MARCA_BORRADO si está borrado)."""
+	return datos.view(np.uint8).reshape(-1, TAMANO_REGISTRO)[:, 0]
+
+def _registros_borrados(datos):
+	"""Números de los registros borrados, recorriendo las marcas por bloques (sin escribir nada)."""
+	marcas = _marcas_borrado(datos)
+	partes = [np.empty(0, dtype=np.intp)]
+	for inicio in range(0, len(marcas), BLOQUE_REGISTROS):
+		partes.append(np.flatnonzero(marcas[inicio:inicio + BLOQUE_REGISTROS] == MARCA_BORRADO) + inicio)
+	return np.concatenate(partes)
+
+def generar_columna_campos(nombre_archivo="fijos.dat", nombre_columna=None):
+	"""
+	Genera el archivo auxiliar con solo el byte de campos de cada registro.
+
+	En la misma pasada se reconstruye la lista de libres del archivo, que las
+	consultas usan para excluir los registros borrados. Antes se completa
+	cualquier transacción pendiente.
+
+	Args:
+		nombre_archivo (str): Nombre del archivo de longitud fija
+		nombre_columna (str): Nombre del archivo auxiliar (por defecto el del
+							 archivo de datos con extensión .campos)
+
+	Returns:
+		str: Ruta del archivo auxiliar generado
+	"""
+	recuperar_diario(nombre_archivo)
+	ruta_columna = ruta_archivo(nombre_columna or nombre_archivo + ".campos")
+	datos = leer_fijos(nombre_archivo)
+	marcas = _marcas_borrado(datos)
+	borrados = [np.empty(0, dtype=np.uint64)]
+	temporal = ruta_columna + ".tmp"
+	with open(temporal, 'wb') as f:
+		for inicio in range(0, len(datos), BLOQUE_REGISTROS):
+			np.ascontiguousarray(datos['campos'][inicio:inicio + BLOQUE_REGISTROS]).tofile(f)
+			bloque = marcas[inicio:inicio + BLOQUE_REGISTROS]
+			borrados.append(np.flatnonzero(bloque == MARCA_BORRADO).astype(np.uint64) + np.uint64(inicio))
+	del datos, marcas
+	guardar_libres(np.concatenate(borrados), nombre_archivo)
+	os.replace(temporal, ruta_columna)
+	return ruta_columna
+
+
+class MotorConsultas:
+	"""
+	Evalúa consultas sobre los campos S/N de todos los registros.
+
+	Los resultados posibles son la cantidad de registros que cumplen,
+	los números de registro que cumplen, o el conteo de registros por cada
+	una de las 256 combinaciones de campos.
+	"""
+
+	def __init__(self, nombre_archivo="fijos.dat", usar_columna=True):
+		"""
+		Prepara el motor de consultas.
+
+		Args:
+			nombre_archivo (str): Nombre del archivo de longitud fija
+			usar_columna (bool): Si es True se usa (y mantiene al día) el archivo
+								auxiliar de campos; si es False se leen los
+								campos directamente del archivo fijo
+		"""
+		self.ruta = ruta_archivo(nombre_archivo)
+		self.usar_columna = usar_columna
+		self.ruta_columna = self.ruta + ".campos"
+
+	def _columna_al_dia(self):
+		"""
+		El archivo auxiliar existe, cubre todos los registros y no es más viejo
+		que los datos; la lista de libres corresponde al archivo y no hay una
+		transacción pendiente.
+		"""
+		if not os.path.exists(self.ruta_columna) or os.path.exists(self.ruta + ".diario"):
+			return False
+		total = os.path.getsize(self.ruta) // TAMANO_REGISTRO
+		return (os.path.getsize(self.ruta_columna) == total
+				and os.path.getmtime(self.ruta_columna) >= os.path.getmtime(self.ruta)
+				and leer_libres(self.ruta) is not None)
+
+	def columna(self):
+		"""
+		Devuelve la columna de campos mapeada en memoria.
+
+		Returns:
+			np.array: Un byte de campos por registro (uint8)
+		"""
+		if not self.usar_columna:
+			return leer_fijos(self.ruta)['campos']
+		if not self._columna_al_dia():
+			generar_columna_campos(self.ruta, self.ruta_columna)
+		if os.path.getsize(self.ruta_columna) == 0:
+			return np.empty(0, dtype=np.uint8)
+		return np.memmap(self.ruta_columna, dtype=np.uint8, mode='r')
+
+	def _borrados(self):
+		"""
+		Números de los registros borrados, que no participan de las consultas.
+
+		Con la columna auxiliar se lee la lista de libres (columna() la deja al
+		día); sin ella se recorren las marcas del archivo, que de todos modos
+		se lee completo. En ningún caso se escribe.
+		"""
+		libres = leer_libres(self.ruta) if self.usar_columna else None
+		if libres is None:
+			return _registros_borrados(leer_fijos(self.ruta))
+		return libres.astype(np.intp)
+
+	def agrupar(self):
+		"""
+		Cuenta los registros de cada una de las 256 combinaciones de campos.
+
+		Returns:
+			np.array: Vector de 256 conteos indexado por el byte de campos
+		"""
+		columna = self.columna()
+		histograma = np.zeros(256, dtype=np.int64)
+		for inicio in range(0, len(columna), BLOQUE_REGISTROS):
+			histograma += np.bincount(columna[inicio:inicio + BLOQUE_REGISTROS], minlength=256)
+		borrados = self._borrados()
+		if len(borrados):
+			histograma -= np.bincount(columna[borrados], minlength=256)
+		return histograma
+
+	def agrupar_por_campos(self):
+		"""
+		Devuelve las combinaciones presentes con sus campos desempaquetados.
+
+		Returns:
+			list: Tuplas (dict campo -> bool, cantidad), de mayor a menor cantidad
+		"""
+		histograma = self.agrupar()
+		presentes = np.flatnonzero(histograma)
+		presentes = presentes[np.argsort(-histograma[presentes], kind='stable')]
+		return [
+			({nombre: bool(c & (1 << bit)) for bit, nombre in enumerate(NOMBRES_CAMPOS)}, int(histograma[c]))
+			for c in presentes
+		]
+
+	def contar(self, consulta):
+		"""
+		Cuenta los registros que cumplen una consulta.
+
+		Args:
+			consulta (Predicado or str): Predicado o texto de consulta
+
+		Returns:
+			int: Cantidad de registros que cumplen
+		"""
+		tabla = _como_predicado(consulta).tabla_verdad()
+		return int(self.agrupar()[tabla].sum())
+
+	def mascara(self, consulta):
+		"""
+		Evalúa una consulta sobre todos los registros.
+
+		Args:
+			consulta (Predicado or str): Predicado o texto de consulta
+
+		Returns:
+			np.array: Máscara booleana con un valor por registro
+		"""
+		tabla = _como_predicado(consulta).tabla_verdad()
+		mascara = tabla[self.columna()]
+		mascara[self._borrados()] = False
+		return mascara
+
+	def registros(self, consulta):
+		"""
+		Devuelve los números de registro que cumplen una consulta.
+
+		Args:
+			consulta (Predicado or str): Predicado o texto de consulta
+
+		Returns:
+			np.array: Números de registro (int64) en orden creciente
+		"""
+		tabla = _como_predicado(consulta).tabla_verdad()
+		columna = self.columna()
+		partes = [np.empty(0, dtype=np.int64)]
+		for inicio in range(0, len(columna), BLOQUE_REGISTROS):
+			bloque = columna[inicio:inicio + BLOQUE_REGISTROS]
+			partes.append(np.flatnonzero(tabla[bloque]) + inicio)
+		resultado = np.concatenate(partes)
+		borrados = self._borrados()
+		if len(borrados):
+			resultado = resultado[~np.isin(resultado, borrados)]
+		return resultado
+
+
+if __name__ == "__main__":
+	# Consultas sobre el fijos.dat generado por ej_5.py
+	motor = MotorConsultas("fijos.dat")
+	for consulta in ["universitarios AND NOT vivienda_propia",
+					 "secundarios OR vivienda_propia",
+					 "NOT (primarios AND obra_social)"]:
+		print(f"{consulta}: {motor.contar(consulta)} registros -> {motor.registros(consulta).tolist()}")
+
+	print("\nCombinaciones de campos presentes:")
+	for campos, cantidad in motor.agrupar_por_campos():
+		activos = [nombre for nombre, valor in campos.items() if valor]
+		print(f"  {cantidad:3d} x {', '.join(activos)}")
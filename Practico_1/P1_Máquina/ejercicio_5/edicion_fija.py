@@ -0,0 +1,507 @@
+"""
+Modificación registro a registro del archivo de longitud fija ("fijos.dat").
+
+guardar_longitud_fija reescribe el archivo completo. Como todos los registros
+miden 121 bytes, cada registro puede modificarse en su lugar:
+
+	- Agregar: se escribe al final (o en el lugar de un registro borrado)
+	- Actualizar: un único pwrite de 121 bytes en la posición i * 121
+	- Borrar: el registro se marca como borrado (el primer byte del nombre
+	  pasa a ser MARCA_BORRADO) y su número se agrega a la lista de libres,
+	  para que el próximo registro agregado reutilice el lugar
+
+La lista de libres se guarda junto al archivo ("fijos.dat.libres") como un
+array uint64: el tamaño del archivo de datos seguido de los números de los
+registros borrados. Si no corresponde al archivo (por ejemplo porque fue
+regenerado) se reconstruye recorriendo el primer byte de cada registro. Las
+altas reutilizan primero los registros libres de menor número.
+
+Cada operación es una transacción con un diario de escritura anticipada
+("fijos.dat.diario"): primero se guardan en el diario los registros nuevos
+con un CRC32 de confirmación, luego se escriben en el archivo de datos y por
+último se borra el diario. Si el programa se interrumpe, al abrir el archivo
+se rehace el diario confirmado (o se descarta si quedó incompleto), de modo
+que el archivo siempre refleja transacciones completas.
+
+Cuando una transacción modifica registros existentes, los archivos auxiliares
+derivados de su contenido (índice de DNIs y columna de campos S/N) se borran
+explícitamente y se regeneran al usarse.
+
+Estructura del diario:
+	- Cabecera: firma 'DFIJ' y cantidad de registros (uint32)
+	- Por registro: número de registro (uint64) y sus 121 bytes
+	- CRC32 (uint32) de todo lo anterior
+"""
+import heapq
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from almacenamiento_fijo import TAMANO_REGISTRO, ArchivoFijo, codificar_registro
+from ej_5 import MARCA_BORRADO, ruta_archivo
+
+# Registro que ocupa el lugar de uno borrado
+REGISTRO_BORRADO = bytes([MARCA_BORRADO]) + bytes(TAMANO_REGISTRO - 1)
+
+# Las escrituras de un lote se agrupan por páginas de este tamaño
+TAMANO_PAGINA = 4096
+
+FIRMA_DIARIO = b'DFIJ'
+CABECERA_DIARIO = struct.Struct('<4sI')
+ENTRADA_DIARIO = struct.Struct(f'<Q{TAMANO_REGISTRO}s')
+CRC_DIARIO = struct.Struct('<I')
+
+# Cantidad de registros revisados por bloque al reconstruir la lista de libres
+BLOQUE_REGISTROS = 1 << 20
+
+# Archivos auxiliares derivados del contenido de los registros (índice de DNIs
+# y columna de campos S/N): se borran cuando cambia un registro existente
+AUXILIARES = (".idx", ".idx.delta", ".campos")
+
+
+def _leer_diario(ruta_diario):
+	"""
+	Lee un diario y verifica su confirmación.
+
+	Returns:
+		list: Pares (número de registro, bytes), o None si el diario está
+			  incompleto o dañado
+	"""
+	with open(ruta_diario, 'rb') as f:
+		datos = f.read()
+	if len(datos) < CABECERA_DIARIO.size + CRC_DIARIO.size:
+		return None
+	firma, cantidad = CABECERA_DIARIO.unpack_from(datos)
+	fin = CABECERA_DIARIO.size + cantidad * ENTRADA_DIARIO.size
+	if firma != FIRMA_DIARIO or len(datos) != fin + CRC_DIARIO.size:
+		return None
+	if CRC_DIARIO.unpack_from(datos, fin)[0] != zlib.crc32(datos[:fin]):
+		return None
+	return list(ENTRADA_DIARIO.iter_unpack(datos[CABECERA_DIARIO.size:fin]))
+
+def _escribir_en(fd, datos, posicion):
+	"""Escribe 'datos' en 'posicion' sin mover el cursor (seek + write si no hay os.pwrite)."""
+	if hasattr(os, 'pwrite'):
+		os.pwrite(fd, datos, posicion)
+	else:
+		os.lseek(fd, posicion, os.SEEK_SET)
+		os.write(fd, datos)
+
+def _invalidar_auxiliares(ruta_datos):
+	"""Borra la lista de libres y los auxiliares, que se reconstruyen al usarse."""
+	for extension in (".libres",) + AUXILIARES:
+		if os.path.exists(ruta_datos + extension):
+			os.remove(ruta_datos + extension)
+
+def recuperar_diario(nombre_archivo="fijos.dat"):
+	"""
+	Completa o descarta la transacción pendiente de un archivo fijo.
+
+	Si existe un diario confirmado sus registros se vuelven a escribir (es
+	seguro repetirlo); si quedó incompleto se descarta, porque el archivo de
+	datos todavía no fue modificado.
+
+	Args:
+		nombre_archivo (str): Nombre del archivo de longitud fija
+
+	Returns:
+		bool: True si se rehizo una transacción
+	"""
+	ruta_datos = ruta_archivo(nombre_archivo)
+	ruta_diario = ruta_datos + ".diario"
+	if not os.path.exists(ruta_diario):
+		return False
+
+	entradas = _leer_diario(ruta_diario)
+	if entradas is not None:
+		fd = os.open(ruta_datos, os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0))
+		try:
+			for i, datos in entradas:
+				_escribir_en(fd, datos, i * TAMANO_REGISTRO)
+			os.fsync(fd)
+		finally:
+			os.close(fd)
+		# No se sabe en qué paso se interrumpió: los auxiliares se regeneran
+		_invalidar_auxiliares(ruta_datos)
+	os.remove(ruta_diario)
+	return entradas is not None
+
+def _registros_borrados(ruta_datos):
+	"""
+	Recorre el primer byte de cada registro buscando los borrados.
+
+	Returns:
+		np.array: Números de registro borrados (uint64), en orden
+	"""
+	total = os.path.getsize(ruta_datos) // TAMANO_REGISTRO
+	if total == 0:
+		return np.empty(0, dtype=np.uint64)
+	datos = np.memmap(ruta_datos, dtype=np.uint8, mode='r', shape=(total, TAMANO_REGISTRO))
+	partes = [np.empty(0, dtype=np.uint64)]
+	for inicio in range(0, total, BLOQUE_REGISTROS):
+		marcas = datos[inicio:inicio + BLOQUE_REGISTROS, 0]
+		partes.append(np.flatnonzero(marcas == MARCA_BORRADO).astype(np.uint64) + np.uint64(inicio))
+	del datos
+	return np.concatenate(partes)
+
+def guardar_libres(libres, nombre_archivo="fijos.dat"):
+	"""
+	Guarda la lista de libres de un archivo fijo (escritura atómica).
+
+	Args:
+		libres (iterable): Números de registro borrados
+		nombre_archivo (str): Nombre del archivo de longitud fija
+	"""
+	ruta_datos = ruta_archivo(nombre_archivo)
+	ruta_libres = ruta_datos + ".libres"
+	contenido = np.array([os.path.getsize(ruta_datos), *libres], dtype='<u8')
+	temporal = ruta_libres + ".tmp"
+	contenido.tofile(temporal)
+	os.replace(temporal, ruta_libres)
+
+def leer_libres(nombre_archivo="fijos.dat"):
+	"""
+	Lee la lista de libres guardada, sin verificarla ni reconstruirla.
+
+	No escribe nada, así que sirve para lecturas que no deben tener efectos
+	sobre los archivos.
+
+	Args:
+		nombre_archivo (str): Nombre del archivo de longitud fija
+
+	Returns:
+		np.array: Números de registro borrados (uint64), o None si la lista no
+				  existe o corresponde a otro tamaño del archivo
+	"""
+	ruta_datos = ruta_archivo(nombre_archivo)
+	ruta_libres = ruta_datos + ".libres"
+	if not os.path.exists(ruta_libres):
+		return None
+	contenido = np.fromfile(ruta_libres, dtype='<u8')
+	if not len(contenido) or contenido[0] != os.path.getsize(ruta_datos):
+		return None
+	return contenido[1:].astype(np.uint64)
+
+def cargar_libres(nombre_archivo="fijos.dat"):
+	"""
+	Carga la lista de registros borrados de un archivo fijo.
+
+	Antes se completa cualquier transacción pendiente. La lista guardada solo
+	se usa si corresponde al tamaño actual del archivo y todos sus registros
+	están efectivamente marcados como borrados; si no, se reconstruye.
+
+	Args:
+		nombre_archivo (str): Nombre del archivo de longitud fija
+
+	Returns:
+		np.array: Números de registro borrados (uint64)
+	"""
+	recuperar_diario(nombre_archivo)
+	ruta_datos = ruta_archivo(nombre_archivo)
+
+	libres = leer_libres(ruta_datos)
+	if libres is not None:
+		if len(libres) == 0:
+			return libres
+		total = os.path.getsize(ruta_datos) // TAMANO_REGISTRO
+		if libres.max() < total:
+			datos = np.memmap(ruta_datos, dtype=np.uint8, mode='r', shape=(total, TAMANO_REGISTRO))
+			validos = bool((datos[libres.astype(np.intp), 0] == MARCA_BORRADO).all())
+			del datos
+			if validos:
+				return libres
+
+	libres = _registros_borrados(ruta_datos)
+	guardar_libres(libres, ruta_datos)
+	return libres
+
+
+class ArchivoFijoEditable(ArchivoFijo):
+	"""
+	Archivo de longitud fija con altas, modificaciones y bajas por registro.
+
+	Cada método público es una transacción protegida por el diario. Para
+	modificar muchos registros conviene usar agregar_lote y actualizar_lote,
+	que confirman todo el lote en una sola transacción y agrupan las
+	escrituras por página.
+	"""
+
+	_modo = 'r+b'
+
+	def __init__(self, nombre_archivo="fijos.dat", sincronizar=True):
+		"""
+		Abre (o crea) el archivo fijo para modificarlo.
+
+		Args:
+			nombre_archivo (str): Nombre del archivo de longitud fija
+			sincronizar (bool): Si es True cada transacción espera a que el
+							   diario y los datos lleguen al disco (os.fsync)
+		"""
+		ruta = ruta_archivo(nombre_archivo)
+		if not os.path.exists(ruta):
+			open(ruta, 'wb').close()
+		self.sincronizar = sincronizar
+		# _borrados es la lista de libres; _libres es un heap con sus números
+		# para reutilizar primero el menor. Las entradas del heap que ya no
+		# están en _borrados se descartan al llegar a la cima
+		self._borrados = {int(i) for i in cargar_libres(ruta)}
+		self._libres = sorted(self._borrados)
+		super().__init__(ruta)
+		self.ruta_diario = self.ruta + ".diario"
+
+	@property
+	def libres(self):
+		"""list: Números de registro borrados, disponibles para reutilizar, en orden."""
+		return sorted(self._borrados)
+
+	def esta_borrado(self, i):
+		"""Indica si el registro i está borrado."""
+		return i in self._borrados
+
+	def _verificar(self, i):
+		"""Controla que el registro i exista."""
+		if i < 0 or i >= len(self):
+			raise IndexError(f"Registro {i} fuera de rango")
+
+	def _sync(self, fd):
+		if self.sincronizar:
+			os.fsync(fd)
+
+	def _escribir_diario(self, escrituras):
+		"""Guarda en el diario los registros de una transacción, con su confirmación."""
+		partes = [CABECERA_DIARIO.pack(FIRMA_DIARIO, len(escrituras))]
+		partes.extend(ENTRADA_DIARIO.pack(i, datos) for i, datos in escrituras)
+		contenido = b''.join(partes)
+		with open(self.ruta_diario, 'wb') as f:
+			f.write(contenido)
+			f.write(CRC_DIARIO.pack(zlib.crc32(contenido)))
+			f.flush()
+			self._sync(f.fileno())
+
+	def _aplicar(self, escrituras):
+		"""
+		Escribe los registros de una transacción agrupados por página.
+
+		Los registros (ya ordenados por número) que caen en la misma página de
+		TAMANO_PAGINA bytes, o que son consecutivos, forman un grupo que se
+		escribe con un único pwrite. Si dentro del grupo quedan registros sin
+		modificar, se leen primero para reescribirlos tal como estaban.
+		"""
+		grupos = []
+		for i, datos in escrituras:
+			inicio = i * TAMANO_REGISTRO
+			if grupos:
+				grupo = grupos[-1]
+				fin = grupo[-1][0] + TAMANO_REGISTRO
+				if inicio == fin or inicio // TAMANO_PAGINA == (fin - 1) // TAMANO_PAGINA:
+					grupo.append((inicio, datos))
+					continue
+			grupos.append([(inicio, datos)])
+
+		for grupo in grupos:
+			inicio = grupo[0][0]
+			fin = grupo[-1][0] + TAMANO_REGISTRO
+			if len(grupo) * TAMANO_REGISTRO == fin - inicio:
+				bloque = b''.join(datos for _, datos in grupo)
+			else:
+				bloque = bytearray(self._pread(fin - inicio, inicio))
+				for posicion, datos in grupo:
+					bloque[posicion - inicio:posicion - inicio + TAMANO_REGISTRO] = datos
+			_escribir_en(self._fd, bloque, inicio)
+
+	def _confirmar(self, escrituras, ocupados=(), liberados=()):
+		"""
+		Ejecuta una transacción.
+
+		La lista de libres en memoria cambia recién cuando el diario quedó
+		confirmado: si la transacción falla antes, el objeto sigue reflejando
+		el archivo.
+
+		Args:
+			escrituras (dict): Número de registro -> bytes nuevos del registro
+			ocupados (iterable): Registros borrados que la transacción vuelve a ocupar
+			liberados (iterable): Registros que la transacción borra
+		"""
+		if not escrituras:
+			return
+		total_anterior = len(self)
+		escrituras = sorted(escrituras.items())
+
+		self._escribir_diario(escrituras)
+		self._actualizar_libres(ocupados, liberados)
+		self._aplicar(escrituras)
+		self._sync(self._fd)
+
+		guardar_libres(self._borrados, self.ruta)
+		if escrituras[0][0] < total_anterior:
+			# Cambiaron registros existentes: los auxiliares se regeneran al usarse
+			for extension in AUXILIARES:
+				if os.path.exists(self.ruta + extension):
+					os.remove(self.ruta + extension)
+		os.remove(self.ruta_diario)
+
+	def _actualizar_libres(self, ocupados, liberados):
+		"""Aplica a la lista de libres en memoria el resultado de una transacción."""
+		for i in ocupados:
+			self._borrados.discard(i)
+		for i in liberados:
+			if i not in self._borrados:
+				self._borrados.add(i)
+				heapq.heappush(self._libres, i)
+		libres, borrados = self._libres, self._borrados
+		while libres and libres[0] not in borrados:
+			heapq.heappop(libres)
+		# Si se acumulan muchas entradas descartadas el heap se rehace
+		if len(libres) > 2 * len(borrados) + 64:
+			self._libres = sorted(borrados)
+
+	def _menores_libres(self, cantidad):
+		"""
+		Los 'cantidad' registros libres de menor número, sin modificar el heap.
+
+		Recorre el heap desde la cima con una frontera ordenada, así que cuesta
+		O(k log k) para k registros elegidos.
+		"""
+		libres, borrados = self._libres, self._borrados
+		elegidos, frontera = [], [(libres[0], 0)] if libres else []
+		while frontera and len(elegidos) < cantidad:
+			i, posicion = heapq.heappop(frontera)
+			# Un número borrado, reocupado y vuelto a borrar puede estar repetido;
+			# las copias salen seguidas porque la frontera sale en orden
+			if i in borrados and (not elegidos or elegidos[-1] != i):
+				elegidos.append(i)
+			for hijo in (2 * posicion + 1, 2 * posicion + 2):
+				if hijo < len(libres):
+					heapq.heappush(frontera, (libres[hijo], hijo))
+		return elegidos
+
+	def _ubicar(self, cantidad, reutilizar):
+		"""Elige los números de registro para 'cantidad' altas (sin modificar los libres)."""
+		posiciones = self._menores_libres(cantidad) if reutilizar else []
+		total = len(self)
+		posiciones.extend(range(total, total + cantidad - len(posiciones)))
+		return posiciones
+
+	def agregar_lote(self, personas, reutilizar=True):
+		"""
+		Agrega varias personas en una sola transacción.
+
+		Args:
+			personas (iterable): Objetos Persona a agregar
+			reutilizar (bool): Si es True se ocupan primero los registros borrados
+
+		Returns:
+			list: Número de registro asignado a cada persona
+		"""
+		registros = [codificar_registro(p) for p in personas]
+		posiciones = self._ubicar(len(registros), reutilizar)
+		self._confirmar(dict(zip(posiciones, registros)),
+						ocupados=[i for i in posiciones if i in self._borrados])
+		return posiciones
+
+	def agregar(self, persona, reutilizar=True):
+		"""
+		Agrega una persona.
+
+		Args:
+			persona (Persona): Persona a agregar
+			reutilizar (bool): Si es True ocupa el lugar de un registro borrado
+							  (si hay alguno) en lugar de escribir al final
+
+		Returns:
+			int: Número de registro asignado
+		"""
+		return self.agregar_lote([persona], reutilizar)[0]
+
+	def actualizar_lote(self, cambios):
+		"""
+		Modifica varios registros en una sola transacción.
+
+		Args:
+			cambios (iterable or dict): Pares (número de registro, Persona); una
+									   Persona None borra el registro. Si un
+									   registro aparece varias veces vale el último
+
+		Raises:
+			IndexError: Si algún registro no existe
+		"""
+		cambios = dict(cambios.items() if isinstance(cambios, dict) else cambios)
+		escrituras, ocupados, liberados = {}, [], []
+		for i, persona in cambios.items():
+			self._verificar(i)
+			if persona is None:
+				escrituras[i] = REGISTRO_BORRADO
+				liberados.append(i)
+			else:
+				escrituras[i] = codificar_registro(persona)
+				ocupados.append(i)
+		self._confirmar(escrituras, ocupados, liberados)
+
+	def actualizar(self, i, persona):
+		"""
+		Reemplaza el registro i con un único pwrite de 121 bytes.
+
+		Args:
+			i (int): Número de registro (desde 0)
+			persona (Persona): Nuevos datos del registro
+
+		Raises:
+			IndexError: Si el registro no existe
+		"""
+		self.actualizar_lote([(i, persona)])
+
+	def borrar(self, i):
+		"""
+		Marca el registro i como borrado y lo agrega a la lista de libres.
+
+		Args:
+			i (int): Número de registro (desde 0)
+
+		Raises:
+			IndexError: Si el registro no existe
+		"""
+		self.actualizar_lote([(i, None)])
+
+	def __iter__(self):
+		"""Recorre los registros no borrados como pares (número, Persona)."""
+		for i in range(len(self)):
+			persona = self.obtener(i)
+			if persona is not None:
+				yield i, persona
+
+
+if __name__ == "__main__":
+	import tempfile
+
+	from ej_5 import generar_personas, guardar_longitud_fija, leer_longitud_fija
+
+	with tempfile.TemporaryDirectory() as tmp:
+		ruta = os.path.join(tmp, "fijos.dat")
+		guardar_longitud_fija(generar_personas(20), ruta)
+
+		with ArchivoFijoEditable(ruta) as archivo:
+			archivo.borrar(3)
+			archivo.borrar(7)
+			print(f"Borrados 3 y 7, libres: {archivo.libres}")
+
+			persona = archivo.obtener(0)
+			persona.direccion = "Av. Siempreviva 742, Springfield"
+			archivo.actualizar(0, persona)
+
+			nuevas = list(generar_personas(23))[20:]
+			print(f"Agregadas en los registros: {archivo.agregar_lote(nuevas)}")
+			print(f"Registros: {len(archivo)}, libres: {archivo.libres}")
+
+		# Transacción interrumpida después de confirmar el diario
+		with ArchivoFijoEditable(ruta) as archivo:
+			persona = archivo.obtener(1)
+			persona.nombre = "Recuperado Desde Diario"
+			archivo._escribir_diario([(1, codificar_registro(persona))])
+		print(f"Transacción rehecha al abrir: {recuperar_diario(ruta)}")
+
+		for i, p in enumerate(leer_longitud_fija(ruta)):
+			if i < 3:
+				print(f"  {p.nombre} | {p.direccion} | {p.dni}")
+		print(f"Lectura secuencial: {i + 1} registros vivos")
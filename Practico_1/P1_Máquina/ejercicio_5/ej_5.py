@@ -6,17 +6,37 @@
 import os
 import struct
 
+# Tamaño de los lotes de registros que se acumulan antes de cada escritura
+TAMANO_LOTE = 4096
+
+# Estructura fija del registro (ver guardar_longitud_fija)
+FORMATO_FIJO = struct.Struct('50s 60s 10s B')
+
+# Primer byte del nombre de un registro fijo borrado (ver edicion_fija.py).
+# 0xFF nunca aparece en texto UTF-8, así que no se confunde con un nombre real
+MARCA_BORRADO = 0xFF
+
+# Representación 'S;N;...' de cada uno de los 256 valores posibles de los
+# 8 campos S/N (bit i = campo i), y la tabla inversa para la lectura
+CAMPOS_A_SN = [';'.join('S' if c & (1 << i) else 'N' for i in range(8)) for c in range(256)]
+SN_A_CAMPOS = {sn: c for c, sn in enumerate(CAMPOS_A_SN)}
+
 # Definimos la estructura para los datos de una persona
 class Persona:
 	"""
 	Clase que representa los datos de una persona con campos fijos y variables.
 	
+	Usa __slots__ (sin __dict__ por instancia) y guarda los 8 campos S/N como
+	un único entero, para que millones de personas ocupen poca memoria.
+	
 	Attributes:
 		nombre (str): Apellido y nombre de la persona
 		direccion (str): Dirección de residencia
 		dni (str): Documento Nacional de Identidad
-		campos_sn (list): Lista de 8 valores booleanos para campos S/N
+		campos (int): Los 8 campos S/N empaquetados (bit i = campo i)
 	"""
+	__slots__ = ('nombre', 'direccion', 'dni', 'campos')
+	
 	def __init__(self, nombre, direccion, dni, estudios, vivienda, etc):
 		"""
 		Inicializa una nueva instancia de Persona.
@@ -32,17 +52,66 @@ class Persona:
 		self.nombre = nombre
 		self.direccion = direccion
 		self.dni = dni
-		# Concatenamos las listas para formar los 8 campos S/N como booleanos
-		self.campos_sn = estudios + vivienda + etc
+		# Concatenamos las listas y empaquetamos los 8 campos S/N en un entero
+		campos = 0
+		for i, valor in enumerate(estudios + vivienda + etc):
+			if valor:
+				campos |= 1 << i
+		self.campos = campos
+	
+	@classmethod
+	def desde_campos(cls, nombre, direccion, dni, campos):
+		"""
+		Crea una Persona a partir de los campos S/N ya empaquetados.
+		
+		Args:
+			nombre (str): Apellido y nombre completo
+			direccion (str): Dirección de la persona
+			dni (str): DNI como string
+			campos (int): Los 8 campos S/N empaquetados (bit i = campo i)
+		
+		Returns:
+			Persona: Nueva instancia
+		"""
+		p = cls.__new__(cls)
+		p.nombre = nombre
+		p.direccion = direccion
+		p.dni = dni
+		p.campos = campos
+		return p
+	
+	@property
+	def campos_sn(self):
+		"""list: Los 8 campos S/N como booleanos."""
+		return [bool(self.campos & (1 << i)) for i in range(8)]
 
-def guardar_longitud_fija(personas, nombre_archivo="fijos.dat"):
+def ruta_archivo(nombre_archivo):
 	"""
-	Guarda una lista de personas en un archivo con campos de longitud fija.
+	Resuelve el nombre de un archivo de datos relativo al directorio del script.
+	Las rutas absolutas se devuelven sin cambios.
+	
+	Args:
+		nombre_archivo (str): Nombre o ruta del archivo
+	
+	Returns:
+		str: Ruta completa del archivo
+	"""
+	directorio_script = os.path.dirname(os.path.abspath(__file__))
+	return os.path.join(directorio_script, nombre_archivo)
+
+def guardar_longitud_fija(personas, nombre_archivo="fijos.dat", tamano_lote=TAMANO_LOTE):
+	"""
+	Guarda personas en un archivo con campos de longitud fija.
 	Cada registro ocupa exactamente el mismo espacio en disco.
 	
+	Acepta cualquier iterable (por ejemplo un generador): los registros se
+	empaquetan por lotes y cada lote se escribe con una sola operación, por
+	lo que la memoria usada no depende de la cantidad de personas.
+	
 	Args:
-		personas (list): Lista de objetos Persona a guardar
+		personas (iterable): Objetos Persona a guardar
 		nombre_archivo (str): Nombre del archivo donde guardar los datos
+		tamano_lote (int): Cantidad de registros por escritura
 	
 	Estructura del archivo:
 		- Cada registro: 121 bytes fijos
@@ -51,45 +120,41 @@ def guardar_longitud_fija(personas, nombre_archivo="fijos.dat"):
 		- DNI: 10 bytes (padded con nulls si es menor)
 		- Campos S/N: 1 byte (8 bits para 8 campos booleanos)
 	"""
-	# Obtenemos el directorio del script actual para crear archivos relativos
-	directorio_script = os.path.dirname(os.path.abspath(__file__))
-	ruta_completa = os.path.join(directorio_script, nombre_archivo)
+	# Los archivos se crean relativos al directorio del script
+	ruta_completa = ruta_archivo(nombre_archivo)
 	
-	# Definimos la estructura fija usando el formato de struct:
+	# Estructura fija (FORMATO_FIJO) usando el formato de struct:
 	# - 50s: string de 50 bytes para el nombre (apellido y nombre)
 	# - 60s: string de 60 bytes para la dirección
 	# - 10s: string de 10 bytes para el DNI
-	# - B: 1 byte (unsigned char) para empaquetar los 8 booleanos
+	# - B: 1 byte (unsigned char) con los 8 booleanos ya empaquetados en p.campos
 	# Tamaño total del registro: 50 + 60 + 10 + 1 = 121 bytes por persona
-	formato = '50s 60s 10s B'
+	empaquetar = FORMATO_FIJO.pack
 	
 	with open(ruta_completa, 'wb') as f:
+		lote = []
 		for p in personas:
-			# Empaquetamos los 8 campos booleanos en un solo byte usando operaciones de bits
-			# Cada bit representa un campo S/N (True=1, False=0)
-			campos_empaquetados = 0
-			for i, valor in enumerate(p.campos_sn):
-				if valor:
-					# Establecemos el bit en la posición i si el valor es True
-					campos_empaquetados |= (1 << i)
-
-			# Empaquetamos y escribimos el registro completo en formato binario
 			# struct.pack convierte los datos a bytes según el formato especificado
-			registro = struct.pack(formato, 
-								   p.nombre.encode('utf-8'),     # Convertimos string a bytes
-								   p.direccion.encode('utf-8'),  # Convertimos string a bytes
-								   p.dni.encode('utf-8'),        # Convertimos string a bytes
-								   campos_empaquetados)          # Ya es un entero (0-255)
-			f.write(registro)
+			lote.append(empaquetar(p.nombre.encode('utf-8'),
+								   p.direccion.encode('utf-8'),
+								   p.dni.encode('utf-8'),
+								   p.campos))
+			if len(lote) >= tamano_lote:
+				f.write(b''.join(lote))
+				lote = []
+		f.write(b''.join(lote))
 
-def guardar_longitud_variable(personas, nombre_archivo="variable.dat"):
+def guardar_longitud_variable(personas, nombre_archivo="variable.dat", tamano_lote=TAMANO_LOTE):
 	"""
-	Guarda una lista de personas en un archivo con campos de longitud variable.
+	Guarda personas en un archivo con campos de longitud variable.
 	Utiliza formato tipo CSV con delimitadores, ocupando solo el espacio necesario.
 	
+	Acepta cualquier iterable (por ejemplo un generador) y escribe por lotes.
+	
 	Args:
-		personas (list): Lista de objetos Persona a guardar
+		personas (iterable): Objetos Persona a guardar
 		nombre_archivo (str): Nombre del archivo donde guardar los datos
+		tamano_lote (int): Cantidad de líneas por escritura
 	
 	Formato del archivo:
 		- Una línea por persona
@@ -97,32 +162,117 @@ def guardar_longitud_variable(personas, nombre_archivo="variable.dat"):
 		- Campos S/N representados como 'S' o 'N'
 		- Codificación UTF-8 para soportar caracteres especiales
 	"""
-	# Obtenemos el directorio del script actual para crear archivos relativos
-	directorio_script = os.path.dirname(os.path.abspath(__file__))
-	ruta_completa = os.path.join(directorio_script, nombre_archivo)
+	# Los archivos se crean relativos al directorio del script
+	ruta_completa = ruta_archivo(nombre_archivo)
 	
 	with open(ruta_completa, 'w', encoding='utf-8') as f:
+		lote = []
 		for p in personas:
-			# Convertimos la lista de booleanos a una lista de strings 'S'/'N'
-			campos_str = ['S' if valor else 'N' for valor in p.campos_sn]
-			
-			# Unimos todos los campos con punto y coma como delimitador
 			# Formato: "Nombre;Dirección;DNI;Campo1;Campo2;...;Campo8"
-			linea = ";".join([p.nombre, p.direccion, p.dni] + campos_str)
-			
-			# Escribimos la línea completa seguida de un salto de línea
-			f.write(linea + '\n')
+			# Los campos 'S'/'N' salen de la tabla precalculada para los 256 valores
+			lote.append(f"{p.nombre};{p.direccion};{p.dni};{CAMPOS_A_SN[p.campos]}\n")
+			if len(lote) >= tamano_lote:
+				f.write(''.join(lote))
+				lote = []
+		f.write(''.join(lote))
 
-# --- Programa principal ---
-if __name__ == "__main__":
-	# Obtenemos el directorio del script actual para las operaciones de archivo
-	directorio_script = os.path.dirname(os.path.abspath(__file__))
+def leer_longitud_fija(nombre_archivo="fijos.dat", tamano_lote=TAMANO_LOTE):
+	"""
+	Recupera las personas de un archivo de longitud fija.
 	
-	# 1. Generamos 20 registros de ejemplo con datos variados
-	print("Generando 20 registros de ejemplo...")
-	personas_ejemplo = []
+	Lee bloques de 'tamano_lote' registros y los decodifica con
+	struct.iter_unpack; la memoria usada no depende del tamaño del archivo.
+	Los registros borrados (nombre que empieza con MARCA_BORRADO) se omiten.
+	
+	Args:
+		nombre_archivo (str): Nombre del archivo de longitud fija
+		tamano_lote (int): Cantidad de registros leídos por bloque
 	
-	for i in range(1, 21):
+	Yields:
+		Persona: Cada registro del archivo, en orden
+	"""
+	with open(ruta_archivo(nombre_archivo), 'rb') as f:
+		while True:
+			bloque = f.read(FORMATO_FIJO.size * tamano_lote)
+			if not bloque:
+				break
+			# Se descarta un registro final incompleto
+			bloque = bloque[:len(bloque) - len(bloque) % FORMATO_FIJO.size]
+			for nombre, direccion, dni, campos in FORMATO_FIJO.iter_unpack(bloque):
+				if nombre[0] == MARCA_BORRADO:
+					continue
+				yield Persona.desde_campos(nombre.rstrip(b'\0').decode('utf-8', errors='ignore'),
+										   direccion.rstrip(b'\0').decode('utf-8', errors='ignore'),
+										   dni.rstrip(b'\0').decode('utf-8', errors='ignore'),
+										   campos)
+
+def parsear_linea(linea):
+	"""
+	Convierte una línea del archivo variable en un objeto Persona.
+	
+	Los 8 campos S/N y el DNI se toman desde el final de la línea, por lo que
+	un ';' dentro de la dirección no desplaza los demás campos.
+	
+	Args:
+		linea (str): Línea con formato "Nombre;Dirección;DNI;S;N;...;N"
+	
+	Returns:
+		Persona: Persona reconstruida
+	
+	Raises:
+		ValueError: Si la línea no tiene la cantidad mínima de campos
+	"""
+	campos = linea.rstrip('\r\n').rsplit(';', 9)
+	if len(campos) != 10 or ';' not in campos[0]:
+		raise ValueError(f"Línea con formato inválido: {linea!r}")
+	nombre, direccion = campos[0].split(';', 1)
+	sn = ';'.join(campos[2:])
+	if sn not in SN_A_CAMPOS:
+		raise ValueError(f"Campos S/N inválidos: {sn!r}")
+	return Persona.desde_campos(nombre, direccion, campos[1], SN_A_CAMPOS[sn])
+
+def leer_longitud_variable(nombre_archivo="variable.dat", tamano_bloque=1 << 20):
+	"""
+	Recupera las personas de un archivo de longitud variable.
+	
+	El archivo se lee en bloques de 'tamano_bloque' bytes y cada bloque se
+	divide en líneas de una sola vez; la línea incompleta del final del bloque
+	se completa con el bloque siguiente. La memoria usada no depende del
+	tamaño del archivo.
+	
+	Args:
+		nombre_archivo (str): Nombre del archivo de longitud variable
+		tamano_bloque (int): Cantidad de bytes leídos por bloque
+	
+	Yields:
+		Persona: Cada registro del archivo, en orden
+	"""
+	with open(ruta_archivo(nombre_archivo), 'rb') as f:
+		resto = b''
+		while True:
+			bloque = f.read(tamano_bloque)
+			if not bloque:
+				break
+			lineas = (resto + bloque).split(b'\n')
+			# El último elemento es una línea incompleta (o vacío)
+			resto = lineas.pop()
+			for linea in lineas:
+				if linea:
+					yield parsear_linea(linea.decode('utf-8'))
+		if resto:
+			yield parsear_linea(resto.decode('utf-8'))
+
+def generar_personas(cantidad):
+	"""
+	Genera personas de ejemplo con datos variados, de a una por vez.
+	
+	Args:
+		cantidad (int): Cantidad de personas a generar
+	
+	Yields:
+		Persona: Personas numeradas desde 1
+	"""
+	for i in range(1, cantidad + 1):
 		# Creamos datos de ejemplo que varían en longitud para probar eficiencia
 		nombre = f"Apellido{i} Nombre{i}"
 		direccion = f"Calle Falsa {i*10}, Ciudad"
@@ -148,14 +298,25 @@ if __name__ == "__main__":
 		total_campos = len(estudios) + len(vivienda) + len(etc)
 		assert total_campos == 8, f"Se requieren exactamente 8 campos, se encontraron {total_campos}"
 		
-		personas_ejemplo.append(Persona(nombre, direccion, dni, estudios, vivienda, etc))
+		yield Persona(nombre, direccion, dni, estudios, vivienda, etc)
+
+# --- Programa principal ---
+if __name__ == "__main__":
+	# Obtenemos el directorio del script actual para las operaciones de archivo
+	directorio_script = os.path.dirname(os.path.abspath(__file__))
+	
+	# 1. Generamos 20 registros de ejemplo con datos variados
+	# Las personas se generan de a una (generar_personas) y se escriben a
+	# medida que se generan, sin armar una lista en memoria
+	cantidad = 20
+	print(f"Generando {cantidad} registros de ejemplo...")
 
 	# 2. Guardamos los datos usando ambos métodos de almacenamiento
 	print("Guardando datos en archivo de longitud fija...")
-	guardar_longitud_fija(personas_ejemplo)
+	guardar_longitud_fija(generar_personas(cantidad))
 	
 	print("Guardando datos en archivo de longitud variable...")
-	guardar_longitud_variable(personas_ejemplo)
+	guardar_longitud_variable(generar_personas(cantidad))
 
 	# 3. Comparamos los tamaños de los archivos generados
 	archivo_fijo = os.path.join(directorio_script, "fijos.dat")
@@ -190,6 +351,43 @@ if __name__ == "__main__":
 		print("➤ Ambos archivos tienen exactamente el mismo tamaño.")
 	
 	print("="*50)
-	print(f"Registros procesados: {len(personas_ejemplo)}")
-	print(f"Bytes por registro (fijo): {tamano_fijo // len(personas_ejemplo)}")
-	print(f"Bytes promedio por registro (variable): {tamano_variable // len(personas_ejemplo)}")
\ No newline at end of file
+	print(f"Registros procesados: {cantidad}")
+	print(f"Bytes por registro (fijo): {tamano_fijo // cantidad}")
+	print(f"Bytes promedio por registro (variable): {tamano_variable // cantidad}")
+
+	# 4. Formato columnar (requiere numpy): tamaño y velocidad de lectura
+	try:
+		import time
+		from almacenamiento_fijo import leer_fijos
+		from almacenamiento_columnar import ArchivoColumnar, guardar_columnar
+	except ImportError:
+		print("\n(Instale numpy para comparar también el formato columnar)")
+	else:
+		guardar_columnar(generar_personas(cantidad), "columnar")
+		columnar = ArchivoColumnar("columnar")
+
+		# Lectura completa de cada formato (decodificando a objetos Persona en
+		# los tres casos) y lectura de solo los DNIs
+		lecturas = [
+			("fijos.dat", tamano_fijo,
+			 lambda: list(leer_longitud_fija("fijos.dat")), lambda: leer_fijos("fijos.dat")['dni'].copy()),
+			("variable.dat", tamano_variable,
+			 lambda: list(leer_longitud_variable("variable.dat")),
+			 lambda: [p.dni for p in leer_longitud_variable("variable.dat")]),
+			("columnar/", columnar.tamano(),
+			 lambda: list(ArchivoColumnar("columnar").personas()),
+			 lambda: ArchivoColumnar("columnar").columna('dni').copy()),
+		]
+
+		print("\n" + "="*50)
+		print("     FORMATO COLUMNAR")
+		print("="*50)
+		print(f"{'Formato':14s} {'Bytes':>8s} {'Lectura (ms)':>13s} {'Solo DNI (ms)':>14s}")
+		for nombre, tamano, leer_todo, leer_dni in lecturas:
+			tiempos = []
+			for lectura in (leer_todo, leer_dni):
+				inicio = time.perf_counter()
+				lectura()
+				tiempos.append((time.perf_counter() - inicio) * 1000)
+			print(f"{nombre:14s} {tamano:8,} {tiempos[0]:13.3f} {tiempos[1]:14.3f}")
+		print("="*50)
\ No newline at end of file
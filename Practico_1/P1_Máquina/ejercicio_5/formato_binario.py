@@ -0,0 +1,446 @@
+"""
+Formato binario de longitud variable con prefijos varint ("binario.dat").
+
+Los registros se agrupan en bloques de hasta TAMANO_LOTE registros. Cada
+bloque tiene la forma:
+
+	- varint: cantidad de registros del bloque (n)
+	- varint: tamaño en bytes del resto del bloque
+	- n bytes: los 8 campos S/N de cada registro (bit i = campo i)
+	- n varints: longitud en bytes de cada nombre
+	- n varints: longitud en bytes de cada dirección
+	- n varints: DNI de cada registro; dni << 1 si es numérico sin ceros a la
+	  izquierda y de hasta DIGITOS_DNI_ENTERO dígitos, o (len(dni) << 1) | 1
+	  si se guarda como texto
+	- Nombres en UTF-8, concatenados
+	- Direcciones en UTF-8, concatenadas
+	- DNIs guardados como texto (si los hay), concatenados
+
+Un varint guarda 7 bits por byte (el bit alto indica que sigue otro byte), así
+que las longitudes menores a 128 ocupan 1 byte y un DNI de 8 dígitos ocupa 4.
+A diferencia de variable.dat no hay delimitadores: un ';' o un salto de línea
+dentro de la dirección no corrompe el registro, y los 8 campos S/N ocupan
+1 byte en lugar de 16.
+
+Los prefijos de longitud de un bloque están juntos, por lo que se decodifican
+todos a la vez con operaciones vectorizadas de NumPy, y los textos de cada
+columna se decodifican con una sola llamada a decode por bloque.
+"""
+import numpy as np
+
+from ej_5 import Persona, ruta_archivo
+
+# Cantidad máxima de registros por bloque
+TAMANO_LOTE = 4096
+
+# Tamaño de los bloques de bytes leídos por el lector secuencial
+TAMANO_LECTURA = 1 << 20
+
+# Dígitos máximos de un DNI guardado como entero: 10^18 << 1 < 2^63, así el
+# valor entra en los int64 de decodificar_varints; los más largos van como texto
+DIGITOS_DNI_ENTERO = 18
+
+
+class RegistroIncompleto(ValueError):
+	"""El buffer termina en medio de un bloque."""
+
+
+def codificar_varint(valor):
+	"""
+	Codifica un entero no negativo como varint.
+
+	Args:
+		valor (int): Entero a codificar
+
+	Returns:
+		bytes: Representación varint
+	"""
+	salida = bytearray()
+	while valor >= 0x80:
+		salida.append((valor & 0x7F) | 0x80)
+		valor >>= 7
+	salida.append(valor)
+	return bytes(salida)
+
+def decodificar_varint(buffer, posicion):
+	"""
+	Decodifica un varint desde una posición del buffer.
+
+	Args:
+		buffer (bytes or memoryview): Datos codificados
+		posicion (int): Posición del primer byte del varint
+
+	Returns:
+		tuple: (valor, posición siguiente)
+
+	Raises:
+		RegistroIncompleto: Si el buffer termina en medio del varint
+	"""
+	valor = 0
+	desplazamiento = 0
+	while True:
+		if posicion >= len(buffer):
+			raise RegistroIncompleto("Varint incompleto")
+		b = buffer[posicion]
+		posicion += 1
+		valor |= (b & 0x7F) << desplazamiento
+		if b < 0x80:
+			return valor, posicion
+		desplazamiento += 7
+
+def codificar_varints(valores):
+	"""
+	Codifica un array de enteros no negativos como varints consecutivos.
+
+	Args:
+		valores (array-like): Enteros a codificar
+
+	Returns:
+		np.array: Bytes (uint8) con todos los varints concatenados
+	"""
+	valores = np.asarray(valores, dtype=np.uint64)
+	# Cantidad de bytes de cada varint: 1 + cantidad de grupos de 7 bits extra
+	largos = np.ones(len(valores), dtype=np.int64)
+	for k in range(1, 10):
+		mas_grande = valores >= np.uint64(1 << (7 * k))
+		if not mas_grande.any():
+			break
+		largos += mas_grande
+
+	inicios = np.cumsum(largos) - largos
+	salida = np.empty(int(largos.sum()), dtype=np.uint8)
+	for k in range(int(largos.max()) if len(largos) else 0):
+		activos = largos > k
+		grupo = (valores[activos] >> np.uint64(7 * k)) & np.uint64(0x7F)
+		continua = np.where(largos[activos] > k + 1, 0x80, 0).astype(np.uint64)
+		salida[inicios[activos] + k] = (grupo | continua).astype(np.uint8)
+	return salida
+
+def decodificar_varints(datos, inicio, cantidad):
+	"""
+	Decodifica 'cantidad' varints consecutivos de forma vectorizada.
+
+	Los bytes menores a 0x80 terminan cada varint, así que los finales se
+	obtienen con np.flatnonzero y los valores con np.add.reduceat.
+
+	Args:
+		datos (np.array): Buffer de bytes (uint8)
+		inicio (int): Posición del primer varint
+		cantidad (int): Cantidad de varints a decodificar
+
+	Returns:
+		tuple: (valores int64, posición siguiente al último varint)
+
+	Raises:
+		RegistroIncompleto: Si el buffer no contiene todos los varints
+	"""
+	if cantidad == 0:
+		return np.empty(0, dtype=np.int64), inicio
+
+	# Como máximo 10 bytes por varint
+	ventana = datos[inicio:inicio + 10 * cantidad]
+	finales = np.flatnonzero(ventana < 0x80)[:cantidad]
+	if len(finales) < cantidad:
+		raise RegistroIncompleto("Varints incompletos")
+
+	fin = int(finales[-1]) + 1
+	seccion = ventana[:fin].astype(np.int64)
+	comienzos = np.empty(cantidad, dtype=np.int64)
+	comienzos[0] = 0
+	comienzos[1:] = finales[:-1] + 1
+
+	if fin == cantidad:
+		# Caso común: todos los varints ocupan 1 byte
+		return seccion, inicio + fin
+
+	# Posición de cada byte dentro de su varint para calcular su desplazamiento
+	largos = finales + 1 - comienzos
+	indice = np.arange(fin) - np.repeat(comienzos, largos)
+	valores = np.add.reduceat((seccion & 0x7F) << (7 * indice), comienzos)
+	return valores, inicio + fin
+
+def _textos_a_bytes(textos):
+	"""Codifica una lista de strings y devuelve (bytes concatenados, longitudes)."""
+	codificados = [t.encode('utf-8') for t in textos]
+	largos = np.fromiter(map(len, codificados), dtype=np.int64, count=len(codificados))
+	return b''.join(codificados), largos
+
+def _bytes_a_textos(datos, largos):
+	"""
+	Decodifica textos UTF-8 concatenados dadas sus longitudes en bytes.
+
+	Si la sección no contiene bytes nulos (el caso normal) se intercala un
+	byte nulo entre textos y se resuelve todo con un decode y un split. Si no, se
+	decodifica la sección completa y los límites en bytes se convierten en
+	posiciones de carácter descontando los bytes de continuación UTF-8.
+
+	Args:
+		datos (np.array): Bytes (uint8) de la sección de textos
+		largos (np.array): Longitud en bytes de cada texto
+
+	Returns:
+		list: Strings decodificados
+	"""
+	if len(largos) == 0:
+		return []
+
+	limites = np.zeros(len(largos) + 1, dtype=np.int64)
+	np.cumsum(largos, out=limites[1:])
+
+	if not (datos == 0).any():
+		separados = np.insert(datos, limites[1:-1], 0)
+		return separados.tobytes().decode('utf-8').split('\0')
+
+	texto = datos.tobytes().decode('utf-8')
+	if len(texto) != len(datos):
+		continuacion = np.flatnonzero((datos & 0xC0) == 0x80)
+		limites -= np.searchsorted(continuacion, limites)
+	limites = limites.tolist()
+	return [texto[a:b] for a, b in zip(limites, limites[1:])]
+
+def codificar_bloque(registros):
+	"""
+	Codifica un bloque de registros.
+
+	Args:
+		registros (list): Tuplas (nombre, direccion, dni, campos) con campos
+						 como entero de 8 bits
+
+	Returns:
+		bytes: Bloque codificado (cabecera incluida)
+	"""
+	nombres, direcciones, dnis, campos = zip(*registros) if registros else ((), (), (), ())
+
+	datos_nombres, largos_nombres = _textos_a_bytes(nombres)
+	datos_direcciones, largos_direcciones = _textos_a_bytes(direcciones)
+
+	# DNIs numéricos como entero; el resto como texto con la marca en el bit 0
+	valores_dni = []
+	textos_dni = []
+	for dni in dnis:
+		if (dni.isdigit() and dni.isascii() and len(dni) <= DIGITOS_DNI_ENTERO
+				and (dni[0] != '0' or len(dni) == 1)):
+			valores_dni.append(int(dni) << 1)
+		else:
+			datos = dni.encode('utf-8')
+			valores_dni.append((len(datos) << 1) | 1)
+			textos_dni.append(datos)
+
+	cuerpo = b''.join([
+		bytes(campos),
+		codificar_varints(np.concatenate([largos_nombres, largos_direcciones])).tobytes(),
+		codificar_varints(np.array(valores_dni, dtype=np.uint64)).tobytes(),
+		datos_nombres,
+		datos_direcciones,
+		b''.join(textos_dni),
+	])
+	return codificar_varint(len(registros)) + codificar_varint(len(cuerpo)) + cuerpo
+
+def decodificar_bloque(buffer, posicion=0):
+	"""
+	Decodifica un bloque de registros.
+
+	Args:
+		buffer (bytes or memoryview): Datos codificados
+		posicion (int): Posición donde empieza el bloque
+
+	Returns:
+		tuple: (lista de tuplas (nombre, direccion, dni, campos),
+				posición siguiente al bloque)
+
+	Raises:
+		RegistroIncompleto: Si el buffer termina antes del final del bloque
+	"""
+	n, posicion = decodificar_varint(buffer, posicion)
+	tamano, posicion = decodificar_varint(buffer, posicion)
+	fin_bloque = posicion + tamano
+	if fin_bloque > len(buffer):
+		raise RegistroIncompleto("Bloque incompleto")
+
+	datos = np.frombuffer(memoryview(buffer), dtype=np.uint8)[posicion:fin_bloque]
+	campos = datos[:n].tolist()
+	largos, p = decodificar_varints(datos, n, 2 * n)
+	valores_dni, p = decodificar_varints(datos, p, n)
+
+	largos_nombres, largos_direcciones = largos[:n], largos[n:]
+	fin_nombres = p + int(largos_nombres.sum())
+	fin_direcciones = fin_nombres + int(largos_direcciones.sum())
+	nombres = _bytes_a_textos(datos[p:fin_nombres], largos_nombres)
+	direcciones = _bytes_a_textos(datos[fin_nombres:fin_direcciones], largos_direcciones)
+
+	es_texto = (valores_dni & 1).astype(bool)
+	dnis = list(map(str, (valores_dni >> 1).tolist()))
+	if es_texto.any():
+		indices = np.flatnonzero(es_texto)
+		largos_dni = valores_dni[indices] >> 1
+		fin_dnis = fin_direcciones + int(largos_dni.sum())
+		for i, texto in zip(indices.tolist(), _bytes_a_textos(datos[fin_direcciones:fin_dnis], largos_dni)):
+			dnis[i] = texto
+
+	return list(zip(nombres, direcciones, dnis, campos)), fin_bloque
+
+def codificar_registros(registros, tamano_lote=TAMANO_LOTE):
+	"""
+	Codifica una lista de registros en bloques consecutivos.
+
+	Args:
+		registros (list): Tuplas (nombre, direccion, dni, campos)
+		tamano_lote (int): Cantidad máxima de registros por bloque
+
+	Returns:
+		bytes: Bloques codificados
+	"""
+	return b''.join(codificar_bloque(registros[i:i + tamano_lote])
+					for i in range(0, len(registros), tamano_lote))
+
+def decodificar_registros(buffer, posicion=0):
+	"""
+	Decodifica todos los bloques completos de un buffer.
+
+	Args:
+		buffer (bytes or memoryview): Datos codificados
+		posicion (int): Posición donde empieza el primer bloque
+
+	Returns:
+		tuple: (lista de tuplas (nombre, direccion, dni, campos),
+				posición donde termina el último bloque completo)
+	"""
+	registros = []
+	while posicion < len(buffer):
+		try:
+			bloque, posicion = decodificar_bloque(buffer, posicion)
+		except RegistroIncompleto:
+			break
+		registros.extend(bloque)
+	return registros, posicion
+
+def persona_a_registro(p):
+	"""Convierte una Persona en la tupla (nombre, direccion, dni, campos)."""
+	return p.nombre, p.direccion, p.dni, p.campos
+
+def registro_a_persona(registro):
+	"""Convierte una tupla (nombre, direccion, dni, campos) en una Persona."""
+	nombre, direccion, dni, campos = registro
+	return Persona.desde_campos(nombre, direccion, dni, campos)
+
+def guardar_binario(personas, nombre_archivo="binario.dat", tamano_lote=TAMANO_LOTE):
+	"""
+	Guarda personas en el formato binario, un bloque por lote.
+
+	Args:
+		personas (iterable): Objetos Persona
+		nombre_archivo (str): Nombre del archivo binario
+		tamano_lote (int): Cantidad de registros por bloque
+	"""
+	with open(ruta_archivo(nombre_archivo), 'wb') as f:
+		lote = []
+		for p in personas:
+			lote.append(persona_a_registro(p))
+			if len(lote) >= tamano_lote:
+				f.write(codificar_bloque(lote))
+				lote = []
+		if lote:
+			f.write(codificar_bloque(lote))
+
+def leer_binario_registros(nombre_archivo="binario.dat", tamano_lectura=TAMANO_LECTURA):
+	"""
+	Recorre el archivo binario devolviendo un lote de registros por bloque.
+
+	Args:
+		nombre_archivo (str): Nombre del archivo binario
+		tamano_lectura (int): Cantidad de bytes leídos por operación
+
+	Yields:
+		list: Lotes de tuplas (nombre, direccion, dni, campos)
+
+	Raises:
+		ValueError: Si el archivo termina con un bloque incompleto
+	"""
+	with open(ruta_archivo(nombre_archivo), 'rb') as f:
+		buffer = b''
+		while True:
+			leido = f.read(tamano_lectura)
+			if not leido:
+				break
+			buffer = buffer + leido if buffer else leido
+			posicion = 0
+			while posicion < len(buffer):
+				try:
+					bloque, posicion = decodificar_bloque(buffer, posicion)
+				except RegistroIncompleto:
+					break
+				yield bloque
+			buffer = buffer[posicion:]
+		if buffer:
+			raise ValueError("El archivo binario termina con un bloque incompleto")
+
+def leer_binario(nombre_archivo="binario.dat", tamano_lectura=TAMANO_LECTURA):
+	"""
+	Recorre el archivo binario devolviendo una Persona por registro.
+
+	Args:
+		nombre_archivo (str): Nombre del archivo binario
+		tamano_lectura (int): Cantidad de bytes leídos por operación
+
+	Yields:
+		Persona: Cada registro del archivo, en orden
+	"""
+	for lote in leer_binario_registros(nombre_archivo, tamano_lectura):
+		for registro in lote:
+			yield registro_a_persona(registro)
+
+
+if __name__ == "__main__":
+	import os
+	import tempfile
+	import time
+
+	from almacenamiento_fijo import decodificar_texto, escribir_registros, leer_fijos, personas_a_registros
+	from ej_5 import guardar_longitud_variable
+
+	# Datos de prueba con nombres y direcciones de largo variado y acentos
+	n = 200_000
+	personas = [
+		Persona(f"Pérez{'z' * (i % 13)} Juan{i}", f"Av. Córdoba {i % 5000}; piso {i % 9}, Ciudad {i % 40}",
+				str(20_000_000 + i), [True, i % 2 == 0, i % 5 == 0], [i % 3 == 0], [True, False, True, i % 7 == 0])
+		for i in range(n)
+	]
+
+	# Tabla "S;N;...;N" -> byte de campos para parsear variable.dat en igualdad de condiciones
+	tabla_sn = {';'.join('S' if c & (1 << i) else 'N' for i in range(8)): c for c in range(256)}
+
+	def leer_variable_tuplas(ruta):
+		registros = []
+		with open(ruta, encoding='utf-8') as f:
+			for linea in f:
+				campos = linea.rstrip('\n').rsplit(';', 9)
+				nombre, direccion = campos[0].split(';', 1)
+				registros.append((nombre, direccion, campos[1], tabla_sn[';'.join(campos[2:])]))
+		return registros
+
+	def leer_fijos_tuplas(ruta):
+		datos = leer_fijos(ruta)
+		return list(zip(decodificar_texto(datos['nombre']).tolist(), decodificar_texto(datos['direccion']).tolist(),
+						decodificar_texto(datos['dni']).tolist(), datos['campos'].tolist()))
+
+	with tempfile.TemporaryDirectory() as tmp:
+		rutas = {nombre: os.path.join(tmp, nombre) for nombre in ("fijos.dat", "variable.dat", "binario.dat")}
+		escribir_registros(personas_a_registros(personas), rutas["fijos.dat"])
+		guardar_longitud_variable(personas, rutas["variable.dat"])
+		guardar_binario(personas, rutas["binario.dat"])
+
+		lecturas = {
+			"fijos.dat": leer_fijos_tuplas,
+			"variable.dat": leer_variable_tuplas,
+			"binario.dat": lambda r: [t for lote in leer_binario_registros(r) for t in lote],
+		}
+
+		# Todos los lectores producen las mismas tuplas (nombre, direccion, dni, campos)
+		print(f"{'Formato':14s} {'Bytes':>12s} {'Parseo (registros/s)':>22s}")
+		for nombre, ruta in rutas.items():
+			inicio = time.perf_counter()
+			leidos = lecturas[nombre](ruta)
+			segundos = time.perf_counter() - inicio
+			print(f"{nombre:14s} {os.path.getsize(ruta):12,} {len(leidos) / segundos:22,.0f}")
+
+		assert lecturas["binario.dat"](rutas["binario.dat"]) == [persona_a_registro(p) for p in personas]
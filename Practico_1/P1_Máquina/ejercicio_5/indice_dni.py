@@ -0,0 +1,449 @@
+"""
+Índice persistente DNI -> número de registro para el archivo de longitud fija.
+
+El índice es un archivo aparte ("fijos.dat.idx") con las claves DNI ordenadas
+y, en paralelo, el número de registro de cada una. La búsqueda es una búsqueda
+binaria sobre las claves mapeadas en memoria, por lo que en un archivo de
+50 millones de registros solo se leen unas pocas páginas del disco.
+
+Estructura del archivo de índice:
+	- Cabecera de 48 bytes: firma 'IDNI', versión, registros indexados,
+	  cantidad de entradas, CRC32 del último registro indexado y tamaño y
+	  fecha de modificación (st_mtime_ns) del archivo de datos indexado
+	- Claves: 'entradas' enteros uint64 ordenados
+	- Registros: 'entradas' enteros uint64 (número de registro de cada clave)
+
+Los registros agregados al final no reescriben el índice principal: sus
+claves van a un segmento delta chico y ordenado ("fijos.dat.idx.delta", con
+el mismo formato más el campo 'base', los registros cubiertos por el índice
+principal). Las búsquedas consultan los dos, y cuando el delta supera
+FRACCION_DELTA del índice principal se compactan en un único índice.
+
+El índice se usa tal cual solo si el tamaño y la fecha de modificación del
+archivo de datos coinciden con los guardados. Si el archivo creció y el
+último registro indexado no cambió, se indexan solo los registros nuevos;
+cualquier otro cambio (mismo tamaño con otra fecha, o un archivo más chico)
+reconstruye el índice.
+"""
+import os
+import zlib
+
+import numpy as np
+
+from almacenamiento_fijo import TAMANO_REGISTRO, ArchivoFijo, leer_fijos
+from edicion_fija import recuperar_diario
+from ej_5 import ruta_archivo
+
+DTYPE_CABECERA = np.dtype([
+	('firma', 'S4'),
+	('version', '<u4'),
+	('registros', '<u8'),  # Cantidad de registros del archivo de datos ya indexados
+	('entradas', '<u8'),   # Cantidad de claves en el índice
+	('crc', '<u4'),        # CRC32 del último registro indexado
+	('reservado', '<u4'),
+	('tamano', '<u8'),     # Tamaño del archivo de datos al indexarlo
+	('mtime', '<u8'),      # st_mtime_ns del archivo de datos al indexarlo
+])
+TAMANO_CABECERA = DTYPE_CABECERA.itemsize
+FIRMA = b'IDNI'
+VERSION = 2
+
+DTYPE_CABECERA_DELTA = np.dtype([
+	('firma', 'S4'),
+	('version', '<u4'),
+	('base', '<u8'),       # Registros cubiertos por el índice principal
+	('registros', '<u8'),  # Registros indexados entre el principal y el delta
+	('entradas', '<u8'),   # Cantidad de claves en el delta
+	('crc', '<u4'),        # CRC32 del último registro indexado
+	('reservado', '<u4'),
+	('tamano', '<u8'),     # Tamaño del archivo de datos al indexarlo
+	('mtime', '<u8'),      # st_mtime_ns del archivo de datos al indexarlo
+])
+FIRMA_DELTA = b'IDND'
+
+# El delta se compacta con el índice principal cuando supera esta fracción
+# de sus entradas (y al menos DELTA_MINIMO), así cada alta cuesta O(delta)
+# y la reescritura completa se amortiza entre muchas altas
+FRACCION_DELTA = 0.05
+DELTA_MINIMO = 1 << 16
+
+# Cantidad de registros convertidos por bloque al construir el índice
+BLOQUE_REGISTROS = 1 << 20
+
+
+def dnis_a_enteros(dnis):
+	"""
+	Convierte una columna de DNIs de 10 bytes (tipo S10) en enteros.
+
+	La conversión es vectorizada: se recorren las 10 posiciones del campo
+	acumulando valor = valor * 10 + dígito para todos los registros a la vez.
+
+	Args:
+		dnis (np.array): Columna de DNIs de tipo S10
+
+	Returns:
+		tuple: (valores, validos) - enteros uint64 y máscara de DNIs válidos
+			   (solo dígitos seguidos del relleno de nulls, no vacío)
+	"""
+	crudos = np.ascontiguousarray(dnis, dtype='S10').view(np.uint8).reshape(-1, 10)
+	valores = np.zeros(len(crudos), dtype=np.uint64)
+	validos = np.ones(len(crudos), dtype=bool)
+	terminado = np.zeros(len(crudos), dtype=bool)
+
+	for c in range(10):
+		b = crudos[:, c]
+		es_nulo = b == 0
+		es_digito = (b >= ord('0')) & (b <= ord('9'))
+		# Un dígito después del relleno o cualquier otro carácter invalida el DNI
+		validos &= (es_digito & ~terminado) | es_nulo
+		valores = np.where(es_digito & ~terminado, valores * 10 + (b - ord('0')), valores)
+		terminado |= es_nulo
+
+	validos &= crudos[:, 0] != 0
+	return valores, validos
+
+
+class IndiceDNI:
+	"""
+	Índice ordenado de DNIs con búsqueda binaria sobre un archivo mapeado.
+
+	El índice se actualiza en forma incremental: si al archivo de datos se le
+	agregaron registros, solo se decodifican los nuevos y se intercalan con
+	las claves del segmento delta, sin tocar el índice principal. Si el
+	archivo fue reescrito (el último registro indexado cambió o hay menos
+	registros) se reconstruye desde cero.
+	"""
+
+	def __init__(self, nombre_archivo="fijos.dat", nombre_indice=None):
+		"""
+		Abre (y crea o actualiza si hace falta) el índice de un archivo fijo.
+
+		Args:
+			nombre_archivo (str): Nombre del archivo de longitud fija
+			nombre_indice (str): Nombre del archivo de índice (por defecto
+								el del archivo de datos con extensión .idx)
+		"""
+		self.ruta_datos = ruta_archivo(nombre_archivo)
+		self.ruta_indice = ruta_archivo(nombre_indice or nombre_archivo + ".idx")
+		self.ruta_delta = self.ruta_indice + ".delta"
+		self._claves = None
+		self._registros = None
+		self._claves_delta = np.empty(0, dtype='<u8')
+		self._registros_delta = np.empty(0, dtype='<u8')
+		self._indexados = 0
+		self._estado_datos = None
+		self.actualizar()
+
+	def _leer_cabecera(self):
+		"""
+		Lee la cabecera del índice.
+
+		Returns:
+			np.void: Cabecera, o None si el índice no existe o es inválido
+		"""
+		if not os.path.exists(self.ruta_indice):
+			return None
+		cabecera = np.fromfile(self.ruta_indice, dtype=DTYPE_CABECERA, count=1)
+		if len(cabecera) == 0 or cabecera[0]['firma'] != FIRMA or cabecera[0]['version'] != VERSION:
+			return None
+		return cabecera[0]
+
+	def _leer_delta(self, base):
+		"""
+		Lee el segmento delta si corresponde al índice principal actual.
+
+		Args:
+			base (int): Registros cubiertos por el índice principal
+
+		Returns:
+			np.void: Cabecera del delta, o None si no existe o quedó de otro índice
+		"""
+		self._claves_delta = np.empty(0, dtype='<u8')
+		self._registros_delta = np.empty(0, dtype='<u8')
+		if not os.path.exists(self.ruta_delta):
+			return None
+		with open(self.ruta_delta, 'rb') as f:
+			cabecera = np.fromfile(f, dtype=DTYPE_CABECERA_DELTA, count=1)
+			if (len(cabecera) == 0 or cabecera[0]['firma'] != FIRMA_DELTA
+					or cabecera[0]['version'] != VERSION or cabecera[0]['base'] != base):
+				return None
+			entradas = int(cabecera[0]['entradas'])
+			claves = np.fromfile(f, dtype='<u8', count=entradas)
+			registros = np.fromfile(f, dtype='<u8', count=entradas)
+		if len(registros) != entradas:
+			return None
+		self._claves_delta, self._registros_delta = claves, registros
+		return cabecera[0]
+
+	def _crc_registro(self, i):
+		"""CRC32 de los bytes del registro i del archivo de datos."""
+		with ArchivoFijo(self.ruta_datos) as archivo:
+			return zlib.crc32(archivo.obtener_bytes(i))
+
+	def _abrir(self, entradas):
+		"""Mapea en memoria las secciones de claves y registros del índice."""
+		if entradas == 0:
+			self._claves = np.empty(0, dtype='<u8')
+			self._registros = np.empty(0, dtype='<u8')
+			return
+		self._claves = np.memmap(self.ruta_indice, dtype='<u8', mode='r',
+								 offset=TAMANO_CABECERA, shape=(entradas,))
+		self._registros = np.memmap(self.ruta_indice, dtype='<u8', mode='r',
+									offset=TAMANO_CABECERA + 8 * entradas, shape=(entradas,))
+
+	def _claves_de_registros(self, desde, hasta):
+		"""
+		Decodifica los DNIs de los registros [desde, hasta) por bloques.
+
+		Returns:
+			tuple: (claves, números_de_registro) sin ordenar, solo DNIs válidos
+		"""
+		datos = leer_fijos(self.ruta_datos)
+		claves, registros = [], []
+		for inicio in range(desde, hasta, BLOQUE_REGISTROS):
+			fin = min(inicio + BLOQUE_REGISTROS, hasta)
+			valores, validos = dnis_a_enteros(datos['dni'][inicio:fin])
+			claves.append(valores[validos])
+			registros.append(np.flatnonzero(validos).astype(np.uint64) + np.uint64(inicio))
+		if not claves:
+			return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.uint64)
+		return np.concatenate(claves), np.concatenate(registros)
+
+	def _escribir(self, claves, registros, total_registros):
+		"""
+		Escribe el índice completo en un archivo temporal y lo reemplaza de
+		forma atómica, para no dejar nunca un índice a medio escribir.
+
+		El delta anterior deja de corresponder (su 'base' ya no coincide) y
+		se borra.
+		"""
+		cabecera = np.zeros(1, dtype=DTYPE_CABECERA)
+		cabecera['firma'] = FIRMA
+		cabecera['version'] = VERSION
+		cabecera['registros'] = total_registros
+		cabecera['entradas'] = len(claves)
+		cabecera['crc'] = self._crc_registro(total_registros - 1) if total_registros else 0
+		cabecera['tamano'] = self._estado_datos.st_size
+		cabecera['mtime'] = self._estado_datos.st_mtime_ns
+
+		# Se liberan los mapeos antes de reemplazar el archivo
+		self._claves = self._registros = None
+
+		temporal = self.ruta_indice + ".tmp"
+		with open(temporal, 'wb') as f:
+			cabecera.tofile(f)
+			np.asarray(claves, dtype='<u8').tofile(f)
+			np.asarray(registros, dtype='<u8').tofile(f)
+		os.replace(temporal, self.ruta_indice)
+		self._abrir(len(claves))
+		self._indexados = total_registros
+		self._claves_delta = np.empty(0, dtype='<u8')
+		self._registros_delta = np.empty(0, dtype='<u8')
+		if os.path.exists(self.ruta_delta):
+			os.remove(self.ruta_delta)
+
+	def _escribir_delta(self, claves, registros, base, total_registros):
+		"""Escribe el segmento delta de forma atómica."""
+		cabecera = np.zeros(1, dtype=DTYPE_CABECERA_DELTA)
+		cabecera['firma'] = FIRMA_DELTA
+		cabecera['version'] = VERSION
+		cabecera['base'] = base
+		cabecera['registros'] = total_registros
+		cabecera['entradas'] = len(claves)
+		cabecera['crc'] = self._crc_registro(total_registros - 1) if total_registros else 0
+		cabecera['tamano'] = self._estado_datos.st_size
+		cabecera['mtime'] = self._estado_datos.st_mtime_ns
+
+		temporal = self.ruta_delta + ".tmp"
+		with open(temporal, 'wb') as f:
+			cabecera.tofile(f)
+			np.asarray(claves, dtype='<u8').tofile(f)
+			np.asarray(registros, dtype='<u8').tofile(f)
+		os.replace(temporal, self.ruta_delta)
+		self._claves_delta, self._registros_delta = claves, registros
+		self._indexados = total_registros
+
+	def reconstruir(self):
+		"""Reconstruye el índice completo desde el archivo de datos."""
+		self._estado_datos = os.stat(self.ruta_datos)
+		total = self._estado_datos.st_size // TAMANO_REGISTRO
+		claves, registros = self._claves_de_registros(0, total)
+		orden = np.argsort(claves, kind='stable')
+		self._escribir(claves[orden], registros[orden], total)
+
+	def actualizar(self):
+		"""
+		Pone el índice al día con el archivo de datos.
+
+		Si solo se agregaron registros al final, se indexan únicamente los
+		nuevos y se intercalan con las claves del delta (no con las del
+		índice principal). Cuando el delta crece más que FRACCION_DELTA del
+		principal se compactan. Los registros borrados no tienen DNI y no se
+		indexan.
+		"""
+		recuperar_diario(self.ruta_datos)
+		# Se toma el estado antes de leer: si el archivo cambia mientras tanto,
+		# la próxima actualización lo detecta
+		estado = self._estado_datos = os.stat(self.ruta_datos)
+		total = estado.st_size // TAMANO_REGISTRO
+		cabecera = self._leer_cabecera()
+
+		if cabecera is None or cabecera['registros'] > total:
+			self.reconstruir()
+			return
+
+		base = int(cabecera['registros'])
+		self._abrir(int(cabecera['entradas']))
+		delta = self._leer_delta(base)
+		ultimo = cabecera if delta is None else delta
+		if ultimo['tamano'] == estado.st_size and ultimo['mtime'] == estado.st_mtime_ns:
+			# El archivo no cambió desde la última actualización
+			self._indexados = int(ultimo['registros'])
+			return
+
+		# Cambió: lo indexado solo se conserva si el archivo creció y el
+		# último registro indexado sigue igual (registros agregados al final)
+		if (ultimo['tamano'] >= estado.st_size
+				or (base and self._crc_registro(base - 1) != cabecera['crc'])):
+			self.reconstruir()
+			return
+
+		indexados = base
+		if delta is not None:
+			if self._crc_registro(int(delta['registros']) - 1) == delta['crc']:
+				indexados = int(delta['registros'])
+			else:
+				# El delta no corresponde al archivo: se reindexa lo agregado
+				self._claves_delta = np.empty(0, dtype='<u8')
+				self._registros_delta = np.empty(0, dtype='<u8')
+		self._indexados = indexados
+		if indexados == total:
+			# Creció menos de un registro: solo se actualiza el estado guardado
+			self._escribir_delta(self._claves_delta, self._registros_delta, base, indexados)
+			return
+
+		nuevas, nuevos_registros = self._claves_de_registros(indexados, total)
+		orden = np.argsort(nuevas, kind='stable')
+		nuevas, nuevos_registros = nuevas[orden], nuevos_registros[orden]
+
+		# Intercalado lineal con el delta: cada clave nueva va después de sus iguales
+		posiciones = np.searchsorted(self._claves_delta, nuevas, side='right')
+		claves = np.insert(self._claves_delta, posiciones, nuevas)
+		registros = np.insert(self._registros_delta, posiciones, nuevos_registros)
+
+		if len(claves) > max(DELTA_MINIMO, FRACCION_DELTA * len(self._claves)):
+			self.compactar(claves, registros, total)
+		else:
+			self._escribir_delta(claves, registros, base, total)
+
+	def compactar(self, claves_delta=None, registros_delta=None, total_registros=None):
+		"""
+		Intercala el segmento delta con el índice principal y borra el delta.
+
+		Args:
+			claves_delta (np.array): Claves ordenadas del delta (por defecto el actual)
+			registros_delta (np.array): Números de registro de esas claves
+			total_registros (int): Registros cubiertos al terminar (por defecto
+								  los que cubre el índice actual)
+		"""
+		if claves_delta is None:
+			claves_delta, registros_delta = self._claves_delta, self._registros_delta
+			total_registros = self._indexados
+		posiciones = np.searchsorted(self._claves, claves_delta, side='right')
+		claves = np.insert(np.asarray(self._claves), posiciones, claves_delta)
+		registros = np.insert(np.asarray(self._registros), posiciones, registros_delta)
+		self._escribir(claves, registros, total_registros)
+
+	def __len__(self):
+		"""Cantidad de DNIs indexados."""
+		return len(self._claves) + len(self._claves_delta)
+
+	def buscar_todos(self, dni):
+		"""
+		Busca todos los registros con un DNI dado.
+
+		Args:
+			dni (int or str): DNI a buscar
+
+		Returns:
+			np.array: Números de registro (vacío si no hay coincidencias)
+		"""
+		clave = np.uint64(int(dni))
+		inicio = np.searchsorted(self._claves, clave, side='left')
+		fin = np.searchsorted(self._claves, clave, side='right')
+		# Los registros del delta son todos posteriores a los del principal
+		inicio_delta = np.searchsorted(self._claves_delta, clave, side='left')
+		fin_delta = np.searchsorted(self._claves_delta, clave, side='right')
+		return np.concatenate((self._registros[inicio:fin],
+							   self._registros_delta[inicio_delta:fin_delta])).astype(np.int64)
+
+	def buscar(self, dni):
+		"""
+		Busca el primer registro con un DNI dado en O(log n).
+
+		Args:
+			dni (int or str): DNI a buscar
+
+		Returns:
+			int: Número de registro, o None si el DNI no está indexado
+		"""
+		registros = self.buscar_todos(dni)
+		return int(registros[0]) if len(registros) else None
+
+
+def buscar_persona_por_dni(dni, nombre_archivo="fijos.dat"):
+	"""
+	Busca una persona por DNI usando (y actualizando) el índice persistente.
+
+	El DNI del registro encontrado se compara con el buscado: si no coincide
+	(el archivo cambió sin que el índice lo detectara) el índice se
+	reconstruye y se busca de nuevo.
+
+	Args:
+		dni (int or str): DNI a buscar
+		nombre_archivo (str): Nombre del archivo de longitud fija
+
+	Returns:
+		Persona: La persona encontrada, o None si no existe
+	"""
+	indice = IndiceDNI(nombre_archivo)
+	for intento in range(2):
+		i = indice.buscar(dni)
+		if i is None:
+			return None
+		with ArchivoFijo(nombre_archivo) as archivo:
+			persona = archivo.obtener(i)
+		if persona is not None and persona.dni.isdigit() and int(persona.dni) == int(dni):
+			return persona
+		if intento == 0:
+			indice.reconstruir()
+	return None
+
+
+if __name__ == "__main__":
+	import tempfile
+	import time
+
+	from almacenamiento_fijo import guardar_fijos_masivo
+
+	n = 5_000_000
+	rng = np.random.default_rng(0)
+	ids = np.arange(n).astype('U8')
+	dnis = rng.permutation(np.arange(10_000_000, 10_000_000 + n)).astype('U10')
+
+	with tempfile.TemporaryDirectory() as tmp:
+		ruta = os.path.join(tmp, "fijos.dat")
+		guardar_fijos_masivo(np.char.add("Persona ", ids), np.char.add("Calle ", ids),
+							 dnis, np.zeros(n, dtype=np.uint8), ruta)
+
+		inicio = time.perf_counter()
+		indice = IndiceDNI(ruta)
+		print(f"Índice de {len(indice):,} DNIs construido en {time.perf_counter() - inicio:.2f} s")
+
+		inicio = time.perf_counter()
+		with ArchivoFijo(ruta) as archivo:
+			for dni in dnis[:1000]:
+				persona = archivo.obtener(indice.buscar(dni))
+				assert persona.dni == dni
+		print(f"1000 búsquedas por DNI: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+		del indice
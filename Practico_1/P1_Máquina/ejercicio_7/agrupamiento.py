@@ -0,0 +1,387 @@
+"""
+Deduplicación de un padrón completo en grupos de registros (entidades).
+
+En lugar de puntajes por par, el resultado asigna a cada registro el id de su
+grupo: dos registros quedan en el mismo grupo si están unidos por una cadena de
+pares con similitud Jaro-Winkler >= umbral.
+
+	1. Un conjunto de procesos calcula en paralelo las claves de bloqueo de
+	   los nombres (la parte costosa del bloqueo); cada proceso recibe los
+	   nombres una sola vez al iniciarse
+	2. Con esas claves se arman los bloques (BlockedMatcher.blocking) y el
+	   trabajo se divide en tandas (shards): grupos de bloques completos con
+	   unos shard_size pares posibles, y tramos del vecindario ordenado
+	3. Un segundo conjunto de procesos, que recibe las claves al iniciarse,
+	   genera los pares candidatos de cada tanda y los evalúa ahí mismo: el
+	   proceso principal no recorre ningún par
+	4. Las aristas (pares que alcanzan el umbral) de cada tanda se guardan en
+	   el directorio de trabajo apenas se terminan de evaluar
+	5. Las aristas se unen con union-find y se escribe (record_id, cluster_id),
+	   donde cluster_id es el menor record_id del grupo
+
+Reanudación: la división en tandas es determinista, así que al volver a
+ejecutar con el mismo directorio de trabajo las tandas ya guardadas no se
+vuelven a generar ni a evaluar. El archivo estado.json registra los
+parámetros y una huella de los nombres, y si no coinciden se empieza de cero.
+"""
+from array import array
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import chain
+import argparse
+import csv
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+
+from emparejamiento import BlockedMatcher
+
+STATE_FILE = "estado.json"
+
+# Versión del formato de las tandas guardadas (ver Deduplicator._save_shard);
+# la 3 arma las tandas recorriendo los bloques por clave ordenada
+SHARD_FORMAT = 3
+
+# Registro de fijos.dat (ejercicio 5): nombre, dirección, dni y banderas
+FIXED_RECORD = struct.Struct('50s 60s 10s B')
+DELETED_MARK = 0xFF
+
+
+def read_lines(path):
+	"""
+	Lee un nombre por línea.
+
+	:param path: Archivo de texto
+	:return: Tupla (ids, nombres); el id es el número de línea
+	"""
+	with open(path, encoding='utf-8') as f:
+		names = [line.rstrip('\n') for line in f]
+	return list(range(len(names))), names
+
+
+def read_fixed(path):
+	"""
+	Lee los nombres de un archivo de registros de longitud fija (fijos.dat),
+	omitiendo los registros borrados.
+
+	:param path: Archivo de registros
+	:return: Tupla (ids, nombres); el id es la posición del registro
+	"""
+	ids, names = [], []
+	with open(path, 'rb') as f:
+		data = f.read()
+	data = data[:len(data) - len(data) % FIXED_RECORD.size]
+	for record_id, (name, _, _, _) in enumerate(FIXED_RECORD.iter_unpack(data)):
+		if name[0] != DELETED_MARK:
+			ids.append(record_id)
+			names.append(name.rstrip(b'\0').decode('utf-8', errors='ignore'))
+	return ids, names
+
+
+class UnionFind:
+	"""
+	Conjuntos disjuntos sobre 0..n-1, con unión por tamaño y compresión de
+	caminos por mitades.
+	"""
+
+	def __init__(self, n):
+		self.parent = array('I', range(n))
+		self.size = array('I', [1]) * n
+
+	def find(self, x):
+		parent = self.parent
+		while parent[x] != x:
+			parent[x] = parent[parent[x]]
+			x = parent[x]
+		return x
+
+	def union(self, a, b):
+		a, b = self.find(a), self.find(b)
+		if a == b:
+			return
+		if self.size[a] < self.size[b]:
+			a, b = b, a
+		self.parent[b] = a
+		self.size[a] += self.size[b]
+
+
+# Estado de cada proceso de trabajo, cargado una sola vez por el inicializador
+_worker = {}
+
+def _init_worker(names, matcher):
+	_worker['names'] = names
+	_worker['matcher'] = matcher
+
+def _prepare_part(bounds):
+	"""Claves de bloqueo de los nombres names[start:stop]."""
+	start, stop = bounds
+	return _worker['matcher'].prepare(_worker['names'][start:stop])
+
+def _init_scorer(names, matcher, keys, lengths, purged, order):
+	_init_worker(names, matcher)
+	_worker.update(keys=keys, lengths=lengths, purged=purged, order=order)
+
+def _score_shard(shard):
+	"""
+	Genera los pares candidatos de una tanda y devuelve los que alcanzan el umbral.
+
+	:param shard: ('bloques', [(clave, índices), ...]) o ('vecinos', inicio, fin)
+	:return: array('I') con la cantidad de candidatos seguida de las aristas (i0, j0, i1, j1, ...)
+	"""
+	names, matcher = _worker['names'], _worker['matcher']
+	keys, lengths, purged = _worker['keys'], _worker['lengths'], _worker['purged']
+	if shard[0] == 'bloques':
+		pairs = chain.from_iterable(matcher.block_pairs(key, members, keys, lengths, purged)
+									for key, members in shard[1])
+	else:
+		pairs = matcher.neighbour_pairs(_worker['order'], shard[1], shard[2], keys, lengths, purged)
+	threshold, at_least = matcher.threshold, matcher.jw.similarity_at_least
+	edges = array('I', [0])
+	candidates = 0
+	for i, j in pairs:
+		candidates += 1
+		if at_least(names[i], names[j], threshold):
+			edges.append(i)
+			edges.append(j)
+	edges[0] = candidates
+	return edges
+
+
+class Deduplicator:
+	"""
+	Agrupa los registros de un padrón en entidades, en paralelo y con
+	reanudación desde el directorio de trabajo.
+	"""
+
+	def __init__(self, workdir, threshold=0.9, shard_size=50_000, workers=None, matcher=None,
+				 part_size=10_000):
+		"""
+		:param workdir: Directorio donde se guardan el estado y las aristas de cada tanda
+		:param threshold: Similitud mínima para unir dos registros
+		:param shard_size: Pares posibles por tanda de bloques (antes de las bandas
+						   de longitud, así que los candidatos reales son menos)
+		:param workers: Cantidad de procesos (por defecto, uno por núcleo)
+		:param matcher: BlockedMatcher que genera los candidatos (por defecto
+						uno con el umbral indicado; si se pasa, se usa su umbral)
+		:param part_size: Nombres por parte al calcular las claves en paralelo
+		"""
+		self.workdir = workdir
+		self.shard_size = shard_size
+		self.workers = workers or os.cpu_count()
+		self.matcher = matcher or BlockedMatcher(threshold=threshold)
+		self.threshold = self.matcher.threshold
+		self.part_size = part_size
+
+	def _shard_path(self, shard):
+		return os.path.join(self.workdir, f"aristas_{shard:06d}.bin")
+
+	def _prepare_workdir(self, names):
+		"""Conserva las tandas guardadas solo si el estado corresponde a esta ejecución."""
+		os.makedirs(self.workdir, exist_ok=True)
+		digest = hashlib.sha256()
+		for name in names:
+			digest.update(name.encode('utf-8'))
+			digest.update(b'\n')
+		state = {
+			'names': digest.hexdigest(),
+			'count': len(names),
+			'threshold': self.threshold,
+			'format': SHARD_FORMAT,
+			'shard_size': self.shard_size,
+			'key_length': self.matcher.key_length,
+			'window': self.matcher.window,
+			'max_block': self.matcher.max_block,
+		}
+		state_path = os.path.join(self.workdir, STATE_FILE)
+		previous = None
+		if os.path.exists(state_path):
+			with open(state_path, encoding='utf-8') as f:
+				previous = json.load(f)
+		if previous != state:
+			for entry in os.listdir(self.workdir):
+				if entry.startswith("aristas_"):
+					os.remove(os.path.join(self.workdir, entry))
+			with open(state_path, 'w', encoding='utf-8') as f:
+				json.dump(state, f, indent=2)
+
+	def _prepare(self, pool, names):
+		"""Calcula en paralelo las claves de bloqueo (BlockedMatcher.prepare)."""
+		keys, sort_codes, lengths = [], [], []
+		parts = [(start, min(start + self.part_size, len(names)))
+				 for start in range(0, len(names), self.part_size)]
+		for part_keys, part_codes, part_lengths in pool.map(_prepare_part, parts):
+			keys += part_keys
+			sort_codes += part_codes
+			lengths += part_lengths
+		return keys, sort_codes, lengths
+
+	def _shards(self, blocks, purged, n):
+		"""
+		Divide el trabajo en tandas, siempre en el mismo orden (no depende del
+		hash de las cadenas, así que vale entre procesos distintos).
+
+		Los bloques se agrupan completos hasta sumar shard_size pares posibles
+		(un bloque grande puede formar una tanda por sí solo); el vecindario
+		ordenado se divide en tramos de shard_size / window posiciones.
+
+		:param blocks: Bloques (ver BlockedMatcher.blocking)
+		:param purged: Claves descartadas
+		:param n: Cantidad de nombres
+		:return: Lista de tandas para _score_shard
+		"""
+		shards, group, size = [], [], 0
+		# Las claves se recorren ordenadas: el orden de blocks depende del hash
+		# de los frozenset de claves (PYTHONHASHSEED) y cambiaría al reanudar
+		for key, members in sorted(blocks.items()):
+			if key in purged or len(members) < 2:
+				continue
+			group.append((key, members))
+			size += len(members) * (len(members) - 1) // 2
+			if size >= self.shard_size:
+				shards.append(('bloques', group))
+				group, size = [], 0
+		if group:
+			shards.append(('bloques', group))
+		step = max(1, self.shard_size // self.matcher.window)
+		shards.extend(('vecinos', start, min(start + step, n)) for start in range(0, n, step))
+		return shards
+
+	def _shard_candidates(self, shard):
+		"""Cantidad de candidatos de una tanda ya guardada (el primer valor del archivo)."""
+		counter = array('I')
+		with open(self._shard_path(shard), 'rb') as f:
+			counter.frombytes(f.read(counter.itemsize))
+		return counter[0]
+
+	def _save_shard(self, shard, edges):
+		"""
+		Guarda en forma atómica el resultado de una tanda: la cantidad de
+		candidatos evaluados seguida de las aristas.
+		"""
+		path = self._shard_path(shard)
+		with open(path + ".tmp", 'wb') as f:
+			edges.tofile(f)
+		os.replace(path + ".tmp", path)
+
+	def score(self, names, progress=None):
+		"""
+		Evalúa todas las tandas pendientes y guarda sus aristas.
+
+		:param names: Lista de nombres
+		:param progress: Función opcional llamada con (tandas hechas, tandas reanudadas)
+		:return: Diccionario con estadísticas de la ejecución
+		"""
+		self._prepare_workdir(names)
+		start = time.perf_counter()
+		with ProcessPoolExecutor(self.workers, initializer=_init_worker,
+								 initargs=(names, self.matcher)) as pool:
+			keys, sort_codes, lengths = self._prepare(pool, names)
+		blocks, purged = self.matcher.blocking(keys)
+		order = sorted(range(len(names)), key=sort_codes.__getitem__)
+		shards = self._shards(blocks, purged, len(names))
+
+		done = resumed = candidates = 0
+		pending = {}
+		with ProcessPoolExecutor(self.workers, initializer=_init_scorer,
+								 initargs=(names, self.matcher, keys, lengths, purged, order)) as pool:
+			for shard, work in enumerate(shards):
+				if os.path.exists(self._shard_path(shard)):
+					candidates += self._shard_candidates(shard)
+					resumed += 1
+					continue
+				pending[pool.submit(_score_shard, work)] = shard
+				# Se limita la cantidad de tandas en vuelo para acotar la memoria
+				while len(pending) >= 2 * self.workers:
+					finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+					for future in finished:
+						edges = future.result()
+						candidates += edges[0]
+						self._save_shard(pending.pop(future), edges)
+						done += 1
+					if progress:
+						progress(done, resumed)
+			for future in list(pending):
+				edges = future.result()
+				candidates += edges[0]
+				self._save_shard(pending.pop(future), edges)
+				done += 1
+		seconds = time.perf_counter() - start
+		return {
+			'names': len(names),
+			'candidate_pairs': candidates,
+			'shards': done + resumed,
+			'resumed_shards': resumed,
+			'seconds': seconds,
+			'pairs_per_second': candidates / seconds if seconds else None,
+		}
+
+	def clusters(self, n):
+		"""
+		Une las aristas guardadas.
+
+		:param n: Cantidad de nombres
+		:return: Lista con el grupo (menor índice del grupo) de cada nombre
+		"""
+		groups = UnionFind(n)
+		for entry in sorted(os.listdir(self.workdir)):
+			if entry.startswith("aristas_") and entry.endswith(".bin"):
+				edges = array('I')
+				with open(os.path.join(self.workdir, entry), 'rb') as f:
+					edges.frombytes(f.read())
+				# El primer valor es la cantidad de candidatos de la tanda
+				for k in range(1, len(edges), 2):
+					groups.union(edges[k], edges[k + 1])
+		# El representante de cada grupo pasa a ser su menor índice
+		smallest = {}
+		roots = [groups.find(i) for i in range(n)]
+		for i, root in enumerate(roots):
+			smallest.setdefault(root, i)
+		return [smallest[root] for root in roots]
+
+	def run(self, ids, names, output, progress=None):
+		"""
+		Deduplica el padrón y escribe (record_id, cluster_id) en CSV.
+
+		:param ids: Id de registro de cada nombre
+		:param names: Lista de nombres
+		:param output: Archivo CSV de salida
+		:param progress: Función opcional de progreso (ver score)
+		:return: Diccionario con estadísticas, incluida la cantidad de grupos
+		"""
+		stats = self.score(names, progress)
+		cluster = self.clusters(len(names))
+		with open(output, 'w', newline='', encoding='utf-8') as f:
+			writer = csv.writer(f)
+			writer.writerow(["record_id", "cluster_id"])
+			writer.writerows((ids[i], ids[c]) for i, c in enumerate(cluster))
+		stats['clusters'] = len(set(cluster))
+		return stats
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Agrupa en entidades los nombres de un padrón")
+	parser.add_argument("entrada", help="Archivo de nombres (uno por línea) o fijos.dat")
+	parser.add_argument("salida", help="CSV de salida con record_id,cluster_id")
+	parser.add_argument("--formato", choices=["lineas", "fijo"], default="lineas")
+	parser.add_argument("--trabajo", default="dedup_trabajo", help="Directorio de trabajo (reanudación)")
+	parser.add_argument("--umbral", type=float, default=0.9)
+	parser.add_argument("--procesos", type=int, default=None)
+	parser.add_argument("--tanda", type=int, default=50_000, help="Pares posibles por tanda")
+	args = parser.parse_args(argv)
+
+	ids, names = (read_fixed if args.formato == "fijo" else read_lines)(args.entrada)
+	dedup = Deduplicator(args.trabajo, args.umbral, args.tanda, args.procesos)
+
+	def progress(done, resumed):
+		print(f"\rTandas evaluadas: {done:,} (reanudadas: {resumed:,})", end='', file=sys.stderr)
+
+	stats = dedup.run(ids, names, args.salida, progress)
+	print(file=sys.stderr)
+	for key, value in stats.items():
+		print(f"{key:18s} {value:,.4f}" if isinstance(value, float) else f"{key:18s} {value:,}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,351 @@
+"""
+Benchmark de velocidad y calidad de Jaro-Winkler con corpus sintéticos de errores.
+
+Genera nombres con errores tipográficos controlados:
+
+	- transposition: dos letras vecinas intercambiadas ("Juan" / "Jaun")
+	- leading_drop: falta la primera letra ("Horacio" / "Oracio")
+	- accents: acentos quitados o agregados ("López" / "Lopez")
+	- insertion: una letra de más ("Perez" / "Pereez")
+
+y mide:
+
+	- Velocidad por par (JaroWinkler.similarity) según la longitud de las cadenas
+	- Velocidad de una consulta contra muchas cadenas (QueryMatcher)
+	- Velocidad del emparejamiento con bloqueo (BlockedMatcher) sobre el corpus
+	- Precisión y recall del emparejamiento con bloqueo para varios umbrales,
+	  en total y por tipo de error
+
+Los resultados se guardan en JSON y --comparar los contrasta con una ejecución
+anterior: una caída de velocidad mayor que --tolerancia o de precisión/recall
+mayor que --tolerancia-calidad se informa como regresión (código de salida 1).
+
+Uso:
+	python benchmark_jw.py --salida resultados.json
+	python benchmark_jw.py --comparar resultados.json --salida nuevos.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import unicodedata
+from datetime import datetime, timezone
+
+from comparador import QueryMatcher
+from ej_7 import JaroWinkler
+from emparejamiento import BlockedMatcher
+
+RESULTS_VERSION = 1
+
+TYPO_KINDS = ("transposition", "leading_drop", "accents", "insertion")
+
+# Bandas de longitud (mínima, máxima) para la velocidad por par
+LENGTH_BANDS = ((5, 10), (11, 20), (21, 40), (41, 80))
+
+THRESHOLDS = (0.8, 0.85, 0.9, 0.95)
+
+# Métricas comparadas entre ejecuciones: nombre -> es de calidad
+METRICS = {
+	'pairs_per_second': False,
+	'speedup': False,
+	'names_per_second': False,
+	'precision': True,
+	'recall': True,
+}
+
+_SYLLABLES = ["ma", "ri", "jo", "sé", "lu", "cí", "an", "to", "ni", "ra", "mon", "go", "mez", "per",
+			  "ro", "dri", "guez", "fer", "nán", "dez", "ho", "cio", "ló", "pez", "sa", "ve", "dra",
+			  "be", "tez", "cos", "ta", "me", "di", "na", "her", "re", "su", "á", "rez", "ña", "qui"]
+_ACCENTS = {'a': 'á', 'e': 'é', 'i': 'í', 'o': 'ó', 'u': 'ú', 'n': 'ñ'}
+
+
+def _strip_accents(text):
+	return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+def random_name(rng, words=3):
+	"""
+	Nombre sintético de varias palabras armadas con sílabas.
+
+	:param rng: Generador aleatorio
+	:param words: Cantidad de palabras
+	:return: Nombre
+	"""
+	return ' '.join(''.join(rng.choice(_SYLLABLES) for _ in range(rng.randrange(2, 4))).capitalize()
+					for _ in range(words))
+
+def add_typo(name, kind, rng):
+	"""
+	Aplica un error tipográfico del tipo indicado.
+
+	:param name: Nombre original
+	:param kind: Uno de TYPO_KINDS
+	:param rng: Generador aleatorio
+	:return: Nombre con el error (distinto del original)
+	"""
+	if kind == "transposition":
+		candidates = [k for k in range(1, len(name) - 1) if name[k] != name[k + 1]]
+		k = rng.choice(candidates)
+		return name[:k] + name[k + 1] + name[k] + name[k + 2:]
+	if kind == "leading_drop":
+		return name[1:]
+	if kind == "accents":
+		stripped = _strip_accents(name)
+		if stripped != name:
+			return stripped
+		positions = [k for k, c in enumerate(name) if c in _ACCENTS]
+		k = rng.choice(positions)
+		return name[:k] + _ACCENTS[name[k]] + name[k + 1:]
+	if kind == "insertion":
+		k = rng.randrange(1, len(name))
+		return name[:k] + rng.choice("abcdefghijklmnopqrstuvwxyz") + name[k:]
+	raise ValueError(f"Tipo de error desconocido: {kind}")
+
+def generate_corpus(count, seed=0, typo_rate=0.2):
+	"""
+	Corpus de nombres donde una parte tiene una variante con un error.
+
+	:param count: Cantidad de nombres originales
+	:param seed: Semilla
+	:param typo_rate: Proporción de nombres que reciben una variante
+	:return: Tupla (nombres, pares verdaderos {(i, j): tipo de error})
+	"""
+	rng = random.Random(seed)
+	names, true_pairs = [], {}
+	for _ in range(count):
+		names.append(random_name(rng))
+		if rng.random() < typo_rate:
+			kind = TYPO_KINDS[len(true_pairs) % len(TYPO_KINDS)]
+			true_pairs[(len(names) - 1, len(names))] = kind
+			names.append(add_typo(names[-1], kind, rng))
+	return names, true_pairs
+
+def _string_of_length(rng, minimum, maximum):
+	"""Cadena de nombres cuya longitud está entre minimum y maximum."""
+	length = rng.randint(minimum, maximum)
+	text = ""
+	while len(text) < length:
+		text += random_name(rng, 1) + " "
+	return text[:length]
+
+def _pairs_per_second(function, pairs, min_seconds):
+	"""Repite function sobre los pares hasta superar min_seconds."""
+	rounds, start = 0, time.perf_counter()
+	while True:
+		for s0, s1 in pairs:
+			function(s0, s1)
+		rounds += 1
+		elapsed = time.perf_counter() - start
+		if elapsed >= min_seconds:
+			return rounds * len(pairs) / elapsed
+
+
+def measure_single_pair(seed=0, pairs=2_000, min_seconds=0.5):
+	"""
+	Velocidad de JaroWinkler.similarity por banda de longitud, con pares de un
+	nombre y su variante con error.
+
+	:return: Lista de resultados, uno por banda
+	"""
+	rng = random.Random(seed)
+	jw = JaroWinkler()
+	results = []
+	for minimum, maximum in LENGTH_BANDS:
+		sample = []
+		for _ in range(pairs):
+			s0 = _string_of_length(rng, minimum, maximum)
+			sample.append((s0, add_typo(s0, "transposition", rng)))
+		results.append({
+			'test': 'single_pair',
+			'param': f"{minimum}-{maximum}",
+			'pairs_per_second': _pairs_per_second(jw.similarity, sample, min_seconds),
+		})
+	return results
+
+def measure_one_vs_many(names, queries=10, candidates=5_000, repeat=3, seed=0):
+	"""
+	Velocidad de una consulta contra muchas cadenas: similarity en un ciclo
+	frente a QueryMatcher.similarities. Se toma el mejor de varios intentos.
+
+	:return: Lista con un resultado
+	"""
+	rng = random.Random(seed)
+	jw = JaroWinkler()
+	chosen = [names[rng.randrange(len(names))] for _ in range(queries)]
+	names = names[:candidates]
+
+	def loop():
+		for query in chosen:
+			for name in names:
+				jw.similarity(query, name)
+
+	def prepared():
+		for query in chosen:
+			QueryMatcher(query, normalize=False, jw=jw).similarities(names)
+
+	seconds = {}
+	for function in (loop, prepared):
+		best = None
+		for _ in range(repeat):
+			start = time.perf_counter()
+			function()
+			elapsed = time.perf_counter() - start
+			best = elapsed if best is None else min(best, elapsed)
+		seconds[function] = best
+
+	pairs = queries * len(names)
+	return [{
+		'test': 'one_vs_many',
+		'param': str(len(names)),
+		'pairs_per_second': pairs / seconds[prepared],
+		'baseline_pairs_per_second': pairs / seconds[loop],
+		'speedup': seconds[loop] / seconds[prepared],
+	}]
+
+def measure_blocked(names, true_pairs, thresholds=THRESHOLDS):
+	"""
+	Velocidad y calidad del emparejamiento con bloqueo. Se empareja una vez con
+	el menor umbral y cada umbral se evalúa sobre esos pares.
+
+	:return: Lista con el resultado de velocidad y uno de calidad por umbral
+	"""
+	matcher = BlockedMatcher(threshold=min(thresholds))
+	found, stats = matcher.deduplicate(names, true_pairs)
+	results = [{
+		'test': 'blocked',
+		'param': str(len(names)),
+		'pairs_per_second': stats['pairs_per_second'],
+		'names_per_second': stats['names_per_second'],
+		'candidate_pairs': stats['candidate_pairs'],
+		'pairs_completeness': stats['pairs_completeness'],
+	}]
+	for threshold in thresholds:
+		matched = {(i, j) for i, j, score in found if score >= threshold}
+		hits = matched & true_pairs.keys()
+		by_kind = {}
+		for kind in TYPO_KINDS:
+			expected = [pair for pair, k in true_pairs.items() if k == kind]
+			by_kind[kind] = sum(pair in hits for pair in expected) / len(expected) if expected else None
+		results.append({
+			'test': 'quality',
+			'param': str(threshold),
+			'precision': len(hits) / len(matched) if matched else 1.0,
+			'recall': len(hits) / len(true_pairs) if true_pairs else 1.0,
+			'recall_by_typo': by_kind,
+		})
+	return results
+
+def _current_commit():
+	"""Commit de git del código medido, o None si no está disponible."""
+	try:
+		output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+								cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+	except (OSError, subprocess.CalledProcessError):
+		return None
+	return output.stdout.strip() or None
+
+def run_benchmark(names_count=20_000, seed=0, thresholds=THRESHOLDS):
+	"""
+	Ejecuta todas las mediciones.
+
+	:param names_count: Cantidad de nombres originales del corpus
+	:param seed: Semilla del corpus
+	:param thresholds: Umbrales para la precisión y el recall
+	:return: Resultados con metadatos, listos para guardar en JSON
+	"""
+	names, true_pairs = generate_corpus(names_count, seed)
+	results = measure_single_pair(seed)
+	results += measure_one_vs_many(names, seed=seed)
+	results += measure_blocked(names, true_pairs, thresholds)
+	return {
+		'version': RESULTS_VERSION,
+		'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+		'commit': _current_commit(),
+		'python': platform.python_version(),
+		'platform': platform.platform(),
+		'seed': seed,
+		'names': len(names),
+		'true_pairs': len(true_pairs),
+		'results': results,
+	}
+
+def compare(previous, current, tolerance=0.2, quality_tolerance=0.01):
+	"""
+	Compara dos ejecuciones métrica por métrica (todas las métricas son
+	"mayor es mejor").
+
+	:param previous: Resultados de referencia (JSON de run_benchmark)
+	:param current: Resultados nuevos
+	:param tolerance: Caída relativa de velocidad considerada regresión
+	:param quality_tolerance: Caída absoluta de precisión o recall considerada regresión
+	:return: Lista de (prueba, parámetro, métrica, anterior, actual, regresión)
+	"""
+	reference = {(r['test'], r['param']): r for r in previous['results']}
+	rows = []
+	for result in current['results']:
+		before = reference.get((result['test'], result['param']))
+		if before is None:
+			continue
+		for metric, quality in METRICS.items():
+			a, b = before.get(metric), result.get(metric)
+			if a is None or b is None:
+				continue
+			if quality:
+				regression = a - b > quality_tolerance
+			else:
+				regression = a > 0 and (b - a) / a < -tolerance
+			rows.append((result['test'], result['param'], metric, a, b, regression))
+	return rows
+
+def print_results(results):
+	"""Muestra los resultados como tabla."""
+	print(f"Corpus: {results['names']:,} nombres, {results['true_pairs']:,} pares verdaderos\n")
+	for r in results['results']:
+		if r['test'] == 'quality':
+			kinds = ' '.join(f"{kind}={value:.3f}" for kind, value in r['recall_by_typo'].items()
+							 if value is not None)
+			print(f"{'quality':12s} umbral {r['param']:5s} precision {r['precision']:.4f} "
+				  f"recall {r['recall']:.4f}  ({kinds})")
+		else:
+			extra = ''
+			if 'speedup' in r:
+				extra = f"  (similarity: {r['baseline_pairs_per_second']:,.0f} pares/s, {r['speedup']:.1f}x)"
+			elif 'names_per_second' in r:
+				extra = f"  ({r['names_per_second']:,.0f} nombres/s, {r['candidate_pairs']:,} candidatos)"
+			print(f"{r['test']:12s} {r['param']:>12s} {r['pairs_per_second']:14,.0f} pares/s{extra}")
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Benchmark de velocidad y calidad de Jaro-Winkler")
+	parser.add_argument('--nombres', type=int, default=20_000, help="nombres originales del corpus")
+	parser.add_argument('--semilla', type=int, default=0)
+	parser.add_argument('--umbrales', type=float, nargs='+', default=list(THRESHOLDS))
+	parser.add_argument('--salida', default=None, help="archivo JSON donde guardar los resultados")
+	parser.add_argument('--comparar', default=None, help="JSON de una ejecución anterior para comparar")
+	parser.add_argument('--tolerancia', type=float, default=0.2,
+						help="caída relativa de velocidad considerada regresión (por defecto 0.2)")
+	parser.add_argument('--tolerancia-calidad', type=float, default=0.01,
+						help="caída absoluta de precisión o recall considerada regresión (por defecto 0.01)")
+	args = parser.parse_args()
+
+	results = run_benchmark(args.nombres, args.semilla, tuple(args.umbrales))
+	print_results(results)
+
+	if args.salida:
+		with open(args.salida, 'w', encoding='utf-8') as f:
+			json.dump(results, f, indent=2, ensure_ascii=False)
+		print(f"\nResultados guardados en {args.salida}")
+
+	if args.comparar:
+		with open(args.comparar, encoding='utf-8') as f:
+			previous = json.load(f)
+		rows = compare(previous, results, args.tolerancia, args.tolerancia_calidad)
+		print(f"\nComparación con {args.comparar} (commit {previous.get('commit')}):")
+		for test, param, metric, before, now, regression in rows:
+			mark = "REGRESIÓN" if regression else ""
+			print(f"  {test:12s} {param:>8s} {metric:18s} {before:14,.4f} -> {now:14,.4f} {mark}")
+		if any(row[-1] for row in rows):
+			sys.exit(1)
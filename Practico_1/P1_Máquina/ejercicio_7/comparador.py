@@ -0,0 +1,215 @@
+"""
+Comparación de una consulta contra muchas cadenas con Jaro-Winkler.
+
+JaroWinkler.similarity recalcula todo en cada llamada: crea las listas
+match_indexes, match_flags, ms0 y ms1, recorre las ventanas carácter por
+carácter y repite el trabajo de la consulta con cada candidato. QueryMatcher
+prepara la consulta una sola vez:
+
+	- La normaliza (minúsculas y sin acentos) con una tabla de traducción,
+	  que se aplica en C con str.translate (solo si la cadena no es ASCII)
+	- Arma el mapa de posiciones: a cada carácter distinto de la consulta le
+	  asigna una ranura, y guarda el carácter y la ranura de cada posición
+	- Reserva los búferes de trabajo (última posición emparejada por ranura,
+	  secuencias de coincidencias), que se reutilizan entre llamadas
+
+La búsqueda de coincidencias no necesita banderas: para un mismo carácter las
+posiciones emparejadas en la cadena mayor son siempre crecientes, así que la
+primera posición libre dentro de la ventana es la primera aparición a partir
+de max(inicio de la ventana, última emparejada + 1), y se obtiene con str.find.
+El resultado es el mismo que el de similarity (con las cadenas normalizadas).
+"""
+import unicodedata
+
+from ej_7 import JaroWinkler
+
+
+def _fold_table():
+	"""Tabla para str.translate que quita los acentos de las letras latinas."""
+	table = {}
+	for code in range(0xC0, 0x250):
+		base = unicodedata.normalize('NFKD', chr(code))[:1]
+		if base != chr(code) and base.isascii():
+			table[code] = base
+	return table
+
+_FOLD = _fold_table()
+
+
+def fold(text):
+	"""
+	Normaliza una cadena para compararla: minúsculas y sin acentos.
+	A diferencia de emparejamiento.fold conserva los demás caracteres.
+
+	:param text: Cadena a normalizar
+	:return: Cadena normalizada
+	"""
+	text = text.lower()
+	return text if text.isascii() else text.translate(_FOLD)
+
+
+class QueryMatcher:
+	"""
+	Consulta preparada para compararla con Jaro-Winkler contra muchas cadenas.
+	"""
+
+	def __init__(self, query, normalize=True, jw=None):
+		"""
+		:param query: Cadena consultada
+		:param normalize: Si es True la consulta y los candidatos se comparan en
+						  minúsculas y sin acentos; si es False el resultado es
+						  idéntico a JaroWinkler.similarity(query, candidato)
+		:param jw: Instancia de JaroWinkler de la que se toman los parámetros
+		"""
+		jw = jw or JaroWinkler()
+		self.threshold = jw.threshold
+		self.three = jw.three
+		self.jw_coef = jw.jw_coef
+		self.normalize = normalize
+		self.query = fold(query) if normalize else query
+
+		# Mapa de posiciones: ranura de cada carácter distinto y (carácter, ranura)
+		# de cada posición
+		self.slot_of = {}
+		for c in self.query:
+			self.slot_of.setdefault(c, len(self.slot_of))
+		self.slots = [(c, self.slot_of[c]) for c in self.query]
+
+		# Búferes de trabajo reutilizados entre llamadas
+		self._last = [-1] * len(self.slot_of)
+		self._empty = [-1] * len(self.slot_of)
+		self._min_seq = []
+		self._max_pos = []
+
+	def similarity(self, candidate):
+		"""
+		Similitud Jaro-Winkler entre la consulta y un candidato.
+
+		:param candidate: Cadena a comparar
+		:return: Valor de similitud entre 0.0 y 1.0
+		"""
+		if self.normalize:
+			candidate = fold(candidate)
+		return self._similarity(candidate)
+
+	def _similarity(self, candidate):
+		"""Similitud con un candidato ya normalizado."""
+		query = self.query
+		if query == candidate:
+			return 1.0
+		len0, len1 = len(query), len(candidate)
+		if len0 == 0 or len1 == 0:
+			return 0.0
+
+		last = self._last
+		last[:] = self._empty
+		min_seq, max_pos = self._min_seq, self._max_pos
+		min_seq.clear()
+		max_pos.clear()
+
+		if len0 > len1:
+			# La consulta es la cadena mayor: se buscan en ella los caracteres del candidato
+			ran = max(int(len0 / 2 - 1), 0)
+			slot_of, find = self.slot_of, query.find
+			for mi, c in enumerate(candidate):
+				slot = slot_of.get(c)
+				if slot is None:
+					continue
+				start = mi - ran
+				if start <= last[slot]:
+					start = last[slot] + 1
+				xi = find(c, start if start > 0 else 0, mi + ran + 1)
+				if xi != -1:
+					last[slot] = xi
+					min_seq.append(c)
+					max_pos.append(xi)
+			max_str = query
+		else:
+			# La consulta es la menor: se buscan sus caracteres en el candidato
+			ran = max(int(len1 / 2 - 1), 0)
+			find = candidate.find
+			for mi, (c, slot) in enumerate(self.slots):
+				start = mi - ran
+				if start <= last[slot]:
+					start = last[slot] + 1
+				xi = find(c, start if start > 0 else 0, mi + ran + 1)
+				if xi != -1:
+					last[slot] = xi
+					min_seq.append(c)
+					max_pos.append(xi)
+			max_str = candidate
+
+		m = len(min_seq)
+		if m == 0:
+			return 0.0
+
+		# Transposiciones: los caracteres emparejados de la mayor en su orden
+		max_pos.sort()
+		transpositions = 0
+		for c, xi in zip(min_seq, max_pos):
+			if c != max_str[xi]:
+				transpositions += 1
+
+		# Mismas operaciones que JaroWinkler.similarity
+		j = (m / len0 + m / len1 + (m - int(transpositions / 2)) / m) / self.three
+		if j > self.threshold:
+			prefix = 0
+			for mi in range(min(len0, len1, 4)):
+				if query[mi] != candidate[mi]:
+					break
+				prefix += 1
+			prefix_scale = min(self.jw_coef, 1.0 / max(len0, len1))
+			return j + prefix_scale * prefix * (1 - j)
+		return j
+
+	def similarities(self, candidates):
+		"""
+		Similitud de la consulta con cada candidato de una lista.
+
+		:param candidates: Iterable de cadenas
+		:return: Lista de similitudes, en el orden de los candidatos
+		"""
+		score = self._similarity
+		if self.normalize:
+			return [score(fold(c)) for c in candidates]
+		return [score(c) for c in candidates]
+
+	def matching(self, candidates, threshold):
+		"""
+		Candidatos cuya similitud con la consulta alcanza el umbral.
+
+		:param candidates: Iterable de cadenas
+		:param threshold: Similitud mínima
+		:return: Lista de (índice del candidato, similitud)
+		"""
+		return [(i, s) for i, s in enumerate(self.similarities(candidates)) if s >= threshold]
+
+
+if __name__ == "__main__":
+	import random
+	import time
+
+	rng = random.Random(0)
+	syllables = ["ma", "ri", "jo", "sé", "lu", "cí", "an", "to", "ni", "ra", "mon", "go", "mez", "per",
+				 "ro", "dri", "guez", "fer", "nán", "dez", "ho", "cio", "ló", "pez", "sa", "ve", "dra"]
+
+	def word():
+		return ''.join(rng.choice(syllables) for _ in range(rng.randrange(2, 4))).capitalize()
+
+	names = [f"{word()} {word()} {word()}" for _ in range(200_000)]
+	query = "Rodríguez Fernández María"
+	jw = JaroWinkler()
+
+	start = time.perf_counter()
+	expected = [jw.similarity(query, name) for name in names]
+	base = time.perf_counter() - start
+
+	matcher = QueryMatcher(query, normalize=False, jw=jw)
+	start = time.perf_counter()
+	scores = matcher.similarities(names)
+	prepared = time.perf_counter() - start
+
+	print(f"JaroWinkler.similarity: {len(names) / base:12,.0f} pares/s")
+	print(f"QueryMatcher:           {len(names) / prepared:12,.0f} pares/s ({base / prepared:.1f}x)")
+	print(f"Resultados idénticos:   {scores == expected}")
+	print(QueryMatcher("Horacio López").matching(["ORACIO LOPEZ", "Juan Perez"], 0.85))
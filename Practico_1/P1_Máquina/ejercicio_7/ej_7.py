@@ -4,6 +4,7 @@ implemente un algoritmo, propuesto por Ud., que determine el parecido, por ejemp
 Perez y Jaun Perez, Horacio López y Oracio López, cadenas que si se tratan en comparando carácter por
 carácter, son muy poco parecidas o incluso no se parecen en nada.
 """
+import math
 
 class JaroWinkler:
 	"""
@@ -65,6 +66,123 @@ class JaroWinkler:
 			
 		return jw
 
+	def length_upper_bound(self, len0, len1):
+		"""
+		Cota superior de la similitud conociendo solo las longitudes de las cadenas.
+		
+		Las coincidencias no pueden superar la longitud menor a (con b la mayor),
+		por lo que Jaro <= (a/a + a/b + 1) / 3, y el ajuste de Winkler suma a lo
+		sumo un prefijo común de min(a, 4) caracteres.
+		
+		:param len0: Longitud de la primera cadena
+		:param len1: Longitud de la segunda cadena
+		:return: Valor máximo que puede tomar similarity para esas longitudes
+		"""
+		a, b = min(len0, len1), max(len0, len1)
+		if a == 0:
+			return 1.0 if b == 0 else 0.0
+		return self._score(a, 0, min(a, 4), a, b)
+
+	def _score(self, m, t, prefix, len0, len1):
+		"""
+		Similitud Jaro-Winkler a partir de las estadísticas de coincidencia,
+		con las mismas operaciones que similarity (m > 0).
+		
+		:param m: Coincidencias
+		:param t: Transposiciones
+		:param prefix: Longitud del prefijo común (máximo 4)
+		:param len0: Longitud de la primera cadena
+		:param len1: Longitud de la segunda cadena
+		:return: Valor de similitud
+		"""
+		j = (m / len0 + m / len1 + (m - t) / m) / self.three
+		if j > self.threshold:
+			prefix_scale = min(self.jw_coef, 1.0 / max(len0, len1))
+			return j + prefix_scale * prefix * (1 - j)
+		return j
+
+	def similarity_at_least(self, s0, s1, t):
+		"""
+		Indica si similarity(s0, s1) >= t, cortando el cálculo apenas se sabe
+		que el umbral es inalcanzable.
+		
+		Primero descarta el par con la cota por longitudes. Luego calcula la
+		cantidad mínima de coincidencias necesaria para llegar a t (suponiendo
+		cero transposiciones) y abandona la búsqueda de coincidencias en cuanto
+		las que faltan ya no alcanzan. En cargas donde la mayoría de los pares
+		están por debajo del umbral casi nunca se completa la búsqueda.
+		
+		:param s0: Primera cadena a comparar
+		:param s1: Segunda cadena a comparar
+		:param t: Umbral de similitud
+		:return: True si la similitud Jaro-Winkler es mayor o igual que t
+		"""
+		# La similitud nunca es negativa y vale 1.0 para cadenas idénticas
+		if t <= 0.0:
+			return True
+		if s0 == s1:
+			return t <= 1.0
+		len0, len1 = len(s0), len(s1)
+		if min(len0, len1) == 0 or self.length_upper_bound(len0, len1) < t:
+			return False
+
+		# Prefijo común (hasta 4 caracteres), necesario para acotar el ajuste de Winkler
+		prefix = 0
+		for mi in range(min(len0, len1, 4)):
+			if s0[mi] != s1[mi]:
+				break
+			prefix += 1
+
+		# Mínimo de coincidencias con el que la similitud puede llegar a t
+		if len0 > len1:
+			max_str, min_str = s0, s1
+		else:
+			max_str, min_str = s1, s0
+		# Jaro requerido: t sin ajuste de Winkler, o el que con el ajuste llega a t
+		bonus = min(self.jw_coef, 1.0 / len(max_str)) * prefix
+		j_required = min(t, max((t - bonus) / (1 - bonus), self.threshold))
+		# Jaro = (m/len0 + m/len1 + 1) / 3 sin transposiciones; se parte de una
+		# estimación por debajo y se ajusta con el cálculo exacto
+		needed = max(1, math.ceil((self.three * j_required - 1) / (1 / len0 + 1 / len1)) - 1)
+		while self._score(needed, 0, prefix, len0, len1) < t:
+			needed += 1
+		if needed > len(min_str):
+			return False
+
+		# Búsqueda de coincidencias (igual que matches) con corte anticipado
+		ran = max(int(len(max_str) / 2 - 1), 0)
+		match_flags = bytearray(len(max_str))
+		min_flags = bytearray(len(min_str))
+		matches = 0
+		for mi in range(len(min_str)):
+			# Aunque coincidan todos los caracteres restantes no se llega al mínimo
+			if matches + len(min_str) - mi < needed:
+				return False
+			# Primer carácter igual y libre de la ventana, buscado con str.find
+			fin = min(mi + ran + 1, len(max_str))
+			xi = max_str.find(min_str[mi], max(mi - ran, 0), fin)
+			while xi != -1 and match_flags[xi]:
+				xi = max_str.find(min_str[mi], xi + 1, fin)
+			if xi != -1:
+				match_flags[xi] = 1
+				min_flags[mi] = 1
+				matches += 1
+		if matches < needed:
+			return False
+
+		# Transposiciones: recorre en paralelo los caracteres coincidentes de ambas cadenas
+		transpositions = 0
+		xi = 0
+		for mi in range(len(min_str)):
+			if min_flags[mi]:
+				while not match_flags[xi]:
+					xi += 1
+				if min_str[mi] != max_str[xi]:
+					transpositions += 1
+				xi += 1
+
+		return self._score(matches, int(transpositions / 2), prefix, len0, len1) >= t
+
 	@staticmethod
 	def matches(s0, s1):
 		"""
@@ -144,19 +262,20 @@ class JaroWinkler:
 		return [matches, int(transpositions / 2), prefix, len(max_str)]
 
 
-# Demostración del algoritmo con los ejemplos proporcionados
-print("=== Comparación de similitud usando Jaro-Winkler ===")
+if __name__ == "__main__":
+	# Demostración del algoritmo con los ejemplos proporcionados
+	print("=== Comparación de similitud usando Jaro-Winkler ===")
 
-# Ejemplo 1: Error tipográfico común (intercambio de caracteres)
-string1 = "Juan Perez"
-string2 = "Jaun Perez"
-similitud1 = JaroWinkler().similarity(string1, string2)
-print(f"'{string1}' vs '{string2}': {similitud1:.4f}")
+	# Ejemplo 1: Error tipográfico común (intercambio de caracteres)
+	string1 = "Juan Perez"
+	string2 = "Jaun Perez"
+	similitud1 = JaroWinkler().similarity(string1, string2)
+	print(f"'{string1}' vs '{string2}': {similitud1:.4f}")
 
-# Ejemplo 2: Omisión de carácter al inicio
-string1 = "Horacio López"
-string2 = "Oracio López"
-similitud2 = JaroWinkler().similarity(string1, string2)
-print(f"'{string1}' vs '{string2}': {similitud2:.4f}")
+	# Ejemplo 2: Omisión de carácter al inicio
+	string1 = "Horacio López"
+	string2 = "Oracio López"
+	similitud2 = JaroWinkler().similarity(string1, string2)
+	print(f"'{string1}' vs '{string2}': {similitud2:.4f}")
 
-print(f"\nAmbas cadenas muestran alta similitud a pesar de los errores tipográficos.")
\ No newline at end of file
+	print(f"\nAmbas cadenas muestran alta similitud a pesar de los errores tipográficos.")
@@ -0,0 +1,334 @@
+"""
+Emparejamiento masivo de nombres con Jaro-Winkler mediante bloqueo.
+
+Comparar todos los pares de un padrón de n nombres requiere n(n-1)/2 llamadas
+a JaroWinkler.similarity, lo cual es inviable para millones de nombres. El
+bloqueo genera solo pares candidatos plausibles:
+
+	- Clave fonética: cada palabra del nombre se normaliza (sin acentos ni
+	  mayúsculas), se simplifica con reglas fonéticas del español (h muda,
+	  v/b, z/s, c/k, ll/y, ...) y se reduce a su esqueleto de consonantes.
+	  Las claves de un nombre son los pares de esqueletos de sus palabras, de
+	  modo que un error en una palabra no impide que comparta bloque por las
+	  demás. "Horacio López" y "Oracio López" comparten la clave "lps ors"
+	  ("horacio" y "oracio" -> "ors", "lopes" -> "lps")
+	- Bandas de longitud: dentro de un bloque los nombres se ordenan por
+	  longitud y solo se comparan los pares cuya cota superior de
+	  Jaro-Winkler por longitudes alcanza el umbral
+	- Prefijos ordenados: además se ordenan todas las claves fonéticas
+	  completas y cada nombre se compara con sus vecinos más cercanos en ese
+	  orden (vecindario ordenado), lo que cubre errores en todas las palabras
+
+Cada par candidato se evalúa una sola vez aunque aparezca en varios bloques.
+"""
+from itertools import combinations
+import re
+import time
+import unicodedata
+
+from ej_7 import JaroWinkler
+
+
+def fold(text):
+	"""
+	Normaliza una cadena: minúsculas, sin acentos y solo letras y espacios.
+
+	:param text: Cadena a normalizar
+	:return: Cadena normalizada
+	"""
+	text = unicodedata.normalize('NFKD', text.lower())
+	text = ''.join(c for c in text if not unicodedata.combining(c))
+	return re.sub(r'[^a-z ]+', ' ', text)
+
+# Reglas fonéticas del español, aplicadas en orden sobre texto normalizado.
+# 'G' y 'X' son marcadores temporales para no volver a transformar lo ya resuelto
+_PHONETIC_RULES = [
+	(re.compile(r'ch'), 'X'),
+	(re.compile(r'gu(?=[ei])'), 'G'),
+	(re.compile(r'g(?=[ei])'), 'j'),
+	(re.compile(r'qu'), 'k'),
+	(re.compile(r'c(?=[ei])'), 's'),
+	(re.compile(r'c'), 'k'),
+	(re.compile(r'z'), 's'),
+	(re.compile(r'[vw]'), 'b'),
+	(re.compile(r'll'), 'y'),
+	(re.compile(r'x'), 'ks'),
+	(re.compile(r'h'), ''),
+	(re.compile(r'G'), 'g'),
+	(re.compile(r'X'), 'ch'),
+	(re.compile(r'(.)\1+'), r'\1'),
+]
+
+def phonetic_code(word):
+	"""
+	Código fonético de una palabra ya normalizada con fold.
+
+	:param word: Palabra normalizada
+	:return: Palabra simplificada según cómo se pronuncia
+	"""
+	for pattern, replacement in _PHONETIC_RULES:
+		word = pattern.sub(replacement, word)
+	return word
+
+def skeleton(code):
+	"""
+	Esqueleto de un código fonético: la primera letra seguida de las consonantes.
+	Es insensible a vocales intercambiadas u omitidas ("juan" y "jaun" -> "jn").
+
+	:param code: Código fonético
+	:return: Esqueleto del código
+	"""
+	return code[:1] + re.sub(r'[aeiouy]', '', code[1:])
+
+def _allowed(i, j, n_left):
+	"""En el enlace de dos listas solo se comparan nombres de listas distintas."""
+	return n_left is None or (i < n_left) != (j < n_left)
+
+def _canonical_key(keys, purged, i, j):
+	"""Menor clave compartida no descartada, o None si no comparten bloque."""
+	shared = [key for key in keys[i] & keys[j] if key not in purged]
+	return min(shared) if shared else None
+
+class BlockedMatcher:
+	"""
+	Busca todos los pares de nombres con similitud Jaro-Winkler >= umbral
+	comparando solo los pares candidatos que genera el bloqueo.
+
+	Permite emparejar una lista consigo misma (muchos a muchos, deduplicación)
+	o dos listas entre sí (uno a muchos / enlace de registros).
+	"""
+
+	def __init__(self, threshold=0.9, key_length=4, window=4, max_block=2000, jw=None):
+		"""
+		:param threshold: Similitud mínima para considerar dos nombres iguales
+		:param key_length: Cantidad de caracteres del esqueleto usados como clave
+		:param window: Cantidad de vecinos comparados en el vecindario ordenado
+		:param max_block: Los bloques con más nombres se descartan (claves demasiado
+						  comunes); la estadística 'purged_blocks' los cuenta
+		:param jw: Instancia de JaroWinkler a usar (por defecto una nueva)
+		"""
+		self.threshold = threshold
+		self.key_length = key_length
+		self.window = window
+		self.max_block = max_block
+		self.jw = jw or JaroWinkler()
+
+	def keys(self, name):
+		"""
+		Claves de bloqueo de un nombre: cada par de esqueletos fonéticos de sus
+		palabras (o el esqueleto de la única palabra).
+
+		:param name: Nombre a procesar
+		:return: Tupla ordenada de claves
+		"""
+		codes = (phonetic_code(word) for word in fold(name).split())
+		skeletons = sorted({skeleton(code)[:self.key_length] for code in codes if code})
+		if len(skeletons) < 2:
+			return tuple(skeletons)
+		return tuple(f"{a} {b}" for a, b in combinations(skeletons, 2))
+
+	def prepare(self, names):
+		"""
+		Calcula las claves, el código ordenable y la longitud de cada nombre.
+		Es independiente para cada nombre, así que puede repartirse en partes.
+
+		:param names: Lista de nombres
+		:return: Tupla (claves, códigos, longitudes), listas alineadas con names
+		"""
+		keys, sort_codes = [], []
+		for name in names:
+			keys.append(frozenset(self.keys(name)))
+			sort_codes.append(' '.join(phonetic_code(word) for word in fold(name).split()))
+		return keys, sort_codes, [len(name) for name in names]
+
+	def blocking(self, keys):
+		"""
+		Arma los bloques a partir de las claves de cada nombre.
+
+		:param keys: Claves de cada nombre (las de prepare)
+		:return: Tupla (bloques, descartadas): diccionario clave -> índices de
+				 los nombres con esa clave, y conjunto de claves con más de
+				 max_block nombres
+		"""
+		blocks = {}
+		for i, name_keys in enumerate(keys):
+			for key in name_keys:
+				blocks.setdefault(key, []).append(i)
+		purged = {key for key, members in blocks.items() if len(members) > self.max_block}
+		return blocks, purged
+
+	def block_pairs(self, key, members, keys, lengths, purged, n_left=None):
+		"""
+		Pares candidatos de un bloque, con bandas de longitud. Un par se genera
+		solo en el bloque de su menor clave compartida, así no se repite entre
+		bloques.
+
+		:param key: Clave del bloque
+		:param members: Índices de los nombres del bloque
+		:param keys: Claves de cada nombre
+		:param lengths: Longitud de cada nombre
+		:param purged: Claves descartadas (ver blocking)
+		:param n_left: Ver candidate_pairs
+		:return: Generador de pares (i, j) con i < j
+		"""
+		bound = self.jw.length_upper_bound
+		members = sorted(members, key=lengths.__getitem__)
+		for a, i in enumerate(members):
+			for j in members[a + 1:]:
+				# Las longitudes crecen: la cota solo puede bajar
+				if bound(lengths[i], lengths[j]) < self.threshold:
+					break
+				if _allowed(i, j, n_left) and _canonical_key(keys, purged, i, j) == key:
+					yield (i, j) if i < j else (j, i)
+
+	def neighbour_pairs(self, order, start, stop, keys, lengths, purged, n_left=None):
+		"""
+		Pares candidatos del vecindario ordenado que no comparten ningún bloque.
+
+		:param order: Índices de los nombres ordenados por código fonético completo
+		:param start: Primera posición de order a recorrer
+		:param stop: Posición siguiente a la última
+		:param keys: Claves de cada nombre
+		:param lengths: Longitud de cada nombre
+		:param purged: Claves descartadas (ver blocking)
+		:param n_left: Ver candidate_pairs
+		:return: Generador de pares (i, j) con i < j
+		"""
+		bound = self.jw.length_upper_bound
+		for position in range(start, stop):
+			i = order[position]
+			for j in order[position + 1:position + 1 + self.window]:
+				if (_allowed(i, j, n_left) and _canonical_key(keys, purged, i, j) is None
+						and bound(lengths[i], lengths[j]) >= self.threshold):
+					yield (i, j) if i < j else (j, i)
+
+	def candidate_pairs(self, names, n_left=None, stats=None, prepared=None):
+		"""
+		Genera los pares candidatos (i, j), cada uno una sola vez.
+
+		:param names: Lista de nombres
+		:param n_left: Si se indica, names son dos listas concatenadas (las
+					   primeras n_left y el resto) y solo se generan pares entre
+					   ambas, con i < n_left <= j
+		:param stats: Diccionario donde se acumulan las estadísticas del bloqueo
+		:param prepared: Resultado de prepare(names), si ya se calculó
+		:return: Generador de pares (i, j) con i < j
+		"""
+		stats = {} if stats is None else stats
+		keys, sort_codes, lengths = prepared or self.prepare(names)
+		blocks, purged = self.blocking(keys)
+		stats['blocks'] = len(blocks)
+		stats['purged_blocks'] = len(purged)
+
+		# Bloques por clave fonética, con bandas de longitud
+		for key, members in blocks.items():
+			if key not in purged and len(members) > 1:
+				yield from self.block_pairs(key, members, keys, lengths, purged, n_left)
+
+		# Vecindario ordenado por código fonético completo
+		order = sorted(range(len(names)), key=sort_codes.__getitem__)
+		yield from self.neighbour_pairs(order, 0, len(order), keys, lengths, purged, n_left)
+
+	def _run(self, names, n_left, true_pairs):
+		"""Evalúa los pares candidatos y arma las estadísticas."""
+		stats = {}
+		start = time.perf_counter()
+		found, compared, true_candidates = [], 0, 0
+		similarity, at_least = self.jw.similarity, self.jw.similarity_at_least
+		for i, j in self.candidate_pairs(names, n_left, stats):
+			compared += 1
+			if true_pairs is not None and (i, j) in true_pairs:
+				true_candidates += 1
+			# La mayoría de los candidatos no llega al umbral: se descartan con
+			# el corte anticipado y solo se calcula la similitud de los que sí
+			if at_least(names[i], names[j], self.threshold):
+				found.append((i, j, similarity(names[i], names[j])))
+		seconds = time.perf_counter() - start
+
+		n = len(names)
+		total = n * (n - 1) // 2 if n_left is None else n_left * (n - n_left)
+		stats.update({
+			'names': n,
+			'total_pairs': total,
+			'candidate_pairs': compared,
+			'reduction_ratio': 1 - compared / total if total else 0.0,
+			'matches': len(found),
+			'seconds': seconds,
+			'pairs_per_second': compared / seconds if seconds else None,
+			'names_per_second': n / seconds if seconds else None,
+		})
+		if true_pairs is not None:
+			hits = sum(1 for i, j, _ in found if (i, j) in true_pairs)
+			stats['pairs_completeness'] = true_candidates / len(true_pairs) if true_pairs else 1.0
+			stats['recall'] = hits / len(true_pairs) if true_pairs else 1.0
+			stats['precision'] = hits / len(found) if found else 1.0
+		return found, stats
+
+	def deduplicate(self, names, true_pairs=None):
+		"""
+		Busca los pares de nombres similares dentro de una misma lista (muchos a muchos).
+
+		:param names: Lista de nombres
+		:param true_pairs: Conjunto opcional de pares (i, j), i < j, que son
+						   realmente la misma persona, para medir la cobertura
+		:return: Tupla (pares, estadísticas): lista de (i, j, similitud) y un
+				 diccionario con la reducción de pares, el rendimiento y, si se
+				 pasó true_pairs, 'pairs_completeness' (pares verdaderos que
+				 llegaron a compararse), 'recall' y 'precision'
+		"""
+		return self._run(list(names), None, None if true_pairs is None else set(true_pairs))
+
+	def link(self, queries, references, true_pairs=None):
+		"""
+		Busca, para cada nombre de queries, los nombres similares de references
+		(uno a muchos).
+
+		:param queries: Nombres a buscar
+		:param references: Nombres de referencia (por ejemplo, el padrón)
+		:param true_pairs: Conjunto opcional de pares verdaderos (q, r)
+		:return: Tupla (pares, estadísticas) con pares (índice en queries,
+				 índice en references, similitud)
+		"""
+		queries, references = list(queries), list(references)
+		n_left = len(queries)
+		shifted = None if true_pairs is None else {(q, n_left + r) for q, r in true_pairs}
+		found, stats = self._run(queries + references, n_left, shifted)
+		return [(i, j - n_left, score) for i, j, score in found], stats
+
+
+if __name__ == "__main__":
+	import random
+
+	# Padrón sintético: nombres armados con sílabas y variantes tipográficas de algunos
+	rng = random.Random(0)
+	syllables = ["ma", "ri", "jo", "sé", "lu", "cí", "an", "to", "ni", "ra", "mon", "go", "mez", "per",
+				 "ro", "dri", "guez", "fer", "nán", "dez", "ho", "ra", "cio", "ló", "pez", "sa", "ve", "dra"]
+
+	def word():
+		return ''.join(rng.choice(syllables) for _ in range(rng.randrange(2, 4))).capitalize()
+
+	def typo(name):
+		"""Aplica un error típico: transposición, omisión inicial o quitar acentos."""
+		kind = rng.randrange(3)
+		if kind == 0:
+			k = rng.randrange(1, len(name) - 2)
+			return name[:k] + name[k + 1] + name[k] + name[k + 2:]
+		if kind == 1:
+			return name[1:]
+		return ''.join(c for c in unicodedata.normalize('NFKD', name) if not unicodedata.combining(c))
+
+	names, true_pairs = [], set()
+	for _ in range(20_000):
+		names.append(f"{word()} {word()} {word()}")
+		if rng.random() < 0.1:
+			true_pairs.add((len(names) - 1, len(names)))
+			names.append(typo(names[-1]))
+
+	matcher = BlockedMatcher(threshold=0.85)
+	pairs, stats = matcher.deduplicate(names, true_pairs)
+	for key, value in stats.items():
+		print(f"{key:20s} {value:,.4f}" if isinstance(value, float) else f"{key:20s} {value:,}")
+
+	print("\n'Horacio López' vs 'Oracio López':", matcher.keys("Horacio López"), matcher.keys("Oracio López"))
+	pairs, _ = matcher.link(["Oracio López", "Jaun Perez"], ["Horacio López", "Juan Perez", "Juana Paz"])
+	print("Enlace:", pairs)
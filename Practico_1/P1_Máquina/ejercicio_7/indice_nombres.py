@@ -0,0 +1,463 @@
+"""
+Índice persistente para buscar los k nombres más parecidos a una consulta.
+
+Comparar la consulta con JaroWinkler.similarity contra millones de nombres es
+demasiado lento para uso interactivo. El índice guarda, para cada n-grama de
+caracteres (por defecto trigramas del nombre normalizado), la lista ordenada
+de ids de los nombres que lo contienen (listas invertidas), todas juntas en
+dos arreglos de numpy: los ids concatenados y el inicio de la lista de cada
+n-grama (formato CSR). Una búsqueda:
+
+	1. Junta candidatos por n-gramas compartidos con la consulta. Se usa
+	   filtrado por prefijo: si un candidato debe compartir al menos T de los
+	   q n-gramas de la consulta, necesariamente aparece en alguno de los
+	   q - T + 1 n-gramas menos frecuentes, así que solo se cuentan (con
+	   np.unique sobre los ids de esas listas, las más cortas) los
+	   candidatos que aparecen en ellas
+	2. Completa la cuenta de los mejores candidatos con los T - 1 n-gramas
+	   restantes (búsqueda binaria en sus listas ordenadas) y descarta los que
+	   no llegan a T (filtro por cantidad) o cuya longitud no permite alcanzar
+	   la similitud mínima (filtro por longitud)
+	3. Evalúa los candidatos con más n-gramas compartidos, podándolos con la
+	   cota de Jaro-Winkler por longitudes frente al k-ésimo mejor puntaje, y
+	   los ordena con la similitud calculada con la consulta preparada una
+	   sola vez (comparador.QueryMatcher, más rápida que descartar primero
+	   con similarity_at_least)
+
+Los resultados son aproximados. Un nombre que comparte menos de T n-gramas con
+la consulta, o que queda fuera de los SHORTLIST_FACTOR * max_candidates mejores
+según las listas cortas, no se evalúa aunque su similitud de Jaro-Winkler sea
+mayor que la de los resultados. exact_search recorre todos los nombres y
+permite medir cuánto se pierde (la demostración informa el recall@k). Subir
+max_candidates o bajar min_overlap aumenta el recall a cambio de tiempo.
+
+El índice se guarda en un directorio con estos archivos:
+	- nombres.txt: un nombre por línea (el número de línea es el id); solo se
+	  agregan líneas al final
+	- ngramas.json: versión, n, cantidad de nombres indexados, SHA-256 de esas
+	  líneas de nombres.txt y la lista de n-gramas (el orden da su posición)
+	- ngramas.off: inicio de la lista de cada n-grama (uint64, uno más que la
+	  cantidad de n-gramas)
+	- ngramas.ids: ids de todas las listas concatenadas (uint32), que se mapean
+	  en memoria al abrir el índice
+
+Los nombres agregados después del último save() están en nombres.txt y se
+indexan al abrir el índice en listas en memoria, que save() combina con las
+guardadas. Si nombres.txt fue reescrito (el SHA-256 de las líneas indexadas no
+coincide) el índice se reconstruye.
+"""
+import hashlib
+import heapq
+import json
+import math
+import os
+from array import array
+
+import numpy as np
+
+from comparador import QueryMatcher
+from ej_7 import JaroWinkler
+from emparejamiento import fold
+
+NAMES_FILE = "nombres.txt"
+META_FILE = "ngramas.json"
+OFFSETS_FILE = "ngramas.off"
+IDS_FILE = "ngramas.ids"
+INDEX_VERSION = 2
+
+# Candidatos (por cada uno de max_candidates) a los que se les completa la
+# cuenta de n-gramas compartidos
+SHORTLIST_FACTOR = 4
+
+
+def _replace(path, data):
+	"""Escribe un archivo en un temporal y lo reemplaza de forma atómica."""
+	temporary = path + ".tmp"
+	with open(temporary, 'wb') as f:
+		if isinstance(data, np.ndarray):
+			data.tofile(f)
+		else:
+			f.write(data)
+	os.replace(temporary, path)
+
+
+class NameIndex:
+	"""
+	Índice de n-gramas de nombres con búsqueda de los k más parecidos.
+	"""
+
+	def __init__(self, directory=None, n=3, min_overlap=0.5, max_candidates=500, jw=None):
+		"""
+		Abre (o crea) un índice.
+
+		:param directory: Directorio del índice; si es None el índice vive solo en memoria
+		:param n: Longitud de los n-gramas (2 o 3 son los valores habituales)
+		:param min_overlap: Fracción mínima de n-gramas de la consulta que debe
+							compartir un candidato
+		:param max_candidates: Máximo de candidatos evaluados con Jaro-Winkler por consulta
+		:param jw: Instancia de JaroWinkler a usar (por defecto una nueva)
+		"""
+		self.directory = directory
+		self.n = n
+		self.min_overlap = min_overlap
+		self.max_candidates = max_candidates
+		self.jw = jw or JaroWinkler()
+		self.names = []
+		# Longitud de cada nombre, para el filtro por longitud
+		self._lengths = array('I')
+		# Listas guardadas (CSR): posición de cada n-grama, inicios e ids
+		self._slots = {}
+		self._offsets = np.zeros(1, dtype=np.uint64)
+		self._ids = np.empty(0, dtype=np.uint32)
+		# Listas de los nombres agregados después de lo guardado
+		self._recent = {}
+		self._names_file = None
+
+		if directory is not None:
+			os.makedirs(directory, exist_ok=True)
+			self._load()
+			self._names_file = open(os.path.join(directory, NAMES_FILE), 'a', encoding='utf-8')
+
+	def grams(self, name):
+		"""
+		Conjunto de n-gramas del nombre normalizado (con un espacio de relleno
+		a cada lado, para que el inicio y el final del nombre tengan sus n-gramas).
+
+		:param name: Nombre
+		:return: Conjunto de n-gramas
+		"""
+		text = f" {' '.join(fold(name).split())} "
+		return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+	def _index(self, name_id, name):
+		"""Agrega un nombre a las listas en memoria."""
+		for gram in self.grams(name):
+			posting = self._recent.get(gram)
+			if posting is None:
+				posting = self._recent[gram] = array('I')
+			posting.append(name_id)
+
+	def _path(self, name):
+		return os.path.join(self.directory, name)
+
+	def _load(self):
+		"""Abre las listas guardadas e indexa los nombres agregados después."""
+		names_path = self._path(NAMES_FILE)
+		data = b''
+		if os.path.exists(names_path):
+			with open(names_path, 'rb') as f:
+				data = f.read()
+		lines = data.split(b'\n')
+		# El último elemento es lo que sigue al último salto de línea (vacío)
+		lines.pop()
+		self.names = [line.decode('utf-8') for line in lines]
+		self._lengths = array('I', map(len, self.names))
+
+		indexed = 0
+		try:
+			with open(self._path(META_FILE), encoding='utf-8') as f:
+				meta = json.load(f)
+			count = meta['count']
+			# Solo se aprovecha si corresponde a la configuración y a los nombres actuales
+			if (meta['version'] == INDEX_VERSION and meta['n'] == self.n and count <= len(self.names)
+					and meta['sha256'] == self._digest(data, lines, count)):
+				offsets = np.fromfile(self._path(OFFSETS_FILE), dtype='<u8')
+				if len(offsets) == len(meta['grams']) + 1 and offsets[-1] * 4 == os.path.getsize(self._path(IDS_FILE)):
+					self._offsets = offsets
+					self._ids = (np.memmap(self._path(IDS_FILE), dtype='<u4', mode='r')
+								 if offsets[-1] else np.empty(0, dtype=np.uint32))
+					self._slots = {gram: slot for slot, gram in enumerate(meta['grams'])}
+					indexed = count
+		except (OSError, ValueError, KeyError):
+			pass
+
+		for name_id in range(indexed, len(self.names)):
+			self._index(name_id, self.names[name_id])
+
+	@staticmethod
+	def _digest(data, lines, count):
+		"""SHA-256 de las primeras 'count' líneas (con sus saltos de línea)."""
+		size = sum(map(len, lines[:count])) + count
+		return hashlib.sha256(memoryview(data)[:size]).hexdigest()
+
+	def add(self, name):
+		"""
+		Agrega un nombre al índice.
+
+		:param name: Nombre a agregar
+		:return: Id asignado (posición del nombre)
+		"""
+		name = name.replace('\n', ' ').replace('\r', ' ')
+		name_id = len(self.names)
+		self.names.append(name)
+		self._lengths.append(len(name))
+		self._index(name_id, name)
+		if self._names_file is not None:
+			self._names_file.write(name + '\n')
+		return name_id
+
+	def add_many(self, names):
+		"""
+		Agrega varios nombres.
+
+		:param names: Iterable de nombres
+		:return: Lista de ids asignados
+		"""
+		return [self.add(name) for name in names]
+
+	def _merge(self):
+		"""
+		Combina las listas en memoria con las guardadas en un nuevo CSR.
+
+		:return: Tupla (n-gramas en orden de posición, inicios, ids)
+		"""
+		grams = list(self._slots)
+		slots = dict(self._slots)
+		for gram in self._recent:
+			if gram not in slots:
+				slots[gram] = len(grams)
+				grams.append(gram)
+
+		saved_lengths = np.zeros(len(grams), dtype=np.int64)
+		saved_lengths[:len(self._offsets) - 1] = np.diff(self._offsets.astype(np.int64))
+		recent_slots = np.array([slots[gram] for gram in self._recent], dtype=np.int64)
+		recent_lengths = np.array([len(posting) for posting in self._recent.values()], dtype=np.int64)
+		lengths = saved_lengths.copy()
+		np.add.at(lengths, recent_slots, recent_lengths)
+		offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+		np.cumsum(lengths, out=offsets[1:])
+
+		ids = np.empty(int(offsets[-1]), dtype='<u4')
+		# Las listas guardadas van al principio de cada lista nueva...
+		old_slot = np.repeat(np.arange(len(saved_lengths)), saved_lengths)
+		old_start = np.repeat(self._offsets[:-1].astype(np.int64), saved_lengths[:len(self._offsets) - 1])
+		ids[offsets[old_slot] + np.arange(len(old_slot)) - old_start] = self._ids
+		# ... y los ids nuevos (mayores que todos los guardados) a continuación
+		if self._recent:
+			recent_ids = np.concatenate([np.frombuffer(posting, dtype=np.uint32) for posting in self._recent.values()])
+			new_slot = np.repeat(recent_slots, recent_lengths)
+			rank = np.arange(len(recent_ids)) - np.repeat(np.cumsum(recent_lengths) - recent_lengths, recent_lengths)
+			ids[offsets[new_slot] + saved_lengths[new_slot] + rank] = recent_ids
+		return grams, offsets.astype('<u8'), ids
+
+	def save(self):
+		"""
+		Guarda las listas invertidas. Hasta que se llama, los nombres nuevos
+		se indexan de nuevo al abrir el índice.
+		"""
+		if self.directory is None:
+			return
+		self._names_file.flush()
+		grams, offsets, ids = self._merge()
+		# Se libera el mapeo anterior antes de reemplazar los archivos
+		self._ids = ids
+		_replace(self._path(IDS_FILE), ids)
+		_replace(self._path(OFFSETS_FILE), offsets)
+
+		with open(self._path(NAMES_FILE), 'rb') as f:
+			data = f.read()
+		lines = data.split(b'\n')
+		meta = {'version': INDEX_VERSION, 'n': self.n, 'count': len(self.names),
+				'sha256': self._digest(data, lines, len(self.names)), 'grams': grams}
+		# El archivo de metadatos se reemplaza último: hasta entonces vale el índice anterior
+		# (que no coincide en tamaño con los nuevos arreglos y se reconstruye)
+		_replace(self._path(META_FILE), json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+		self._slots = {gram: slot for slot, gram in enumerate(grams)}
+		self._offsets = offsets
+		self._recent = {}
+
+	def close(self):
+		"""Guarda el índice y cierra el archivo de nombres."""
+		if self._names_file is not None:
+			self.save()
+			self._names_file.close()
+			self._names_file = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+	def __len__(self):
+		"""Cantidad de nombres indexados."""
+		return len(self.names)
+
+	def _frequency(self, gram):
+		"""Cantidad de nombres que contienen el n-grama."""
+		slot = self._slots.get(gram)
+		saved = 0 if slot is None else int(self._offsets[slot + 1] - self._offsets[slot])
+		return saved + len(self._recent.get(gram, ()))
+
+	def _posting(self, gram):
+		"""Lista ordenada de ids de los nombres que contienen el n-grama."""
+		slot = self._slots.get(gram)
+		saved = (self._ids[int(self._offsets[slot]):int(self._offsets[slot + 1])]
+				 if slot is not None else self._ids[:0])
+		recent = self._recent.get(gram)
+		if not recent:
+			return saved
+		return np.concatenate((saved, np.frombuffer(recent, dtype=np.uint32)))
+
+	def candidates(self, query, min_similarity=0.0):
+		"""
+		Candidatos de la consulta ordenados por n-gramas compartidos.
+
+		:param query: Nombre buscado
+		:param min_similarity: Similitud mínima; descarta los nombres cuya
+							   longitud no permite alcanzarla
+		:return: Lista de (id, n-gramas compartidos) con al menos T compartidos
+		"""
+		grams = sorted(self.grams(query), key=self._frequency)
+		if not grams:
+			return []
+		required = max(1, math.ceil(self.min_overlap * len(grams)))
+		split = len(grams) - required + 1
+		# Filtrado por prefijo: alcanza con las q - T + 1 listas más cortas
+		postings = [self._posting(gram) for gram in grams[:split]]
+		postings = [posting for posting in postings if len(posting)]
+		if not postings:
+			return []
+		# Se cuenta sobre los ids presentes: np.bincount reservaría un arreglo
+		# del tamaño del mayor id en cada consulta
+		ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+
+		# Filtro por longitud: longitudes con las que se puede alcanzar la similitud mínima
+		if min_similarity > 0:
+			lengths = np.frombuffer(self._lengths, dtype=np.uint32)[ids]
+			query_len = len(query)
+			reachable = np.array([self.jw.length_upper_bound(query_len, length) >= min_similarity
+								  for length in range(int(lengths.max()) + 1)])
+			keep = reachable[lengths]
+			ids, shared = ids[keep], shared[keep]
+
+		# Se completa la cuenta solo de los mejores según las listas cortas
+		shortlist = SHORTLIST_FACTOR * self.max_candidates
+		if len(ids) > shortlist:
+			best = np.argpartition(-shared, shortlist)[:shortlist]
+			best.sort()
+			ids, shared = ids[best], shared[best]
+		for gram in grams[split:]:
+			posting = self._posting(gram)
+			if len(posting):
+				positions = np.minimum(np.searchsorted(posting, ids), len(posting) - 1)
+				shared += posting[positions] == ids
+
+		# Filtro por cantidad: al menos T n-gramas compartidos
+		keep = shared >= required
+		ids, shared = ids[keep], shared[keep]
+		order = np.argsort(-shared, kind='stable')[:self.max_candidates]
+		return list(zip(ids[order].tolist(), shared[order].tolist()))
+
+	def search(self, query, k=10, min_similarity=0.0):
+		"""
+		Busca los k nombres más parecidos a la consulta.
+
+		El resultado es aproximado: solo se evalúan los candidatos que devuelve
+		candidates(), así que puede faltar algún nombre más parecido que
+		exact_search sí encontraría.
+
+		:param query: Nombre buscado
+		:param k: Cantidad de resultados
+		:param min_similarity: Similitud mínima de los resultados
+		:return: Lista de (similitud, id, nombre) de mayor a menor similitud
+		"""
+		name_ids = (name_id for name_id, _ in self.candidates(query, min_similarity))
+		return self._top_k(query, name_ids, k, min_similarity)
+
+	def exact_search(self, query, k=10, min_similarity=0.0):
+		"""
+		Busca los k nombres más parecidos comparando la consulta con todos los
+		nombres (fuerza bruta). Es lento, pero sirve de referencia para medir
+		el recall de search.
+
+		:param query: Nombre buscado
+		:param k: Cantidad de resultados
+		:param min_similarity: Similitud mínima de los resultados
+		:return: Lista de (similitud, id, nombre) de mayor a menor similitud
+		"""
+		return self._top_k(query, range(len(self.names)), k, min_similarity)
+
+	def _top_k(self, query, name_ids, k, min_similarity):
+		"""Los k nombres de name_ids más parecidos a la consulta, podando con la cota por longitudes."""
+		best = []  # Heap de mínimos con los k mejores (similitud, -id)
+		similarity = QueryMatcher(query, normalize=False, jw=self.jw).similarity
+		query_len = len(query)
+		bounds = {}  # Cota por longitudes para cada longitud de candidato
+		for name_id in name_ids:
+			name = self.names[name_id]
+			bound = bounds.get(len(name))
+			if bound is None:
+				bound = bounds[len(name)] = self.jw.length_upper_bound(query_len, len(name))
+			# Umbral actual: el k-ésimo mejor puntaje (o el mínimo pedido)
+			floor = best[0][0] if len(best) == k else min_similarity
+			if bound < floor:
+				continue
+			score = similarity(name)
+			if score < min_similarity:
+				continue
+			if len(best) < k:
+				heapq.heappush(best, (score, -name_id))
+			elif score > best[0][0]:
+				heapq.heapreplace(best, (score, -name_id))
+		return [(score, -neg_id, self.names[-neg_id]) for score, neg_id in sorted(best, reverse=True)]
+
+
+if __name__ == "__main__":
+	import random
+	import tempfile
+	import time
+
+	# Padrón sintético: dos apellidos y uno o dos nombres
+	rng = random.Random(0)
+	first_names = ["Juan", "María", "José", "Lucía", "Martín", "Sofía", "Joaquín", "Valentina", "Agustín",
+				   "Camila", "Nicolás", "Florencia", "Tomás", "Ramón", "Inés", "Germán", "Horacio", "Beatriz"]
+	last_names = ["González", "Rodríguez", "Gómez", "Fernández", "López", "Díaz", "Martínez", "Pérez",
+				  "García", "Sánchez", "Romero", "Sosa", "Álvarez", "Torres", "Ruiz", "Núñez", "Ibáñez",
+				  "Domínguez", "Peña", "Acosta", "Benítez", "Medina", "Herrera", "Suárez", "Aguirre"]
+
+	def random_name():
+		names = rng.sample(first_names, rng.randrange(1, 3))
+		return ' '.join(rng.sample(last_names, 2) + names)
+
+	n = 1_000_000
+	with tempfile.TemporaryDirectory() as tmp:
+		start = time.perf_counter()
+		with NameIndex(tmp) as index:
+			index.add_many(random_name() for _ in range(n))
+		print(f"Índice de {n:,} nombres creado en {time.perf_counter() - start:.1f} s")
+
+		start = time.perf_counter()
+		index = NameIndex(tmp)
+		print(f"Índice abierto en {time.perf_counter() - start:.1f} s")
+		index.add("López Oracio Juan")
+
+		queries = ["López Horacio Juan", "Fernandes Gomes Maria Jose", "Nuñes Ibañes Tomas"]
+		queries += [index.names[rng.randrange(n)][1:] for _ in range(20)]
+		start = time.perf_counter()
+		for query in queries:
+			index.search(query, k=5)
+		elapsed = (time.perf_counter() - start) / len(queries)
+		print(f"Búsqueda promedio: {elapsed * 1000:.1f} ms")
+
+		# Recall@k frente a la fuerza bruta: un resultado cuenta como acierto si
+		# su similitud llega a la k-ésima exacta (los empates valen igual)
+		k = 5
+		sample = queries[:5]
+		hits = total = exact_top = 0
+		start = time.perf_counter()
+		for query in sample:
+			exact = index.exact_search(query, k=k)
+			approximate = index.search(query, k=k)
+			hits += sum(score >= exact[-1][0] for score, _, _ in approximate)
+			total += len(exact)
+			exact_top += bool(approximate) and approximate[0][0] == exact[0][0]
+		print(f"Recall@{k} frente a la fuerza bruta ({len(sample)} consultas, "
+			  f"{time.perf_counter() - start:.0f} s): {hits / total:.3f}; "
+			  f"mejor resultado exacto en {exact_top}/{len(sample)}")
+		for query in queries[:3]:
+			print(f"\n{query}:")
+			for score, name_id, name in index.search(query, k=5):
+				print(f"  {score:.4f}  [{name_id}] {name}")
+		index.close()
@@ -0,0 +1,124 @@
+"""
+Calcula la similitud Jaro-Winkler de pares de cadenas leídos en flujo.
+
+Lee pares desde la entrada estándar o un archivo CSV de dos columnas y escribe
+cada par con su similitud como tercera columna. Los pares se procesan por
+tandas, así que la memoria no depende del tamaño de la entrada; con --procesos
+las tandas se reparten entre varios procesos, con un máximo de tandas en vuelo
+y conservando el orden de la entrada.
+
+	python puntuar_pares.py pares.csv -o puntajes.csv --procesos 4
+	cat pares.csv | python puntuar_pares.py --umbral 0.9 > similares.csv
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import argparse
+import csv
+import sys
+
+from ej_7 import JaroWinkler
+
+CHUNK_SIZE = 10_000
+
+_jw = JaroWinkler()
+
+
+def score_chunk(rows, threshold=None):
+	"""
+	Calcula la similitud de una tanda de pares.
+
+	:param rows: Lista de pares [s0, s1]
+	:param threshold: Si se indica, solo se devuelven los pares con similitud >= threshold
+	:return: Lista de filas [s0, s1, similitud]
+	"""
+	similarity = _jw.similarity
+	if threshold is None:
+		return [(s0, s1, f"{similarity(s0, s1):.6f}") for s0, s1 in rows]
+	# La similitud se calcula una sola vez por par y se filtra sobre ese valor
+	scored = ((s0, s1, similarity(s0, s1)) for s0, s1 in rows)
+	return [(s0, s1, f"{score:.6f}") for s0, s1, score in scored if score >= threshold]
+
+
+def read_chunks(reader, chunk_size):
+	"""
+	Agrupa las filas del lector en tandas de pares, ignorando filas vacías.
+
+	:param reader: Lector CSV
+	:param chunk_size: Pares por tanda
+	:return: Generador de listas de pares
+	"""
+	rows = ((row[0], row[1]) for row in reader if len(row) >= 2)
+	while True:
+		chunk = list(islice(rows, chunk_size))
+		if not chunk:
+			return
+		yield chunk
+
+
+def score_stream(source, destination, chunk_size=CHUNK_SIZE, workers=1, threshold=None,
+				 delimiter=',', header=False):
+	"""
+	Calcula la similitud de todos los pares de source y los escribe en destination.
+
+	:param source: Archivo de texto de entrada (dos columnas)
+	:param destination: Archivo de texto de salida
+	:param chunk_size: Pares por tanda
+	:param workers: Cantidad de procesos (1 = en el proceso actual)
+	:param threshold: Si se indica, solo se escriben los pares con similitud >= threshold
+	:param delimiter: Separador de columnas
+	:param header: Si es True la primera fila es un encabezado y se copia a la salida
+	:return: Cantidad de pares leídos
+	"""
+	reader = csv.reader(source, delimiter=delimiter)
+	writer = csv.writer(destination, delimiter=delimiter, lineterminator='\n')
+	if header:
+		names = next(reader, None)
+		if names is not None:
+			writer.writerow(names[:2] + ["similitud"])
+
+	count = 0
+	if workers <= 1:
+		for chunk in read_chunks(reader, chunk_size):
+			count += len(chunk)
+			writer.writerows(score_chunk(chunk, threshold))
+		return count
+
+	with ProcessPoolExecutor(workers) as pool:
+		pending = deque()
+		for chunk in read_chunks(reader, chunk_size):
+			count += len(chunk)
+			pending.append(pool.submit(score_chunk, chunk, threshold))
+			# Se escriben las tandas en orden, con un máximo en vuelo para acotar la memoria
+			if len(pending) >= 2 * workers:
+				writer.writerows(pending.popleft().result())
+		while pending:
+			writer.writerows(pending.popleft().result())
+	return count
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description="Similitud Jaro-Winkler de pares de cadenas")
+	parser.add_argument("entrada", nargs="?", help="CSV de dos columnas (por defecto, la entrada estándar)")
+	parser.add_argument("-o", "--salida", help="Archivo de salida (por defecto, la salida estándar)")
+	parser.add_argument("--procesos", type=int, default=1)
+	parser.add_argument("--tanda", type=int, default=CHUNK_SIZE, help="Pares por tanda")
+	parser.add_argument("--umbral", type=float, default=None, help="Solo escribe los pares con similitud >= umbral")
+	parser.add_argument("--separador", default=',')
+	parser.add_argument("--cabecera", action="store_true", help="La primera fila es un encabezado")
+	args = parser.parse_args(argv)
+
+	source = open(args.entrada, newline='', encoding='utf-8') if args.entrada else sys.stdin
+	destination = open(args.salida, 'w', newline='', encoding='utf-8') if args.salida else sys.stdout
+	try:
+		score_stream(source, destination, args.tanda, args.procesos, args.umbral,
+					 args.separador, args.cabecera)
+	finally:
+		if args.entrada:
+			source.close()
+		if args.salida:
+			destination.close()
+
+
+if __name__ == "__main__":
+	main()
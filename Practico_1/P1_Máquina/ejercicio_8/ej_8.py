@@ -25,6 +25,53 @@ def tipo2(tipo):
 		return "CUIT"
 	raise ValueError("Tipo de CUIL/CUIT no valido")
 
+def calcular_digito_verificador(digitos):
+	"""
+	Calcula el dígito verificador de un CUIT/CUIL.
+	
+	Args:
+		digitos (list): Dígitos del CUIT/CUIL (se usan los primeros 10: tipo y DNI)
+		
+	Returns:
+		int: Dígito verificador (0 a 9)
+	"""
+	# Calcula la suma ponderada de los primeros 10 dígitos
+	suma_ponderada = sum(
+		digitos[i] * base[i] for i in range(10)
+	)
+ 
+	# Calcula el dígito verificador esperado
+	resto = suma_ponderada % 11
+	digito_verificador = 11 - resto
+
+	# Casos especiales para el dígito verificador
+	if digito_verificador == 11: 
+		digito_verificador = 0
+	if digito_verificador == 10: 
+		digito_verificador = 9
+	return digito_verificador
+
+def generar_cuit(tipo, dni):
+	"""
+	Arma el CUIT/CUIL completo a partir del tipo y el DNI.
+	
+	Args:
+		tipo (int): Tipo (uno de tipos_cuil o tipos_cuit)
+		dni (int): Número de documento (hasta 8 dígitos)
+		
+	Returns:
+		str: CUIT/CUIL en formato XX-XXXXXXXX-X
+		
+	Raises:
+		ValueError: Si el tipo o el DNI no son válidos
+	"""
+	if tipo not in tipos:
+		raise ValueError("Tipo de CUIL/CUIT no valido")
+	if not 0 <= dni <= 99_999_999:
+		raise ValueError("DNI no valido")
+	digitos = [int(c) for c in f"{tipo:02d}{dni:08d}"]
+	return f"{tipo:02d}-{dni:08d}-{calcular_digito_verificador(digitos)}"
+
 def validar_cuit(cuit):
 	"""
 	Valida un CUIT/CUIL según el algoritmo oficial.
@@ -50,20 +97,8 @@ def validar_cuit(cuit):
 	# Convierte solo los dígitos a una lista de enteros (elimina guiones)
 	cuit_digitos = [int(i) for i in cuit if i.isdigit()]
  
-	# Calcula la suma ponderada de los primeros 10 dígitos
-	suma_ponderada = sum(
-		cuit_digitos[i] * base[i] for i in range(10)
-	)
- 
-	# Calcula el dígito verificador esperado
-	resto = suma_ponderada % 11
-	digito_verificador = 11 - resto
-
-	# Casos especiales para el dígito verificador
-	if digito_verificador == 11: 
-		digito_verificador = 0
-	if digito_verificador == 10: 
-		digito_verificador = 9
+	# Calcula el dígito verificador esperado a partir de los primeros 10 dígitos
+	digito_verificador = calcular_digito_verificador(cuit_digitos)
 	
 	# Verifica si el dígito verificador calculado coincide con el ingresado
 	# y retorna el resultado junto con el tipo
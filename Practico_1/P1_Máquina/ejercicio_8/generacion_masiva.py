@@ -0,0 +1,202 @@
+"""
+Generación masiva de CUIT/CUIL válidos con numpy.
+
+Dado un tipo y un DNI (o rangos completos de DNI) calcula el dígito
+verificador y arma el CUIT, con los mismos casos especiales que validar_cuit:
+
+	- La suma ponderada se calcula separando los dígitos del DNI con
+	  divisiones enteras vectorizadas y multiplicando por la base
+	- El dígito de cada resto módulo 11 sale de DIGITO_POR_RESTO
+	- Los CUIT se arman directamente como una matriz de bytes de 14 columnas
+	  (13 caracteres y el fin de línea), que se escribe al archivo sin
+	  convertir cada CUIT a texto en Python
+
+Para un único valor se usa ej_8.generar_cuit.
+"""
+import numpy as np
+
+from ej_8 import base, tipos
+from validacion_masiva import ANCHO, DIGITO_POR_RESTO
+
+# Divisores para separar los 8 dígitos del DNI, del más significativo al menos
+POTENCIAS_DNI = 10 ** np.arange(7, -1, -1, dtype=np.int64)
+
+BASE_TIPO = np.array(base[:2], dtype=np.int64)
+BASE_DNI = np.array(base[2:], dtype=np.int64)
+
+DNI_MAXIMO = 99_999_999
+
+TAMANO_LOTE = 1 << 20
+
+
+def _verificar(tipos_cuit, dnis):
+	"""Convierte a arreglos y verifica tipos y DNI."""
+	tipos_cuit = np.asarray(tipos_cuit, dtype=np.int64)
+	dnis = np.asarray(dnis, dtype=np.int64)
+	if not np.isin(tipos_cuit, tipos).all():
+		raise ValueError("Tipo de CUIL/CUIT no valido")
+	if ((dnis < 0) | (dnis > DNI_MAXIMO)).any():
+		raise ValueError("DNI no valido")
+	return np.broadcast_arrays(tipos_cuit, dnis)
+
+def _suma_ponderada(tipos_cuit, digitos_dni):
+	"""Suma ponderada de los dos dígitos del tipo y los 8 del DNI."""
+	return (tipos_cuit // 10) * BASE_TIPO[0] + (tipos_cuit % 10) * BASE_TIPO[1] + digitos_dni @ BASE_DNI
+
+def digitos_verificadores(tipos_cuit, dnis):
+	"""
+	Calcula los dígitos verificadores de muchos CUIT/CUIL.
+
+	Args:
+		tipos_cuit (array_like): Tipo de cada CUIT (o uno solo para todos)
+		dnis (array_like): DNI de cada CUIT
+
+	Returns:
+		np.ndarray: Dígitos verificadores (uint8)
+
+	Raises:
+		ValueError: Si algún tipo o DNI no es válido
+	"""
+	tipos_cuit, dnis = _verificar(tipos_cuit, dnis)
+	digitos_dni = (dnis[..., None] // POTENCIAS_DNI) % 10
+	return DIGITO_POR_RESTO[_suma_ponderada(tipos_cuit, digitos_dni) % 11]
+
+def armar_matriz(tipos_cuit, dnis, fin_de_linea=True):
+	"""
+	Arma los CUIT/CUIL completos como una matriz de bytes.
+
+	Args:
+		tipos_cuit (array_like): Tipo de cada CUIT (o uno solo para todos)
+		dnis (array_like): DNI de cada CUIT
+		fin_de_linea (bool): Si es True agrega una columna con '\\n'
+
+	Returns:
+		np.ndarray: Matriz uint8 de forma (n, 13) o (n, 14)
+
+	Raises:
+		ValueError: Si algún tipo o DNI no es válido
+	"""
+	tipos_cuit, dnis = _verificar(tipos_cuit, dnis)
+	tipos_cuit, dnis = tipos_cuit.ravel(), dnis.ravel()
+	digitos_dni = (dnis[:, None] // POTENCIAS_DNI) % 10
+	suma = _suma_ponderada(tipos_cuit, digitos_dni)
+
+	matriz = np.empty((len(dnis), ANCHO + fin_de_linea), dtype=np.uint8)
+	cero = ord('0')
+	matriz[:, 0] = tipos_cuit // 10 + cero
+	matriz[:, 1] = tipos_cuit % 10 + cero
+	matriz[:, 2] = matriz[:, 11] = ord('-')
+	matriz[:, 3:11] = digitos_dni + cero
+	matriz[:, 12] = DIGITO_POR_RESTO[suma % 11] + cero
+	if fin_de_linea:
+		matriz[:, 13] = ord('\n')
+	return matriz
+
+def generar_cuits(tipos_cuit, dnis):
+	"""
+	Arma los CUIT/CUIL completos en formato XX-XXXXXXXX-X.
+
+	Args:
+		tipos_cuit (array_like): Tipo de cada CUIT (o uno solo para todos)
+		dnis (array_like): DNI de cada CUIT
+
+	Returns:
+		np.ndarray: Arreglo de cadenas de bytes (dtype 'S13')
+
+	Raises:
+		ValueError: Si algún tipo o DNI no es válido
+	"""
+	return armar_matriz(tipos_cuit, dnis, fin_de_linea=False).view(f'S{ANCHO}').ravel()
+
+def lotes_rango(tipo, desde, hasta, tamano_lote=TAMANO_LOTE):
+	"""
+	Genera los CUIT de un tipo para todos los DNI de un rango, por lotes.
+
+	Args:
+		tipo (int): Tipo de CUIT/CUIL
+		desde (int): Primer DNI
+		hasta (int): Último DNI (incluido)
+		tamano_lote (int): Cantidad de CUIT por lote
+
+	Yields:
+		np.ndarray: Matriz de bytes de cada lote, con fin de línea (ver armar_matriz)
+	"""
+	for inicio in range(desde, hasta + 1, tamano_lote):
+		fin = min(inicio + tamano_lote, hasta + 1)
+		yield armar_matriz(tipo, np.arange(inicio, fin, dtype=np.int64))
+
+def lotes_aleatorios(cantidad, semilla=0, tipos_cuit=tipos, tamano_lote=TAMANO_LOTE):
+	"""
+	Genera CUIT válidos al azar (tipos y DNI aleatorios), por lotes.
+
+	Args:
+		cantidad (int): Cantidad total de CUIT
+		semilla (int): Semilla del generador aleatorio
+		tipos_cuit (list): Tipos entre los que se elige
+		tamano_lote (int): Cantidad de CUIT por lote
+
+	Yields:
+		np.ndarray: Matriz de bytes de cada lote, con fin de línea (ver armar_matriz)
+	"""
+	rng = np.random.default_rng(semilla)
+	for inicio in range(0, cantidad, tamano_lote):
+		n = min(tamano_lote, cantidad - inicio)
+		yield armar_matriz(rng.choice(tipos_cuit, n), rng.integers(0, DNI_MAXIMO + 1, n))
+
+def escribir_lotes(nombre_archivo, lotes):
+	"""
+	Escribe lotes de CUIT (uno por línea) en un archivo.
+
+	Args:
+		nombre_archivo (str): Archivo de salida
+		lotes (iterable): Matrices de bytes con fin de línea (lotes_rango o lotes_aleatorios)
+
+	Returns:
+		int: Cantidad de CUIT escritos
+	"""
+	cantidad = 0
+	with open(nombre_archivo, 'wb') as f:
+		for lote in lotes:
+			lote.tofile(f)
+			cantidad += len(lote)
+	return cantidad
+
+
+if __name__ == "__main__":
+	import argparse
+	import time
+
+	parser = argparse.ArgumentParser(description="Genera CUIT/CUIL válidos")
+	parser.add_argument("salida", nargs="?", help="Archivo de salida (uno por línea)")
+	parser.add_argument("--tipo", type=int, default=20, help="Tipo para --desde/--hasta")
+	parser.add_argument("--desde", type=int, default=None, help="Primer DNI del rango")
+	parser.add_argument("--hasta", type=int, default=None, help="Último DNI del rango")
+	parser.add_argument("--cantidad", type=int, default=10_000_000, help="CUIT aleatorios si no se da un rango")
+	parser.add_argument("--semilla", type=int, default=0)
+	args = parser.parse_args()
+
+	if args.salida is None:
+		# Demostración: un valor, comparación con ej_8 y velocidad en memoria
+		from ej_8 import generar_cuit, validar_cuit
+		from validacion_masiva import validar_columna
+
+		print(generar_cuit(20, 43926518), generar_cuits([20, 27, 30], [43926518, 12345678, 71234567]))
+		dnis = np.arange(10_000_000, 10_200_000)
+		bulk = generar_cuits(23, dnis)
+		print("Igual a generar_cuit:", [c.decode() for c in bulk[:50_000]] ==
+			  [generar_cuit(23, d) for d in range(10_000_000, 10_050_000)])
+		print("Todos válidos:", bool(validar_columna(bulk)[0].all()),
+			  all(validar_cuit(c.decode())[0] for c in bulk[:50_000]))
+		inicio = time.perf_counter()
+		for lote in lotes_aleatorios(10_000_000):
+			pass
+		print(f"{10_000_000 / (time.perf_counter() - inicio):,.0f} CUIT/s")
+	else:
+		if args.desde is not None:
+			lotes = lotes_rango(args.tipo, args.desde, args.hasta if args.hasta is not None else args.desde)
+		else:
+			lotes = lotes_aleatorios(args.cantidad, args.semilla)
+		inicio = time.perf_counter()
+		cantidad = escribir_lotes(args.salida, lotes)
+		segundos = time.perf_counter() - inicio
+		print(f"{cantidad:,} CUIT escritos en {segundos:.2f} s ({cantidad / segundos:,.0f} CUIT/s)")
@@ -0,0 +1,367 @@
+"""
+Servicio local de validación de CUIT/CUIL con asyncio.
+
+Los clientes se conectan por TCP o por socket Unix y envían CUIT separados
+por saltos de línea; por cada uno reciben una línea "VALIDO <tipo>" o
+"INVALIDO <tipo>" (tipo como en validar_cuit), en el mismo orden. Pueden
+enviar muchos CUIT sin esperar las respuestas (pipelining).
+
+Para validar con numpy en lugar de a un CUIT por vez, los pedidos de todas
+las conexiones se juntan en micro-lotes:
+
+	- Cada conexión lee los datos por bloques y encola las líneas completas
+	  de cada bloque como un solo pedido
+	- Una única tarea toma los pedidos de la cola hasta juntar 'tamano_lote'
+	  CUIT o hasta que pasa 'espera_maxima' desde el primero, los valida
+	  juntos con validar_lineas y reparte los resultados
+	- Cada conexión escribe las respuestas de sus pedidos en orden, con una
+	  cola acotada para no acumular respuestas si el cliente no las lee
+
+La línea "STATS" devuelve los contadores del servicio en JSON: conexiones,
+CUIT y lotes procesados, tamaño medio de lote, CUIT por segundo y latencia
+(p50/p99, en milisegundos) desde que un pedido se encola hasta que se valida.
+
+Uso:
+	python servicio_validacion.py servir --puerto 8765
+	python servicio_validacion.py servir --unix /tmp/cuit.sock
+	python servicio_validacion.py carga --puerto 8765 --conexiones 2000
+	python servicio_validacion.py            # servicio y prueba de carga en el mismo proceso
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from validacion_masiva import ANCHO_MAXIMO_LINEA, NOMBRES_TIPO, validar_columna, validar_lineas
+
+# Respuesta para cada combinación (válido, código de tipo)
+RESPUESTAS = {
+	(valido, codigo): f"{'VALIDO' if valido else 'INVALIDO'} {nombre}\n".encode()
+	for valido in (False, True) for codigo, nombre in enumerate(NOMBRES_TIPO)
+}
+
+COMANDO_ESTADISTICAS = b"STATS"
+
+# Bytes que se guardan de una línea todavía sin salto de línea
+LARGO_MAXIMO_RESTO = 4 * ANCHO_MAXIMO_LINEA
+
+
+class ServicioValidacion:
+	"""
+	Servicio de validación que agrupa los pedidos concurrentes en micro-lotes.
+	"""
+
+	def __init__(self, tamano_lote=8192, espera_maxima=0.001, pendientes_por_conexion=64,
+				 muestras_latencia=10_000):
+		"""
+		Args:
+			tamano_lote (int): Cantidad de CUIT a partir de la cual se valida el lote sin esperar más
+			espera_maxima (float): Segundos que se espera a juntar más pedidos desde el primero
+			pendientes_por_conexion (int): Pedidos sin responder admitidos por conexión
+			muestras_latencia (int): Cantidad de latencias recientes usadas para los percentiles
+		"""
+		self.tamano_lote = tamano_lote
+		self.espera_maxima = espera_maxima
+		self.pendientes_por_conexion = pendientes_por_conexion
+		self._cola = None
+		self._tarea_lotes = None
+		self._latencias = deque(maxlen=muestras_latencia)
+		self._inicio = time.perf_counter()
+		self.conexiones_activas = 0
+		self.conexiones_totales = 0
+		self.cuits = 0
+		self.lotes = 0
+
+	def iniciar(self):
+		"""Crea la cola y la tarea que arma los lotes (dentro del bucle de eventos)."""
+		if self._tarea_lotes is None:
+			self._cola = asyncio.Queue()
+			self._tarea_lotes = asyncio.create_task(self._procesar_lotes())
+
+	async def detener(self):
+		"""Detiene la tarea de lotes."""
+		if self._tarea_lotes is not None:
+			self._tarea_lotes.cancel()
+			try:
+				await self._tarea_lotes
+			except asyncio.CancelledError:
+				pass
+			self._tarea_lotes = None
+
+	async def validar(self, lineas):
+		"""
+		Valida un grupo de líneas en el próximo micro-lote.
+
+		Args:
+			lineas (list): CUIT como bytes
+
+		Returns:
+			bytes: Respuestas concatenadas, una línea por CUIT
+		"""
+		futuro = asyncio.get_running_loop().create_future()
+		await self._cola.put((lineas, futuro, time.perf_counter()))
+		return await futuro
+
+	async def _procesar_lotes(self):
+		"""Junta pedidos de la cola, los valida juntos y reparte las respuestas."""
+		loop = asyncio.get_running_loop()
+		while True:
+			pedidos = [await self._cola.get()]
+			cantidad = len(pedidos[0][0])
+			limite = loop.time() + self.espera_maxima
+			while cantidad < self.tamano_lote:
+				try:
+					pedido = self._cola.get_nowait()
+				except asyncio.QueueEmpty:
+					restante = limite - loop.time()
+					if restante <= 0:
+						break
+					try:
+						pedido = await asyncio.wait_for(self._cola.get(), restante)
+					except asyncio.TimeoutError:
+						break
+				pedidos.append(pedido)
+				cantidad += len(pedido[0])
+
+			lineas = [linea for pedido in pedidos for linea in pedido[0]]
+			validos, tipos = validar_lineas(lineas)
+			respuestas = [RESPUESTAS[clave] for clave in zip(validos.tolist(), tipos.tolist())]
+
+			ahora = time.perf_counter()
+			inicio = 0
+			for grupo, futuro, encolado in pedidos:
+				fin = inicio + len(grupo)
+				if not futuro.done():
+					futuro.set_result(b''.join(respuestas[inicio:fin]))
+				self._latencias.append(ahora - encolado)
+				inicio = fin
+			self.cuits += len(lineas)
+			self.lotes += 1
+
+	def estadisticas(self):
+		"""
+		Contadores del servicio.
+
+		Returns:
+			dict: Conexiones, CUIT y lotes procesados, tamaño medio de lote,
+				  CUIT por segundo desde el inicio y latencia p50/p99 en ms
+		"""
+		latencias = np.array(self._latencias) * 1000
+		return {
+			'conexiones_activas': self.conexiones_activas,
+			'conexiones_totales': self.conexiones_totales,
+			'cuits': self.cuits,
+			'lotes': self.lotes,
+			'tamano_medio_lote': self.cuits / self.lotes if self.lotes else 0.0,
+			'cuits_por_segundo': self.cuits / (time.perf_counter() - self._inicio),
+			'latencia_p50_ms': float(np.percentile(latencias, 50)) if len(latencias) else None,
+			'latencia_p99_ms': float(np.percentile(latencias, 99)) if len(latencias) else None,
+		}
+
+	async def atender(self, reader, writer):
+		"""
+		Atiende una conexión: lee bloques de líneas y responde en orden.
+
+		La lectura y la escritura corren en tareas separadas. Si la escritura
+		termina antes (el cliente cerró o reseteó la conexión) se cancela la
+		lectura, que puede estar esperando lugar en la cola de pendientes, y
+		se cancelan los pedidos sin responder.
+
+		Args:
+			reader (asyncio.StreamReader): Flujo de entrada del cliente
+			writer (asyncio.StreamWriter): Flujo de salida al cliente
+		"""
+		self.conexiones_activas += 1
+		self.conexiones_totales += 1
+		# Respuestas pendientes en el orden de los pedidos (None marca el final)
+		pendientes = asyncio.Queue(self.pendientes_por_conexion)
+		lector = asyncio.create_task(self._leer(reader, pendientes))
+		escritor = asyncio.create_task(self._responder(pendientes, writer))
+		try:
+			await asyncio.wait((lector, escritor), return_when=asyncio.FIRST_COMPLETED)
+			if not escritor.done():
+				# La lectura terminó y encoló None: el escritor responde lo que falta
+				await escritor
+		finally:
+			for tarea in (lector, escritor):
+				tarea.cancel()
+			await asyncio.gather(lector, escritor, return_exceptions=True)
+			while not pendientes.empty():
+				respuesta = pendientes.get_nowait()
+				if isinstance(respuesta, asyncio.Future):
+					respuesta.cancel()
+			self.conexiones_activas -= 1
+
+	async def _leer(self, reader, pendientes):
+		"""Lee bloques de la conexión y encola los pedidos; al final encola None."""
+		try:
+			resto = b''
+			while True:
+				bloque = await reader.read(65536)
+				if not bloque:
+					break
+				datos = resto + bloque
+				lineas = datos.split(b'\n')
+				# Una línea sin salto de línea más larga que LARGO_MAXIMO_RESTO se
+				# recorta (ya no puede ser un CUIT válido) para acotar la memoria
+				resto = lineas.pop()[:LARGO_MAXIMO_RESTO]
+				await self._encolar(lineas, pendientes, COMANDO_ESTADISTICAS in datos)
+			if resto:
+				await self._encolar([resto], pendientes, COMANDO_ESTADISTICAS in resto)
+		except ConnectionError:
+			pass
+		await pendientes.put(None)
+
+	async def _encolar(self, lineas, pendientes, hay_comandos):
+		"""Separa los comandos de los CUIT (si los hay) y encola los pedidos en orden."""
+		inicio = 0
+		for i, linea in enumerate(lineas if hay_comandos else ()):
+			if linea.strip() == COMANDO_ESTADISTICAS:
+				if i > inicio:
+					await pendientes.put(asyncio.ensure_future(self.validar(lineas[inicio:i])))
+				await pendientes.put((json.dumps(self.estadisticas()) + "\n").encode())
+				inicio = i + 1
+		if len(lineas) > inicio:
+			await pendientes.put(asyncio.ensure_future(self.validar(lineas[inicio:])))
+
+	async def _responder(self, pendientes, writer):
+		"""Escribe las respuestas en el orden en que se encolaron."""
+		try:
+			while True:
+				respuesta = await pendientes.get()
+				if respuesta is None:
+					break
+				if not isinstance(respuesta, bytes):
+					respuesta = await respuesta
+				writer.write(respuesta)
+				await writer.drain()
+		except ConnectionError:
+			pass
+		finally:
+			writer.close()
+
+	async def servir(self, host="127.0.0.1", puerto=8765, unix=None):
+		"""
+		Inicia el servidor TCP (o Unix si se indica una ruta).
+
+		Returns:
+			asyncio.Server: Servidor ya escuchando
+		"""
+		self.iniciar()
+		if unix is not None:
+			return await asyncio.start_unix_server(self.atender, path=unix, backlog=4096)
+		return await asyncio.start_server(self.atender, host, puerto, backlog=4096)
+
+
+async def prueba_carga(host="127.0.0.1", puerto=8765, unix=None, conexiones=1000, cuits_por_conexion=200,
+					   semilla=0):
+	"""
+	Abre muchas conexiones concurrentes y envía CUIT por todas a la vez.
+
+	Cada conexión envía todos sus CUIT juntos (pipelining), lee las respuestas
+	y verifica que sean tantas como los pedidos y que coincidan con
+	validar_columna.
+
+	Args:
+		host (str): Servidor TCP
+		puerto (int): Puerto TCP
+		unix (str): Ruta del socket Unix (si se indica, se usa en lugar de TCP)
+		conexiones (int): Cantidad de conexiones simultáneas
+		cuits_por_conexion (int): CUIT enviados por cada conexión
+		semilla (int): Semilla de los CUIT aleatorios
+
+	Returns:
+		dict: CUIT enviados, errores, segundos, CUIT por segundo y latencia
+			  por conexión (p50/p99, en ms)
+	"""
+	from generacion_masiva import generar_cuits
+
+	rng = np.random.default_rng(semilla)
+	cantidad = conexiones * cuits_por_conexion
+	cuits = generar_cuits(rng.choice([20, 27, 30], cantidad), rng.integers(0, 100_000_000, cantidad))
+	# Se altera el último dígito de una parte para tener también CUIT inválidos
+	cuits = np.char.add(np.char.rstrip(cuits.astype('S12')), rng.choice(list(b'0123456789'), cantidad)
+						.astype(np.uint8).view('S1'))
+	validos, tipos = validar_columna(cuits)
+	esperado = [RESPUESTAS[clave] for clave in zip(validos.tolist(), tipos.tolist())]
+
+	latencias, errores = [], 0
+
+	async def cliente(k):
+		nonlocal errores
+		desde, hasta = k * cuits_por_conexion, (k + 1) * cuits_por_conexion
+		if unix is not None:
+			reader, writer = await asyncio.open_unix_connection(unix)
+		else:
+			reader, writer = await asyncio.open_connection(host, puerto)
+		inicio = time.perf_counter()
+		writer.write(b'\n'.join(cuits[desde:hasta].tolist()) + b'\n')
+		await writer.drain()
+		writer.write_eof()
+		respuesta = await reader.read()
+		latencias.append(time.perf_counter() - inicio)
+		if respuesta != b''.join(esperado[desde:hasta]):
+			errores += 1
+		writer.close()
+		await writer.wait_closed()
+
+	inicio = time.perf_counter()
+	await asyncio.gather(*(cliente(k) for k in range(conexiones)))
+	segundos = time.perf_counter() - inicio
+	latencias = np.array(latencias) * 1000
+	return {
+		'conexiones': conexiones,
+		'cuits': cantidad,
+		'conexiones_con_error': errores,
+		'segundos': segundos,
+		'cuits_por_segundo': cantidad / segundos,
+		'latencia_conexion_p50_ms': float(np.percentile(latencias, 50)),
+		'latencia_conexion_p99_ms': float(np.percentile(latencias, 99)),
+	}
+
+
+async def _demostracion(conexiones, cuits_por_conexion):
+	servicio = ServicioValidacion()
+	servidor = await servicio.servir(puerto=0)
+	puerto = servidor.sockets[0].getsockname()[1]
+	resultado = await prueba_carga(puerto=puerto, conexiones=conexiones, cuits_por_conexion=cuits_por_conexion)
+	for clave, valor in resultado.items():
+		print(f"{clave:26s} {valor:,.2f}" if isinstance(valor, float) else f"{clave:26s} {valor:,}")
+	print("\nServicio:", json.dumps(servicio.estadisticas(), indent=2))
+	servidor.close()
+	await servidor.wait_closed()
+	await servicio.detener()
+
+async def _servir(args):
+	servicio = ServicioValidacion(args.lote, args.espera)
+	servidor = await servicio.servir(args.host, args.puerto, args.unix)
+	print(f"Escuchando en {args.unix or f'{args.host}:{args.puerto}'}")
+	async with servidor:
+		await servidor.serve_forever()
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Servicio de validación de CUIT/CUIL")
+	parser.add_argument("modo", nargs="?", choices=["servir", "carga"], default=None)
+	parser.add_argument("--host", default="127.0.0.1")
+	parser.add_argument("--puerto", type=int, default=8765)
+	parser.add_argument("--unix", default=None, help="Ruta de socket Unix (en lugar de TCP)")
+	parser.add_argument("--lote", type=int, default=8192, help="CUIT por micro-lote")
+	parser.add_argument("--espera", type=float, default=0.001, help="Espera máxima para juntar un lote (s)")
+	parser.add_argument("--conexiones", type=int, default=2000)
+	parser.add_argument("--cuits", type=int, default=200, help="CUIT por conexión en la prueba de carga")
+	args = parser.parse_args()
+
+	if args.modo == "servir":
+		try:
+			asyncio.run(_servir(args))
+		except KeyboardInterrupt:
+			pass
+	elif args.modo == "carga":
+		resultado = asyncio.run(prueba_carga(args.host, args.puerto, args.unix, args.conexiones, args.cuits))
+		print(json.dumps(resultado, indent=2))
+	else:
+		asyncio.run(_demostracion(args.conexiones, args.cuits))
@@ -0,0 +1,236 @@
+"""
+Validación masiva de CUIT/CUIL con numpy.
+
+validar_cuit procesa una cadena por vez. Para validar decenas de millones de
+CUIT de un archivo, las cadenas se cargan en un arreglo de bytes de ancho fijo
+(una fila de 13 bytes por CUIT) y todas las verificaciones se hacen con
+operaciones vectorizadas sobre las columnas:
+
+	- Formato: guiones en las posiciones 2 y 11 y dígitos en las demás
+	- Tipo: los dos primeros dígitos se buscan en una tabla de 100 entradas
+	  (CUIL, CUIT o inválido)
+	- Dígito verificador: producto de la matriz de dígitos por la base y una
+	  tabla con el dígito que corresponde a cada resto módulo 11
+
+El resultado es el mismo que el de validar_cuit para cada cadena, con una
+diferencia: si entre los guiones hay caracteres que no son dígitos el CUIT se
+informa como inválido (validar_cuit en ese caso desplaza los dígitos o falla).
+"""
+import numpy as np
+
+from ej_8 import base, tipos_cuil, tipos_cuit
+
+ANCHO = 13
+
+# Código de tipo devuelto para cada CUIT; NOMBRES_TIPO[codigo] da el mismo
+# texto que validar_cuit
+TIPO_INVALIDO, TIPO_CUIL, TIPO_CUIT = 0, 1, 2
+NOMBRES_TIPO = np.array(["CUIT/CUIL", "CUIL", "CUIT"])
+
+# Tipo de cada prefijo de dos dígitos
+TABLA_TIPOS = np.zeros(100, dtype=np.uint8)
+TABLA_TIPOS[tipos_cuil] = TIPO_CUIL
+TABLA_TIPOS[tipos_cuit] = TIPO_CUIT
+
+# Dígito verificador según el resto de la suma ponderada módulo 11, con los
+# mismos casos especiales que validar_cuit (11 - 0 = 11 -> 0, 11 - 1 = 10 -> 9)
+DIGITO_POR_RESTO = np.array([0, 9, 9, 8, 7, 6, 5, 4, 3, 2, 1], dtype=np.uint8)
+
+BASE = np.array(base, dtype=np.int32)
+
+# Posiciones de los 11 dígitos dentro de XX-XXXXXXXX-X
+POSICIONES_DIGITOS = [0, 1, 3, 4, 5, 6, 7, 8, 9, 10, 12]
+
+# Las líneas más largas se recortan en Python antes de armar el arreglo, para
+# que una línea anómala no agrande el ancho de todo el bloque
+ANCHO_MAXIMO_LINEA = 64
+
+
+def validar_matriz(matriz):
+	"""
+	Valida una matriz de CUIT ya alineados a 13 bytes por fila.
+
+	Args:
+		matriz (np.ndarray): Arreglo uint8 de forma (n, 13)
+
+	Returns:
+		tuple: (validos, tipos) - arreglo bool y arreglo uint8 con TIPO_INVALIDO,
+			   TIPO_CUIL o TIPO_CUIT para cada fila
+	"""
+	# Los caracteres que no son dígitos dan valores > 9 al restar '0' (módulo 256)
+	digitos = matriz[:, POSICIONES_DIGITOS] - np.uint8(ord('0'))
+	formato = ((matriz[:, 2] == ord('-')) & (matriz[:, 11] == ord('-'))
+			   & (digitos <= 9).all(axis=1))
+
+	prefijo = np.where(formato, digitos[:, 0].astype(np.int16) * 10 + digitos[:, 1], 0)
+	tipos = np.where(formato, TABLA_TIPOS[prefijo], TIPO_INVALIDO).astype(np.uint8)
+
+	suma = digitos[:, :10].astype(np.int32) @ BASE
+	verificador = DIGITO_POR_RESTO[suma % 11]
+	validos = (tipos != TIPO_INVALIDO) & (verificador == digitos[:, 10])
+	return validos, tipos
+
+def validar_bytes(cuits):
+	"""
+	Valida un arreglo de CUIT como cadenas de bytes (dtype 'S').
+
+	Se quitan los espacios de los extremos, como hace validar_cuit; las
+	cadenas que no quedan con 13 caracteres son inválidas.
+
+	Args:
+		cuits (np.ndarray): Arreglo de cadenas de bytes
+
+	Returns:
+		tuple: (validos, tipos), como en validar_matriz
+	"""
+	cuits = np.char.strip(cuits)
+	largo_correcto = np.char.str_len(cuits) == ANCHO
+	matriz = np.ascontiguousarray(cuits.astype(f'S{ANCHO}')).view(np.uint8).reshape(-1, ANCHO)
+	validos, tipos = validar_matriz(matriz)
+	tipos[~largo_correcto] = TIPO_INVALIDO
+	return validos & largo_correcto, tipos
+
+def validar_columna(cuits):
+	"""
+	Valida una columna de CUIT en formato XX-XXXXXXXX-X.
+
+	Args:
+		cuits (iterable): Lista o arreglo de cadenas (str o bytes)
+
+	Returns:
+		tuple: (validos, tipos), como en validar_matriz
+	"""
+	cuits = np.asarray(cuits)
+	if len(cuits) == 0:
+		return np.zeros(0, dtype=bool), np.zeros(0, dtype=np.uint8)
+	if cuits.dtype.kind == 'U':
+		try:
+			cuits = cuits.astype(f'S{cuits.dtype.itemsize // 4}')
+		except UnicodeEncodeError:
+			# Los caracteres no ASCII se reemplazan por '?', que nunca es válido
+			cuits = np.char.encode(cuits, 'ascii', 'replace')
+	return validar_bytes(cuits)
+
+def validar_lineas(lineas):
+	"""
+	Valida una lista de líneas (bytes). Las líneas demasiado largas se
+	recortan antes, para que no agranden el ancho de todo el arreglo.
+
+	Args:
+		lineas (list): Líneas como bytes (se modifican las demasiado largas)
+
+	Returns:
+		tuple: (validos, tipos), como en validar_matriz
+	"""
+	largos = np.fromiter(map(len, lineas), dtype=np.int64, count=len(lineas))
+	for i in np.flatnonzero(largos > ANCHO_MAXIMO_LINEA):
+		linea = lineas[i].strip()
+		lineas[i] = linea if len(linea) == ANCHO else b''
+	return validar_bytes(np.array(lineas, dtype=f'S{min(int(largos.max()), ANCHO_MAXIMO_LINEA)}'))
+
+def validar_archivo(nombre_archivo, tamano_bloque=1 << 22):
+	"""
+	Valida un archivo con un CUIT por línea, por bloques.
+
+	El archivo se lee en bloques de 'tamano_bloque' bytes; la línea incompleta
+	del final de cada bloque se completa con el siguiente, así que la memoria
+	no depende del tamaño del archivo. Las líneas vacías cuentan como CUIT
+	inválidos, para que la posición en los resultados sea el número de línea.
+
+	Args:
+		nombre_archivo (str): Archivo de texto
+		tamano_bloque (int): Cantidad de bytes leídos por bloque
+
+	Yields:
+		tuple: (validos, tipos) de las líneas de cada bloque, en orden
+	"""
+	with open(nombre_archivo, 'rb') as f:
+		resto = b''
+		while True:
+			bloque = f.read(tamano_bloque)
+			if not bloque:
+				break
+			lineas = (resto + bloque).split(b'\n')
+			# El último elemento es una línea incompleta (o vacío)
+			resto = lineas.pop()
+			if lineas:
+				yield validar_lineas(lineas)
+		if resto:
+			yield validar_lineas([resto])
+
+def resumir_archivo(nombre_archivo, tamano_bloque=1 << 22):
+	"""
+	Cuenta los CUIT válidos e inválidos de un archivo.
+
+	Args:
+		nombre_archivo (str): Archivo con un CUIT por línea
+		tamano_bloque (int): Cantidad de bytes leídos por bloque
+
+	Returns:
+		dict: Cantidades 'total', 'validos', 'CUIL', 'CUIT' (válidos de cada
+			  tipo) e 'invalidos'
+	"""
+	total = validos_total = 0
+	por_tipo = np.zeros(len(NOMBRES_TIPO), dtype=np.int64)
+	for validos, tipos in validar_archivo(nombre_archivo, tamano_bloque):
+		total += len(validos)
+		validos_total += int(validos.sum())
+		por_tipo += np.bincount(tipos[validos], minlength=len(NOMBRES_TIPO))
+	return {
+		'total': total,
+		'validos': validos_total,
+		'CUIL': int(por_tipo[TIPO_CUIL]),
+		'CUIT': int(por_tipo[TIPO_CUIT]),
+		'invalidos': total - validos_total,
+	}
+
+
+if __name__ == "__main__":
+	import os
+	import sys
+	import tempfile
+	import time
+
+	from ej_8 import validar_cuit
+
+	if len(sys.argv) > 1:
+		# Uso: python validacion_masiva.py archivo.txt
+		inicio = time.perf_counter()
+		resumen = resumir_archivo(sys.argv[1])
+		segundos = time.perf_counter() - inicio
+		for clave, valor in resumen.items():
+			print(f"{clave:10s} {valor:,}")
+		print(f"{resumen['total'] / segundos:,.0f} CUIT/s")
+		sys.exit(0)
+
+	# Demostración: CUIT aleatorios (válidos e inválidos) comparados con validar_cuit
+	rng = np.random.default_rng(0)
+	cantidad = 2_000_000
+	prefijos = rng.choice([19, 20, 23, 24, 27, 30, 33, 34], cantidad)
+	dnis = rng.integers(0, 100_000_000, cantidad)
+	verificadores = rng.integers(0, 10, cantidad)
+	cuits = [f"{p:02d}-{d:08d}-{v}" for p, d, v in zip(prefijos.tolist(), dnis.tolist(), verificadores.tolist())]
+	cuits[:4] = ["20-43926518-4", " 20-43926518-4 ", "20-4392651-84", "20-12345678-9"]
+
+	inicio = time.perf_counter()
+	validos, tipos = validar_columna(cuits)
+	vectorizado = time.perf_counter() - inicio
+
+	muestra = 200_000
+	inicio = time.perf_counter()
+	esperado = [validar_cuit(c) for c in cuits[:muestra]]
+	escalar = (time.perf_counter() - inicio) * cantidad / muestra
+
+	coincide = all(v == e[0] and n == e[1] for v, n, e in
+				   zip(validos[:muestra].tolist(), NOMBRES_TIPO[tipos[:muestra]].tolist(), esperado))
+	print(f"validar_cuit:     {cantidad / escalar:14,.0f} CUIT/s")
+	print(f"validar_columna:  {cantidad / vectorizado:14,.0f} CUIT/s ({escalar / vectorizado:.0f}x)")
+	print(f"Mismos resultados que validar_cuit: {coincide}")
+
+	with tempfile.TemporaryDirectory() as tmp:
+		ruta = os.path.join(tmp, "cuits.txt")
+		with open(ruta, 'w') as f:
+			f.write('\n'.join(cuits) + '\n')
+		inicio = time.perf_counter()
+		resumen = resumir_archivo(ruta)
+		print(f"Archivo: {resumen} en {time.perf_counter() - inicio:.2f} s")
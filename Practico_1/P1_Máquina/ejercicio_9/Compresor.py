@@ -1,4 +1,5 @@
-# Tabla de caracteres que se pueden comprimir, cada uno representado por 3 bits
+import numpy as np
+
 # Tabla de caracteres que se pueden comprimir, cada uno representado por 3 bits (2^3 = 8 caracteres)
 __table = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H'] # 3 bits por caracter
 
@@ -12,59 +13,533 @@ def __bytes_to_binary_string(string):
 	# Convierte cada byte a su representación binaria de 8 bits y los concatena
 	return ''.join(format(i, '08b') for i in string)
 
+def __lookup_tables(symbols):
+	"""
+	Arma las tablas de búsqueda de un alfabeto:
+	- codificación: byte del caracter -> índice (255 si no está en el alfabeto)
+	- decodificación: índice -> byte del caracter
+	
+	:param symbols: Cadena con los caracteres del alfabeto.
+	:return: Tupla (tabla de codificación, tabla de decodificación).
+	"""
+	decode_table = np.frombuffer(symbols.encode('ascii'), dtype=np.uint8)
+	encode_table = np.full(256, 255, dtype=np.uint8)
+	encode_table[decode_table] = np.arange(len(symbols))
+	return encode_table, decode_table
+
+__encode_table, __decode_table = __lookup_tables(''.join(__table))
+
+# Cada grupo de 8 valores de 'width' bits ocupa exactamente 'width' bytes. Para
+# los anchos que dividen a 8 alcanza con agrupar valores dentro de cada byte;
+# para los demás, cada grupo de 8 valores se arma en un entero de 32 o 64 bits.
+# __shifts[width]: desplazamiento de cada valor dentro de su byte o grupo
+__shifts = {width: np.arange(8 - width, -1, -width, dtype=np.uint8) if 8 % width == 0
+			else np.arange(7 * width, -1, -width, dtype=np.uint32 if width <= 4 else np.uint64)
+			for width in range(1, 9)}
+
+def __pack(values, width=3):
+	"""
+	Empaqueta valores de 'width' bits, del bit más significativo al menos significativo.
+	El último grupo se completa con ceros y se recorta a los bytes necesarios.
+	
+	:param values: Arreglo numpy de valores de 0 a 2**width - 1.
+	:param width: Bits por valor (de 1 a 8).
+	:return: Arreglo numpy de bytes (uint8).
+	"""
+	n = len(values)
+	shifts = __shifts[width]
+	if 8 % width == 0:
+		# Cada fila de 8 // width valores forma un byte
+		per_byte = 8 // width
+		groups = np.zeros(-(-n // per_byte) * per_byte, dtype=np.uint8)
+		groups[:n] = values
+		return np.bitwise_or.reduce(groups.reshape(-1, per_byte) << shifts, axis=1)
+	
+	groups = np.zeros(-(-n // 8) * 8, dtype=shifts.dtype)
+	groups[:n] = values
+	# Cada fila de 8 valores forma un entero de 8 * width bits
+	words = np.bitwise_or.reduce(groups.reshape(-1, 8) << shifts, axis=1)
+	# Los 'width' bytes menos significativos de cada entero, en orden big-endian
+	size = shifts.dtype.itemsize
+	packed = words.astype(f'>u{size}').view(np.uint8).reshape(-1, size)[:, size - width:].ravel()
+	return packed[:-(-width * n // 8)]
+
+def __unpack(data, width=3):
+	"""
+	Operación inversa de __pack: separa los bytes en valores de 'width' bits.
+	
+	:param data: Arreglo numpy de bytes (uint8).
+	:param width: Bits por valor (de 1 a 8).
+	:return: Arreglo numpy con todos los valores contenidos en los bytes.
+	"""
+	shifts = __shifts[width]
+	mask = (1 << width) - 1
+	if 8 % width == 0:
+		return ((data[:, None] >> shifts) & mask).ravel()
+	
+	groups = np.zeros(-(-len(data) // width) * width, dtype=np.uint8)
+	groups[:len(data)] = data
+	# Cada grupo de 'width' bytes se ubica en los bytes bajos de un entero big-endian
+	size = shifts.dtype.itemsize
+	padded = np.zeros((len(groups) // width, size), dtype=np.uint8)
+	padded[:, size - width:] = groups.reshape(-1, width)
+	words = padded.view(f'>u{size}').ravel().astype(shifts.dtype)
+	return ((words[:, None] >> shifts) & mask).astype(np.uint8).ravel()
+
+def __encode(data, encode_table=__encode_table):
+	"""
+	Convierte bytes de texto en sus índices con la tabla de búsqueda.
+	
+	:param data: Arreglo numpy de bytes (uint8).
+	:param encode_table: Tabla de codificación del alfabeto (por defecto, la de __table).
+	:return: Arreglo numpy de índices (uint8).
+	:raises ValueError: Si algún byte no corresponde a un caracter de la tabla.
+	"""
+	values = encode_table[data]
+	invalid = np.flatnonzero(values == 255)
+	if len(invalid):
+		raise ValueError(f'Caracter fuera de la tabla: {chr(data[invalid[0]])!r}')
+	return values
+
+def __compress_array(data):
+	"""
+	Comprime bytes de texto con el encabezado de relleno (ver compress).
+	
+	:param data: Arreglo numpy de bytes (uint8).
+	:return: Arreglo numpy de bytes comprimidos (uint8).
+	"""
+	values = np.empty(len(data) + 1, dtype=np.uint8)
+	values[1:] = __encode(data)
+	# Bits de relleno para completar el último byte (0 si ya está completo)
+	values[0] = (8 - (3 * len(data) + 3) % 8) % 8
+	return __pack(values)
+
+def __decompress_array(data):
+	"""
+	Descomprime bytes con el encabezado de relleno (ver decompress).
+	
+	:param data: Arreglo numpy de bytes comprimidos (uint8).
+	:return: Arreglo numpy de bytes de texto (uint8).
+	:raises ValueError: Si el buffer está vacío.
+	"""
+	if not len(data):
+		raise ValueError('Buffer comprimido vacío')
+	values = __unpack(data)
+	
+	# El primer valor indica la cantidad de bits de relleno; el resto son
+	# los caracteres, excluyendo los valores que caen en el relleno
+	remainder = int(values[0])
+	count = max(0, -(-(len(data) * 8 - 3 - remainder) // 3))
+	return __decode_table[values[1:1 + count]]
+
 def compress(str):
 	"""
 	Comprime una cadena utilizando una tabla de caracteres predefinida.
 	Cada caracter se codifica con 3 bits en lugar de 8 bits (ASCII).
 	
+	Formato: 3 bits con la cantidad de bits de relleno, 3 bits por caracter
+	(su índice en la tabla) y el relleno con ceros hasta completar el último byte.
+	Como el encabezado también ocupa 3 bits, se empaqueta como un valor más
+	delante de los caracteres.
+	
 	:param str: Cadena a comprimir (solo debe contener caracteres de la tabla).
 	:return: Buffer binario comprimido en forma de bytearray.
+	:raises ValueError: Si la cadena contiene caracteres fuera de la tabla.
 	"""
-	s = ''
-	# Convierte cada carácter de la cadena en su representación binaria de 3 bits
-	# utilizando el índice del caracter en la tabla
-	for c in str:
-		s += format(__table.index(c), '03b')
+	try:
+		data = np.frombuffer(str.encode('latin-1'), dtype=np.uint8)
+	except UnicodeEncodeError:
+		raise ValueError(f'{str!r} contiene caracteres fuera de la tabla') from None
+	return bytearray(__compress_array(data).tobytes())
 	
-	# Calcula cuántos bits de padding necesitamos para completar el último byte
-	# Se añaden 3 bits al inicio para almacenar el número de bits de padding
-	remainder = 8 - (len(s) + 3) % 8
+def decompress(bytes):
+	"""
+	Descomprime un buffer binario en una cadena utilizando una tabla de caracteres predefinida.
 	
-	# Añade el número de bits de relleno al inicio (3 bits para indicar el padding)
-	s = format(remainder, '03b') + s
+	:param bytes: Buffer binario comprimido en forma de bytearray.
+	:return: Cadena descomprimida.
+	:raises ValueError: Si el buffer está vacío.
+	"""
+	return __decompress_array(np.frombuffer(bytes, dtype=np.uint8)).tobytes().decode('ascii')
+
+# Cantidad de caracteres por bloque en compress_stream (múltiplo de 8, así cada
+# bloque completo ocupa exactamente 3 bytes por cada 8 caracteres)
+STREAM_BLOCK = 1 << 20
+
+def __read_exact(src, size):
+	"""
+	Lee hasta 'size' bytes, repitiendo la lectura si el archivo devuelve menos
+	(por ejemplo sockets o tuberías). Devuelve menos bytes solo al final del archivo.
+	"""
+	data = src.read(size)
+	while data and len(data) < size:
+		more = src.read(size - len(data))
+		if not more:
+			break
+		data += more
+	return data
+
+def compress_stream(src, dst, block_size=STREAM_BLOCK):
+	"""
+	Comprime un archivo por bloques, sin cargarlo completo en memoria.
 	
-	# Añade los bits de relleno (ceros) al final para completar bytes completos
-	s += '0' * remainder
+	Formato: los bloques completos de 'block_size' caracteres se empaquetan sin
+	encabezado (3 bytes por cada 8 caracteres) y los caracteres restantes al
+	final del archivo (menos de un bloque, posiblemente ninguno) se escriben
+	con compress, que incluye el encabezado de relleno. Un archivo más corto
+	que un bloque produce la misma salida que compress.
 	
-	# Convierte la cadena binaria en un bytearray, procesando grupos de 8 bits
-	bytes = bytearray([int(s[i : i + 8], 2) for i in range(0, len(s), 8)])
+	:param src: Archivo de entrada abierto en modo binario.
+	:param dst: Archivo de salida abierto en modo binario.
+	:param block_size: Caracteres por bloque (múltiplo de 8); decompress_stream debe usar el mismo.
+	:return: Cantidad de caracteres comprimidos.
+	:raises ValueError: Si block_size no es múltiplo de 8 o hay caracteres fuera de la tabla.
+	"""
+	if block_size <= 0 or block_size % 8:
+		raise ValueError('block_size debe ser un múltiplo positivo de 8')
+	count = 0
+	block = __read_exact(src, block_size)
+	while True:
+		# Se lee el bloque siguiente antes de escribir el actual para saber
+		# si este es el último, que lleva el encabezado de relleno
+		following = __read_exact(src, block_size) if len(block) == block_size else b''
+		data = np.frombuffer(block, dtype=np.uint8)
+		count += len(data)
+		if following:
+			dst.write(__pack(__encode(data)).tobytes())
+			block = following
+		else:
+			if len(block) == block_size:
+				dst.write(__pack(__encode(data)).tobytes())
+				data = data[:0]
+			dst.write(__compress_array(data).tobytes())
+			return count
+
+def decompress_stream(src, dst, block_size=STREAM_BLOCK):
+	"""
+	Descomprime un archivo generado por compress_stream, por bloques.
 	
-	# print(f'Compressed: {str} => {s} => {bytes}')
-	return bytes
+	:param src: Archivo comprimido abierto en modo binario.
+	:param dst: Archivo de salida abierto en modo binario.
+	:param block_size: Caracteres por bloque, el mismo usado en compress_stream.
+	:return: Cantidad de caracteres descomprimidos.
+	:raises ValueError: Si block_size no es múltiplo de 8 o el archivo está vacío.
+	"""
+	if block_size <= 0 or block_size % 8:
+		raise ValueError('block_size debe ser un múltiplo positivo de 8')
+	packed_size = block_size * 3 // 8
+	count = 0
+	block = __read_exact(src, packed_size)
+	while True:
+		# El último trozo del archivo (de hasta packed_size bytes) es el que lleva
+		# el encabezado de relleno; los anteriores son bloques completos
+		following = __read_exact(src, packed_size) if len(block) == packed_size else b''
+		data = np.frombuffer(block, dtype=np.uint8)
+		if following:
+			text = __decode_table[__unpack(data)]
+			block = following
+		else:
+			text = __decompress_array(data)
+		dst.write(text.tobytes())
+		count += len(text)
+		if not following:
+			return count
+
+# Alfabetos que se pueden indicar en compress_alphabet; el índice de cada
+# uno es el identificador que se guarda en el encabezado
+ALPHABETS = [
+	('ABCDEFGH', 'ABCDEFGH'),                          # 3 bits (la tabla de compress)
+	('DNA', 'ACGT'),                                   # 2 bits
+	('HEX', '0123456789ABCDEF'),                       # 4 bits
+	('BASE32', 'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'),    # 5 bits (RFC 4648)
+]
+
+# Por alfabeto: (nombre, bits por caracter, tabla de codificación, tabla de decodificación)
+__alphabets = [(name, (len(symbols) - 1).bit_length(), *__lookup_tables(symbols))
+			   for name, symbols in ALPHABETS]
+
+def choose_alphabet(str):
+	"""
+	Elige el alfabeto con menos bits por caracter que contiene todos los
+	caracteres de la cadena (ante un empate, el primero de ALPHABETS).
 	
-def decompress(bytes):
+	:param str: Cadena a comprimir.
+	:return: Nombre del alfabeto.
+	:raises ValueError: Si ningún alfabeto contiene todos los caracteres.
 	"""
-	Descomprime un buffer binario en una cadena utilizando una tabla de caracteres predefinida.
+	try:
+		data = np.frombuffer(str.encode('latin-1'), dtype=np.uint8)
+	except UnicodeEncodeError:
+		raise ValueError(f'{str!r} contiene caracteres fuera de los alfabetos') from None
+	return __alphabets[__choose_alphabet(data)][0]
+
+def __choose_alphabet(data):
+	"""
+	Igual que choose_alphabet, para un arreglo de bytes.
+	
+	:param data: Arreglo numpy de bytes (uint8).
+	:return: Identificador del alfabeto (índice en ALPHABETS).
+	:raises ValueError: Si ningún alfabeto contiene todos los caracteres.
+	"""
+	# Bytes que aparecen en la cadena; un alfabeto sirve si los contiene a todos
+	present = np.flatnonzero(np.bincount(data, minlength=256))
+	candidates = [(width, index) for index, (_, width, encode_table, _) in enumerate(__alphabets)
+				  if (encode_table[present] != 255).all()]
+	if not candidates:
+		raise ValueError(f'Caracteres fuera de los alfabetos: {bytes(present).decode("latin-1")!r}')
+	return min(candidates)[1]
+
+def __alphabet_id(alphabet):
+	"""
+	Busca el identificador de un alfabeto por su nombre.
+	
+	:param alphabet: Nombre del alfabeto.
+	:return: Identificador del alfabeto (índice en ALPHABETS).
+	:raises ValueError: Si el alfabeto no existe.
+	"""
+	ids = [name for name, *_ in __alphabets]
+	if alphabet not in ids:
+		raise ValueError(f'Alfabeto desconocido: {alphabet!r}')
+	return ids.index(alphabet)
+
+def compress_alphabet(str, alphabet=None):
+	"""
+	Comprime una cadena con uno de los alfabetos de ALPHABETS, usando
+	ceil(log2(tamaño del alfabeto)) bits por caracter.
+	
+	Formato: un byte de encabezado con el identificador del alfabeto (4 bits
+	altos), un bit reservado y la cantidad de bits de relleno (3 bits bajos);
+	luego los caracteres empaquetados y el relleno con ceros hasta completar
+	el último byte.
+	
+	:param str: Cadena a comprimir.
+	:param alphabet: Nombre del alfabeto; si es None se elige con choose_alphabet.
+	:return: Buffer binario comprimido en forma de bytearray.
+	:raises ValueError: Si el alfabeto no existe o la cadena tiene caracteres fuera de él.
+	"""
+	if alphabet is None:
+		alphabet = choose_alphabet(str)
+	alphabet_id = __alphabet_id(alphabet)
+	_, width, encode_table, _ = __alphabets[alphabet_id]
+	try:
+		data = np.frombuffer(str.encode('latin-1'), dtype=np.uint8)
+	except UnicodeEncodeError:
+		raise ValueError(f'{str!r} contiene caracteres fuera del alfabeto {alphabet}') from None
+	
+	packed = __pack(__encode(data, encode_table), width)
+	remainder = -width * len(data) % 8
+	return bytearray([alphabet_id << 4 | remainder]) + packed.tobytes()
+
+def decompress_alphabet(bytes):
+	"""
+	Descomprime un buffer generado por compress_alphabet.
 	
 	:param bytes: Buffer binario comprimido en forma de bytearray.
 	:return: Cadena descomprimida.
+	:raises ValueError: Si el buffer está vacío o el alfabeto del encabezado no existe.
+	"""
+	if not bytes:
+		raise ValueError('Buffer comprimido vacío')
+	alphabet_id, remainder = bytes[0] >> 4, bytes[0] & 7
+	if alphabet_id >= len(__alphabets):
+		raise ValueError(f'Alfabeto desconocido: {alphabet_id}')
+	_, width, _, decode_table = __alphabets[alphabet_id]
+	
+	body = np.frombuffer(bytes, dtype=np.uint8)[1:]
+	count = (len(body) * 8 - remainder) // width
+	return decode_table[__unpack(body, width)[:count]].tobytes().decode('ascii')
+
+# Cantidad de caracteres por bloque en compress_blocks
+BLOCK_SIZE = 1 << 16
+
+# Bits máximos para la longitud de cada tramo en el modo RLE (tramos de hasta
+# 2**8 caracteres; los más largos se dividen)
+__max_count_width = 8
+
+def __write_varint(n):
+	"""Codifica un entero no negativo en LEB128 (7 bits por byte)."""
+	out = bytearray()
+	while True:
+		out.append(n & 0x7F | (0x80 if n > 0x7F else 0))
+		n >>= 7
+		if not n:
+			return out
+
+def __read_varint(buffer, pos):
+	"""
+	Decodifica un entero LEB128.
+	
+	:return: Tupla (valor, posición siguiente).
+	:raises ValueError: Si el buffer termina antes del entero.
+	"""
+	n = shift = 0
+	while True:
+		if pos >= len(buffer):
+			raise ValueError('Buffer comprimido incompleto')
+		byte = int(buffer[pos])
+		n |= (byte & 0x7F) << shift
+		pos += 1
+		shift += 7
+		if not byte & 0x80:
+			return n, pos
+
+def __runs(values):
+	"""
+	Separa los valores en tramos de valores iguales.
+	
+	:param values: Arreglo numpy de índices (uint8), no vacío.
+	:return: Tupla (valor de cada tramo, longitud de cada tramo).
+	"""
+	# Un tramo empieza donde el valor cambia respecto del anterior
+	starts = np.concatenate(([0], np.flatnonzero(np.diff(values)) + 1))
+	lengths = np.diff(np.append(starts, len(values)))
+	return values[starts], lengths
+
+def __split_runs(symbols, lengths, count_width):
 	"""
-	# Convierte el bytearray comprimido de vuelta a una cadena binaria
-	s = __bytes_to_binary_string(bytes)
+	Divide los tramos más largos que 2**count_width en tramos de esa longitud.
 	
-	# Lee los primeros 3 bits para obtener el número de bits de padding
-	remainder = int(s[:3], 2)
+	:return: Tupla (valor de cada tramo, longitud - 1 de cada tramo).
+	"""
+	cap = 1 << count_width
+	pieces = ((lengths - 1) >> count_width) + 1
+	counts = np.full(int(pieces.sum()), cap - 1, dtype=np.int64)
+	# El último pedazo de cada tramo se queda con lo que sobra
+	last = np.cumsum(pieces) - 1
+	counts[last] = lengths - 1 - (pieces - 1) * cap
+	return np.repeat(symbols, pieces), counts
+
+def __compress_block(values, alphabet_id, rle):
+	"""
+	Comprime un bloque de índices, con RLE si resulta más corto.
+	
+	Formato: un byte con el identificador del alfabeto (4 bits altos), la
+	marca de RLE y, con RLE, los bits de longitud menos uno (3 bits bajos);
+	la cantidad de caracteres (o de tramos, con RLE) en LEB128; y los
+	caracteres empaquetados (con RLE, los valores y luego las longitudes
+	menos uno de cada tramo, empaquetados por separado).
+	
+	:param values: Arreglo numpy de índices (uint8).
+	:param alphabet_id: Identificador del alfabeto.
+	:param rle: Si es True se prueba el modo RLE.
+	:return: Bloque comprimido (bytearray).
+	"""
+	width = __alphabets[alphabet_id][1]
+	best = None
+	if rle and len(values):
+		symbols, lengths = __runs(values)
+		# Bytes del modo RLE para cada ancho de longitud posible
+		for count_width in range(1, __max_count_width + 1):
+			pieces = int((((lengths - 1) >> count_width) + 1).sum())
+			size = -(-pieces * width // 8) + -(-pieces * count_width // 8)
+			if best is None or size < best[0]:
+				best = (size, count_width)
+	
+	if best is None or best[0] >= -(-len(values) * width // 8):
+		return (bytearray([alphabet_id << 4]) + __write_varint(len(values))
+				+ __pack(values, width).tobytes())
+	
+	count_width = best[1]
+	symbols, counts = __split_runs(symbols, lengths, count_width)
+	return (bytearray([alphabet_id << 4 | 8 | count_width - 1]) + __write_varint(len(symbols))
+			+ __pack(symbols, width).tobytes() + __pack(counts, count_width).tobytes())
+
+def __read_block(buffer, pos):
+	"""
+	Lee un bloque de compress_blocks.
+	
+	:param buffer: Arreglo numpy con el buffer completo (uint8).
+	:param pos: Posición del inicio del bloque.
+	:return: Tupla (identificador del alfabeto, índices del bloque, posición siguiente).
+	:raises ValueError: Si el bloque está incompleto o el alfabeto no existe.
+	"""
+	header = int(buffer[pos])
+	alphabet_id, rle, count_width = header >> 4, header & 8, (header & 7) + 1
+	if alphabet_id >= len(__alphabets):
+		raise ValueError(f'Alfabeto desconocido: {alphabet_id}')
+	width = __alphabets[alphabet_id][1]
+	count, pos = __read_varint(buffer, pos + 1)
+	
+	size = -(-count * width // 8)
+	symbols = __unpack(buffer[pos:pos + size], width)[:count]
+	pos += size
+	if rle:
+		size = -(-count * count_width // 8)
+		counts = __unpack(buffer[pos:pos + size], count_width)[:count].astype(np.int64) + 1
+		pos += size
+		symbols = np.repeat(symbols, counts)
+	if pos > len(buffer) or (not rle and len(symbols) < count):
+		raise ValueError('Buffer comprimido incompleto')
+	return alphabet_id, symbols, pos
+
+def compress_blocks(str, alphabet=None, rle=True, block_size=BLOCK_SIZE):
+	"""
+	Comprime una cadena por bloques de 'block_size' caracteres. Cada bloque
+	se empaqueta como en compress_alphabet o, si ocupa menos, como una
+	secuencia de tramos de caracteres iguales (RLE) empaquetados.
+	
+	:param str: Cadena a comprimir.
+	:param alphabet: Nombre del alfabeto; si es None se elige por bloque con choose_alphabet.
+	:param rle: Si es False nunca se usa RLE.
+	:param block_size: Caracteres por bloque.
+	:return: Buffer binario comprimido en forma de bytearray.
+	:raises ValueError: Si el alfabeto no existe o la cadena tiene caracteres fuera de él.
+	"""
+	try:
+		data = np.frombuffer(str.encode('latin-1'), dtype=np.uint8)
+	except UnicodeEncodeError:
+		raise ValueError(f'{str!r} contiene caracteres fuera de los alfabetos') from None
+	alphabet_id = None if alphabet is None else __alphabet_id(alphabet)
+	
+	out = bytearray()
+	# Una cadena vacía se representa con un bloque vacío
+	for start in range(0, max(len(data), 1), block_size):
+		block = data[start:start + block_size]
+		block_id = __choose_alphabet(block) if alphabet_id is None else alphabet_id
+		out += __compress_block(__encode(block, __alphabets[block_id][2]), block_id, rle)
+	return out
+
+def decompress_blocks(bytes):
+	"""
+	Descomprime un buffer generado por compress_blocks.
 	
-	str = ''
-	# Procesa la cadena binaria en grupos de 3 bits, excluyendo:
-	# - Los primeros 3 bits (información de padding)
-	# - Los últimos 'remainder' bits (padding)
-	for i in range(3, len(s) - remainder, 3):
-		# Convierte cada grupo de 3 bits a índice y busca el caracter en la tabla
-		str += __table[int(s[i : i+3], 2)]
+	:param bytes: Buffer binario comprimido en forma de bytearray.
+	:return: Cadena descomprimida.
+	:raises ValueError: Si el buffer está vacío o incompleto.
+	"""
+	if not bytes:
+		raise ValueError('Buffer comprimido vacío')
+	buffer = np.frombuffer(bytes, dtype=np.uint8)
+	parts = []
+	pos = 0
+	while pos < len(buffer):
+		alphabet_id, values, pos = __read_block(buffer, pos)
+		parts.append(__alphabets[alphabet_id][3][values])
+	return np.concatenate(parts).tobytes().decode('ascii')
+
+def block_stats(bytes):
+	"""
+	Describe cada bloque de un buffer generado por compress_blocks.
 	
-	# print(f'Decompressed: {bytes} => {s} => {str}')
-	return str
+	:param bytes: Buffer binario comprimido en forma de bytearray.
+	:return: Lista con un diccionario por bloque: 'alphabet', 'rle' (bool),
+	         'symbols' (caracteres originales), 'bytes' (tamaño comprimido) y
+	         'ratio' (bytes comprimidos por caracter original).
+	"""
+	buffer = np.frombuffer(bytes, dtype=np.uint8)
+	stats = []
+	pos = 0
+	while pos < len(buffer):
+		start = pos
+		alphabet_id, values, pos = __read_block(buffer, pos)
+		stats.append({
+			'alphabet': __alphabets[alphabet_id][0],
+			'rle': bool(buffer[start] & 8),
+			'symbols': len(values),
+			'bytes': pos - start,
+			'ratio': (pos - start) / max(len(values), 1),
+		})
+	return stats
 
 if __name__ == '__main__':
 	import random
@@ -87,4 +562,13 @@ if __name__ == '__main__':
 	print('Decompressed:', decompressed)
 
 	# Verifica la integridad del proceso: la cadena descomprimida debe ser igual a la original
-	assert test_str == decompressed, 'Error: decompressed string is not equal to original string'
\ No newline at end of file
+	assert test_str == decompressed, 'Error: decompressed string is not equal to original string'
+	# Compresión por bloques con RLE adaptativo: datos aleatorios y repetitivos
+	mixed = ''.join(random.choice(__table) for _ in range(BLOCK_SIZE)) + \
+		''.join(random.choice(__table) * random.randint(1, 400) for _ in range(500))
+	blocks = compress_blocks(mixed)
+	assert decompress_blocks(blocks) == mixed, 'Error: decompress_blocks is not equal to original string'
+	print(f'Blocks: {len(mixed)} -> {len(blocks)} bytes (compress: {len(compress(mixed))} bytes)')
+	for stats in block_stats(blocks):
+		print(f"  {stats['symbols']:6d} symbols, {'RLE  ' if stats['rle'] else 'plain'} "
+			  f"{stats['bytes']:6d} bytes, ratio {stats['ratio']:.3f}")
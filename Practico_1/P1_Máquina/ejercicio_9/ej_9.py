@@ -20,9 +20,17 @@ class __Base:
 	"""Clase base que proporciona funcionalidad común para cliente y servidor."""
 	_socket = None
 	
-	def __init__(self):
-		"""Inicializa un socket TCP."""
+	def __init__(self, rle = False):
+		"""
+		Inicializa un socket TCP.
+		
+		Args:
+			rle (bool): Si es True los mensajes se comprimen por bloques con RLE
+						adaptativo (Compresor.compress_blocks); ambos extremos
+						deben usar el mismo modo
+		"""
 		self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+		self._rle = rle
 
 	def send(self, string):
 		"""
@@ -31,7 +39,10 @@ class __Base:
 		Args:
 			string (str): Cadena a comprimir y enviar
 		"""
-		self._socket.send(Compresor.compress(string))
+		if self._rle:
+			self._socket.send(Compresor.compress_blocks(string))
+		else:
+			self._socket.send(Compresor.compress(string))
 
 	def receive(self):
 		"""
@@ -40,7 +51,10 @@ class __Base:
 		Returns:
 			str: Cadena descomprimida recibida
 		"""
-		return Compresor.decompress(self._socket.recv(1024))
+		data = self._socket.recv(1024)
+		if self._rle:
+			return Compresor.decompress_blocks(data)
+		return Compresor.decompress(data)
 
 	def close(self):
 		"""Cierra la conexión del socket."""
@@ -49,29 +63,31 @@ class __Base:
 class Client(__Base):
 	"""Cliente que se conecta a un servidor para enviar/recibir datos comprimidos."""
 	
-	def __init__(self, ip = 'localhost', port = 27015):
+	def __init__(self, ip = 'localhost', port = 27015, rle = False):
 		"""
 		Inicializa el cliente y se conecta al servidor.
 		
 		Args:
 			ip (str): Dirección IP del servidor (por defecto 'localhost')
 			port (int): Puerto del servidor (por defecto 27015)
+			rle (bool): Compresión por bloques con RLE adaptativo (por defecto False)
 		"""
-		super().__init__()
+		super().__init__(rle)
 		self._socket.connect((ip, port))
 		
 class Server(__Base):
 	"""Servidor que acepta conexiones de clientes para recibir/enviar datos comprimidos."""
 	
-	def __init__(self, ip = 'localhost', port = 27015):
+	def __init__(self, ip = 'localhost', port = 27015, rle = False):
 		"""
 		Inicializa el servidor, lo vincula a una dirección y acepta una conexión.
 		
 		Args:
 			ip (str): Dirección IP para vincular el servidor (por defecto 'localhost')
 			port (int): Puerto para vincular el servidor (por defecto 27015)
+			rle (bool): Compresión por bloques con RLE adaptativo (por defecto False)
 		"""
-		super().__init__()
+		super().__init__(rle)
 		self._socket.bind((ip, port))  # Vincula el socket a la dirección
 		self._socket.listen(1)         # Escucha hasta 1 conexión pendiente
 		self._socket, addr = self._socket.accept()  # Acepta la primera conexión